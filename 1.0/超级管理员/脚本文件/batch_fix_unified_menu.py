@@ -9,68 +9,38 @@
 """
 import os
 import re
+import sys
 import json
 from pathlib import Path
 
-# 需要修复的页面列表（来自测试报告的WARNING项）
-WARNING_PAGES = [
-    # 规则管理模块
-    '../规则管理/规则列表/门诊规则管理.html',
-    '../规则管理/规则列表/医保规则管理系统v2.html',
-    '../规则管理/规则详情/规则详情.html',
-    '../规则管理/规则详情/临床规则详情.html',
-    '../规则管理/规则详情/慢病规则详情.html',
-    '../规则管理/规则详情/政策规则详情.html',
-    '../规则管理/规则详情/门诊规则详情.html',
-    '../规则管理/规则操作/创建规则.html',
-    '../规则管理/规则操作/编辑规则.html',
-    '../规则管理/规则操作/规则参数配置.html',
-    '../规则管理/规则操作/规则管理完整版.html',
-    # 审核管理模块
-    '../审核管理/审核流程/事中审核检查.html',
-    '../审核管理/审核流程/事后审核任务列表.html',
-    '../审核管理/审核结果/审核结果.html',
-    # 用户权限管理模块
-    '../用户权限管理/权限管理/权限管理.html',
-    '../用户权限管理/组织管理/科室管理.html',
-    '../用户权限管理/组织管理/租户管理.html',
-    '../用户权限管理/组织管理/租户表单.html',
-    '../用户权限管理/组织管理/企业详情.html'
-]
+# 添加项目根目录到Python路径（页面清单由 page_inventory.py 统一维护）
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, project_root)
+
+from atomic_io import write_text_atomic
+from page_inventory import get_inventory
 
 # 基础目录
 BASE_DIR = Path('/Users/baiyumi/Mai/代码/chenyrweb/ybsh/1.0/超级管理员')
 
+def get_warning_pages():
+    """需要检查修复的页面：页面清单中挂在统一菜单下（有 data-menu）的正式页面
+
+    登录页、独立的英文规则页等不在菜单中的页面不注入侧边栏。
+    """
+    return ['../' + entry.path for entry in get_inventory(BASE_DIR).pages(audit_only=True)
+            if entry.in_menu and entry.data_menu]
+
 def get_menu_config(relative_path):
-    """根据页面路径获取菜单配置"""
-    page_configs = {
-        # 规则管理模块
-        '规则管理/规则列表/门诊规则管理.html': {'menu': 'rules-outpatient', 'level': 3},
-        '规则管理/规则列表/医保规则管理系统v2.html': {'menu': 'rules-medical', 'level': 3},
-        '规则管理/规则详情/规则详情.html': {'menu': 'rules-detail-general', 'level': 3},
-        '规则管理/规则详情/临床规则详情.html': {'menu': 'rules-detail-clinical', 'level': 3},
-        '规则管理/规则详情/慢病规则详情.html': {'menu': 'rules-detail-chronic', 'level': 3},
-        '规则管理/规则详情/政策规则详情.html': {'menu': 'rules-detail-policy', 'level': 3},
-        '规则管理/规则详情/门诊规则详情.html': {'menu': 'rules-detail-outpatient', 'level': 3},
-        '规则管理/规则操作/创建规则.html': {'menu': 'rules-create', 'level': 3},
-        '规则管理/规则操作/编辑规则.html': {'menu': 'rules-edit', 'level': 3},
-        '规则管理/规则操作/规则参数配置.html': {'menu': 'rules-config', 'level': 3},
-        '规则管理/规则操作/规则管理完整版.html': {'menu': 'rules-full', 'level': 3},
-        # 审核管理模块
-        '审核管理/审核流程/事中审核检查.html': {'menu': 'audit-during', 'level': 3},
-        '审核管理/审核流程/事后审核任务列表.html': {'menu': 'audit-post', 'level': 3},
-        '审核管理/审核结果/审核结果.html': {'menu': 'audit-results', 'level': 2},
-        # 用户权限管理模块
-        '用户权限管理/权限管理/权限管理.html': {'menu': 'permission', 'level': 2},
-        '用户权限管理/组织管理/科室管理.html': {'menu': 'department', 'level': 3},
-        '用户权限管理/组织管理/租户管理.html': {'menu': 'tenant', 'level': 3},
-        '用户权限管理/组织管理/租户表单.html': {'menu': 'tenant-form', 'level': 3},
-        '用户权限管理/组织管理/企业详情.html': {'menu': 'enterprise', 'level': 3}
-    }
-    
+    """根据页面路径获取菜单配置（data-menu 取自页面清单，level 为页面相对 超级管理员 的目录深度）"""
     # 移除相对路径前缀 '../'
     clean_path = relative_path.replace('../', '')
-    return page_configs.get(clean_path, {'menu': 'unknown', 'level': 2})
+    entry = get_inventory(BASE_DIR).get(clean_path)
+    item = entry.menu_item(clean_path) if entry else None
+    if not item or not item.data_menu:
+        return {'menu': 'unknown', 'level': len(Path(clean_path).parent.parts)}
+    # level 用于拼接 '../' 资源前缀，必须是目录深度而不是菜单层级
+    return {'menu': item.data_menu, 'level': len(Path(clean_path).parent.parts)}
 
 def generate_style_links(level):
     """生成样式文件引用"""
@@ -196,8 +166,7 @@ def fix_single_page(page_path):
             )
         
         # 写回文件
-        with open(abs_path, 'w', encoding='utf-8') as f:
-            f.write(content)
+        write_text_atomic(abs_path, content)
         
         print(f"✅ {abs_path.name} - 修复完成")
         return True
@@ -209,13 +178,14 @@ def fix_single_page(page_path):
 def main():
     """主函数"""
     print("🚀 开始批量修复页面统一菜单引用...")
-    print(f"📋 需要修复的页面数量: {len(WARNING_PAGES)}")
+    warning_pages = get_warning_pages()
+    print(f"📋 需要修复的页面数量: {len(warning_pages)}")
     print("-" * 60)
     
     success_count = 0
     failed_count = 0
     
-    for page_path in WARNING_PAGES:
+    for page_path in warning_pages:
         try:
             if fix_single_page(page_path):
                 success_count += 1
@@ -229,7 +199,7 @@ def main():
     print(f"📊 修复完成统计:")
     print(f"   ✅ 成功: {success_count}")
     print(f"   ❌ 失败: {failed_count}")
-    print(f"   📈 成功率: {success_count/(success_count+failed_count)*100:.1f}%")
+    print(f"   📈 成功率: {success_count/max(success_count+failed_count, 1)*100:.1f}%")
     
     if success_count > 0:
         print("\n🎉 建议重新运行测试脚本验证修复效果！")
@@ -6,12 +6,83 @@
 1. 移除重复的脚本块和注释
 2. 确保单一规范的统一菜单加载逻辑
 3. 修复语法错误
+4. 页面脚本中各类旧加载代码（fetch(...).then(...) 链）替换为标准加载逻辑，移除无条件预加载
 """
 
 import os
 import re
+import sys
 
-def fix_file(file_path):
+# 添加项目根目录到Python路径（标准加载脚本模板由 sidebar_include.py 统一维护）
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+sys.path.insert(0, project_root)
+
+from atomic_io import write_text_atomic
+from sidebar_include import SIDEBAR_FRAGMENT, sidebar_loader_script, sidebar_loader_code, remove_sidebar_preload
+
+SCRIPT_BLOCK_RE = re.compile(r'(<script\b[^>]*>)([\s\S]*?)(</script>)', re.IGNORECASE)
+# 旧加载代码：以 fetch(片段地址).then 开始的 Promise 链
+LEGACY_FETCH_RE = re.compile(r"fetch\(\s*(['\"])[^'\"]*组件/_unified-sidebar\.html\1\s*\)\s*\.then")
+# 旧加载代码上方的说明注释（随加载代码一起替换）
+LEGACY_COMMENT_RE = re.compile(r'^[ \t]*//[^\n]*(?:菜单|侧边栏)[^\n]*\n\Z', re.MULTILINE)
+
+
+def _statement_end(code, pos):
+    """返回从 pos 开始的语句结束位置（跳过字符串、注释与括号嵌套）"""
+    depth = 0
+    i = pos
+    n = len(code)
+    while i < n:
+        c = code[i]
+        if c in '\'"`':
+            j = i + 1
+            while j < n and code[j] != c:
+                j += 2 if code[j] == '\\' else 1
+            i = j + 1
+            continue
+        if code.startswith('//', i):
+            i = code.find('\n', i)
+            i = n if i == -1 else i
+            continue
+        if code.startswith('/*', i):
+            j = code.find('*/', i + 2)
+            i = n if j == -1 else j + 2
+            continue
+        if c in '([{':
+            depth += 1
+        elif c in ')]}':
+            depth -= 1
+            if depth < 0:
+                return i  # 所在代码块结束（语句缺少分号）
+        elif c == ';' and depth == 0:
+            return i + 1
+        elif c == '\n' and depth == 0 and not code[i:].lstrip().startswith('.'):
+            return i
+        i += 1
+    return n
+
+
+def replace_legacy_loaders(content, relative_path, fragment_html):
+    """将页面脚本中的旧加载代码替换为标准加载逻辑（只替换独占一行开头的语句）"""
+    def _replace_block(m):
+        open_tag, code, close_tag = m.groups()
+        if 'src=' in open_tag.lower():
+            return m.group(0)
+        for fetch in reversed(list(LEGACY_FETCH_RE.finditer(code))):
+            line_start = code.rfind('\n', 0, fetch.start()) + 1
+            indent = code[line_start:fetch.start()]
+            if indent.strip():
+                continue  # await fetch(...) 等表达式中的调用不是加载代码
+            end = _statement_end(code, fetch.start())
+            comment = LEGACY_COMMENT_RE.search(code, 0, line_start)
+            start = comment.start() if comment else line_start
+            code = code[:start] + sidebar_loader_code(relative_path, fragment_html, indent) + code[end:]
+        return open_tag + code + close_tag
+
+    return SCRIPT_BLOCK_RE.sub(_replace_block, content)
+
+
+def fix_file(file_path, fragment_html=None):
     """修复单个文件的统一菜单脚本块"""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
@@ -28,55 +99,34 @@ def fix_file(file_path):
         return False, '无统一菜单'
     
     # 检测相对路径
-    fetch_match = re.search(r"fetch\(['\"]([^'\"]*组件/_unified-sidebar\.html)['\"]\)", content)
+    fetch_match = re.search(r"(?:fetch\(|SIDEBAR_URL = )['\"]([^'\"]*组件/_unified-sidebar\.html)['\"]", content)
     if not fetch_match:
         return False, '无fetch调用'
     
     relative_path = fetch_match.group(1)
+    if fragment_html is None:
+        fragment_html = SIDEBAR_FRAGMENT.read_text(encoding='utf-8')
     
-    # 标准化脚本模板
-    standard_script = f'''<!-- 加载统一菜单 -->
-<script>
-    // 加载统一菜单组件
-    fetch('{relative_path}')
-        .then(response => response.text())
-        .then(html => {{
-            const sidebarContainer = document.getElementById('sidebar-container');
-            sidebarContainer.innerHTML = html;
-            // 手动执行插入的脚本
-            const scripts = sidebarContainer.querySelectorAll('script');
-            scripts.forEach(script => {{
-                const newScript = document.createElement('script');
-                if (script.src) {{
-                    newScript.src = script.src;
-                }} else {{
-                    newScript.textContent = script.textContent;
-                }}
-                document.head.appendChild(newScript);
-                script.remove();
-            }});
-            // 等待脚本执行后再初始化菜单
-            setTimeout(() => {{
-                if (typeof initSidebar === 'function') {{
-                    initSidebar();
-                }}
-            }}, 100);
-        }})
-        .catch(error => console.error('Error loading sidebar:', error));
-</script>'''
+    # 标准化脚本模板：片段按内容版本缓存到 sessionStorage，脚本合并执行一次
+    standard_script = '<!-- 加载统一菜单 -->\n' + sidebar_loader_script(relative_path, fragment_html)
     
     # 移除所有现有的统一菜单相关脚本块（包括注释和重复内容）
     # 匹配从"<!-- 加载统一菜单 -->"开始到"</script>"结束的所有内容，包括重复部分
     pattern = r'<!--\s*加载统一菜单\s*-->[\s\S]*?</script>(?:\s*</script>)*'
     
-    # 替换为标准脚本
-    new_content = re.sub(pattern, standard_script, content, flags=re.IGNORECASE)
+    # 替换为标准脚本（使用函数替换，避免模板中的反斜杠被当作转义）
+    new_content = re.sub(pattern, lambda m: standard_script, content, flags=re.IGNORECASE)
+    
+    # 页面脚本中的其他旧加载代码（手动执行片段脚本 + setTimeout 初始化等）
+    new_content = replace_legacy_loaders(new_content, relative_path, fragment_html)
+    
+    # 无条件预加载会绕过 sessionStorage 缓存，每次导航都重新请求片段
+    new_content = remove_sidebar_preload(new_content)
     
     # 如果内容有变化，写入文件
     if new_content != content:
         try:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(new_content)
+            write_text_atomic(file_path, new_content)
             return True, '修复成功'
         except Exception as e:
             return False, f'写入失败: {e}'
@@ -92,6 +142,7 @@ def main():
     
     fixed_count = 0
     error_count = 0
+    fragment_html = SIDEBAR_FRAGMENT.read_text(encoding='utf-8')
     
     for root, dirs, files in os.walk(admin_dir):
         for file in files:
@@ -99,7 +150,7 @@ def main():
                 continue
                 
             file_path = os.path.join(root, file)
-            success, message = fix_file(file_path)
+            success, message = fix_file(file_path, fragment_html)
             
             if success:
                 fixed_count += 1
@@ -6,51 +6,32 @@ import urllib.parse
 import time
 import json
 import os
+import sys
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# 添加项目根目录到Python路径（页面清单由 page_inventory.py 统一维护）
+sys.path.insert(0, os.path.abspath(os.path.join(BASE_DIR, '..', '..', '..')))
+
+from page_inventory import get_inventory
 # 以测试页所在目录为基准，确保相对路径一致
 BASE_URL = 'http://localhost:8000/1.0/%E8%B6%85%E7%BA%A7%E7%AE%A1%E7%90%86%E5%91%98/%E8%84%9A%E6%9C%AC%E6%96%87%E4%BB%B6/'
 
-page_configs = {
-    'dashboard': [
-        { 'title': '工作台', 'path': '../工作台/工作台.html', 'menu': 'dashboard' },
-        { 'title': '平台运营看板', 'path': '../工作台/平台运营看板.html', 'menu': 'dashboard-overview' },
-        { 'title': '报告规则分析', 'path': '../工作台/报告规则分析.html', 'menu': 'dashboard-analysis' },
-    ],
-    'rules': [
-        { 'title': '规则管理主页', 'path': '../规则管理/规则列表/规则管理主页.html', 'menu': 'rules-main' },
-        { 'title': '门诊规则管理', 'path': '../规则管理/规则列表/门诊规则管理.html', 'menu': 'rules-outpatient' },
-        { 'title': '医保规则管理系统', 'path': '../规则管理/规则列表/医保规则管理系统v2.html', 'menu': 'rules-medical' },
-        { 'title': '规则详情', 'path': '../规则管理/规则详情/规则详情.html', 'menu': 'rules-detail-general' },
-        { 'title': '临床规则详情', 'path': '../规则管理/规则详情/临床规则详情.html', 'menu': 'rules-detail-clinical' },
-        { 'title': '慢病规则详情', 'path': '../规则管理/规则详情/慢病规则详情.html', 'menu': 'rules-detail-chronic' },
-        { 'title': '政策规则详情', 'path': '../规则管理/规则详情/政策规则详情.html', 'menu': 'rules-detail-policy' },
-        { 'title': '门诊规则详情', 'path': '../规则管理/规则详情/门诊规则详情.html', 'menu': 'rules-detail-outpatient' },
-        { 'title': '创建规则', 'path': '../规则管理/规则操作/创建规则.html', 'menu': 'rules-create' },
-        { 'title': '编辑规则', 'path': '../规则管理/规则操作/编辑规则.html', 'menu': 'rules-edit' },
-        { 'title': '规则参数配置', 'path': '../规则管理/规则操作/规则参数配置.html', 'menu': 'rules-config' },
-        { 'title': '规则管理完整版', 'path': '../规则管理/规则操作/规则管理完整版.html', 'menu': 'rules-full' },
-    ],
-    'audit': [
-        { 'title': '事前审核记录', 'path': '../审核管理/审核流程/事前审核记录.html', 'menu': 'audit-pre' },
-        { 'title': '事中审核检查', 'path': '../审核管理/审核流程/事中审核检查.html', 'menu': 'audit-during' },
-        { 'title': '事后审核任务列表', 'path': '../审核管理/审核流程/事后审核任务列表.html', 'menu': 'audit-post' },
-        { 'title': '审核结果', 'path': '../审核管理/审核结果/审核结果.html', 'menu': 'audit-results' },
-    ],
-    'user': [
-        { 'title': '用户列表', 'path': '../用户权限管理/用户管理/用户列表.html', 'menu': 'user-list' },
-        { 'title': '权限管理', 'path': '../用户权限管理/权限管理/权限管理.html', 'menu': 'permission' },
-        { 'title': '科室管理', 'path': '../用户权限管理/组织管理/科室管理.html', 'menu': 'department' },
-        { 'title': '租户管理', 'path': '../用户权限管理/组织管理/租户管理.html', 'menu': 'tenant' },
-        { 'title': '租户表单', 'path': '../用户权限管理/组织管理/租户表单.html', 'menu': 'tenant-form' },
-        { 'title': '企业详情', 'path': '../用户权限管理/组织管理/企业详情.html', 'menu': 'enterprise' },
-    ],
-    'system': [
-        { 'title': '全局设置', 'path': '../系统管理/全局设置.html', 'menu': 'global-settings' },
-        { 'title': '系统监控', 'path': '../系统管理/系统监控.html', 'menu': 'system-monitor' },
-        { 'title': '知识库目录', 'path': '../系统管理/知识库目录.html', 'menu': 'knowledge-base' },
-    ],
-}
+# 待测页面来自页面清单服务（page_inventory.py）：仅统一菜单中的页面，按菜单分组，含查询参数变体
+def load_page_configs():
+    configs = {}
+    inventory = get_inventory()
+    for entry in inventory.pages(audit_only=True):
+        if not entry.in_menu:
+            continue
+        for page_rel in entry.variants():
+            item = entry.menu_item(page_rel)
+            configs.setdefault(entry.menu_group, []).append({
+                'title': entry.title or os.path.splitext(os.path.basename(entry.path))[0],
+                'path': '../' + page_rel,
+                'menu': (item.data_menu if item else None) or '',
+            })
+    return configs
+
 
 def make_url(rel_path: str) -> str:
     # 将相对路径与基址合并，并对路径做URL编码，追加时间戳参数避免缓存
@@ -127,7 +108,7 @@ def test_page(rel_path: str):
 
 def main():
     all_pages = []
-    for category, pages in page_configs.items():
+    for category, pages in load_page_configs().items():
         for p in pages:
             all_pages.append((category, p))
 
@@ -8,6 +8,7 @@ AI审查修复控制器
 import os
 import json
 import re
+import time
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from pathlib import Path
@@ -15,20 +16,31 @@ from pathlib import Path
 # 导入现有模块
 from unified_audit_system import UnifiedAuditSystem
 from ai_intelligent_fix_engine import AIIntelligentFixEngine
+from ai_fix_backends import ModelBackend, SimulatedBackend
+from convergence_tracker import ConvergenceTracker, OSCILLATING, STALLED
+from fix_scheduler import FixScheduler
 
 class AIAuditFixController:
     """AI审查修复控制器"""
     
-    def __init__(self, project_root: str):
+    def __init__(self, project_root: str, backend: Optional[ModelBackend] = None):
         self.project_root = Path(project_root)
         self.audit_system = UnifiedAuditSystem(project_root)
-        self.fix_engine = AIIntelligentFixEngine(project_root)
         self.session_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # 修复备份按会话记录，可用 python backup_store.py rollback <会话ID> 整体回滚
+        # 模型后端：未指定时使用本控制器的模拟修复
+        backend = backend or SimulatedBackend(
+            lambda request: self._simulate_ai_fix(request.problem, request.context, request.prompt))
+        self.fix_engine = AIIntelligentFixEngine(project_root, session_id=self.session_id, backend=backend)
+        # 按 预期得分收益/预计耗时 排序待修复问题，策略成功率与耗时逐轮累积
+        self.scheduler = FixScheduler(self.fix_engine.analyze_problem, self.audit_system.priority_weights,
+                                      concurrency=self.fix_engine.dispatcher.concurrency)
         
     def run_complete_audit_fix_cycle(self, 
                                    target_modules: Optional[List[str]] = None,
                                    priority_filter: Optional[List[str]] = None,
-                                   max_fixes_per_cycle: int = 10) -> Dict[str, Any]:
+                                   max_fixes_per_cycle: int = 10,
+                                   time_budget: Optional[float] = None) -> Dict[str, Any]:
         """
         运行完整的审查-修复-验证循环
         
@@ -36,6 +48,7 @@ class AIAuditFixController:
             target_modules: 目标模块列表，None表示全部模块
             priority_filter: 优先级过滤器，如['P0', 'P1']
             max_fixes_per_cycle: 每个循环最大修复数量
+            time_budget: 每个循环修复的预计耗时预算（秒），None 表示使用 AI_FIX_CYCLE_BUDGET
             
         Returns:
             完整的循环结果
@@ -46,13 +59,16 @@ class AIAuditFixController:
             'cycles': [],
             'final_summary': {},
             'total_fixes_applied': 0,
-            'overall_improvement': {}
+            'overall_improvement': {},
+            'stop_reason': '达到最大循环次数'
         }
         
         print(f"🚀 开始AI审查修复循环 (会话ID: {self.session_id})")
         
         cycle_count = 0
         max_cycles = 5  # 最大循环次数，防止无限循环
+        tracker = ConvergenceTracker()
+        final_audit = None  # 循环因收敛结束时，最后一轮审查即反映最终状态，无需再审查一次
         
         while cycle_count < max_cycles:
             cycle_count += 1
@@ -62,15 +78,37 @@ class AIAuditFixController:
             print("1️⃣ 执行系统审查...")
             audit_result = self._run_audit(target_modules)
             
-            # 2. 分析问题并筛选
+            # 2. 收敛检测：问题指纹不变即停止；振荡 / 无进展的页面不再修复
+            all_problems = self._extract_problems(audit_result)
+            convergence = tracker.observe(all_problems)
+            for path in convergence['oscillating']:
+                print(f"🔁 问题集合来回振荡，后续轮次跳过: {path}")
+            for path in convergence['stalled']:
+                print(f"⏸️ 修复后问题集合未变化，后续轮次跳过: {path}")
+            if convergence['converged']:
+                print("✅ 问题指纹与上一轮相同，已收敛，循环结束")
+                cycle_result['stop_reason'] = '问题指纹收敛'
+                final_audit = audit_result
+                break
+            
+            # 3. 分析问题并筛选
             print("2️⃣ 分析问题并筛选...")
-            problems_to_fix = self._filter_problems(audit_result, priority_filter, max_fixes_per_cycle)
+            problems_to_fix = self._filter_problems(audit_result, priority_filter, max_fixes_per_cycle,
+                                                    problems=[p for p in all_problems
+                                                              if not tracker.is_excluded(p['file_path'])],
+                                                    time_budget=time_budget)
             
             if not problems_to_fix:
                 print("✅ 没有需要修复的问题，循环结束")
+                cycle_result['stop_reason'] = '没有需要修复的问题'
+                final_audit = audit_result
                 break
+            tracker.record_attempts({p['file_path'] for p in problems_to_fix})
             
-            print(f"📝 发现 {len(problems_to_fix)} 个需要修复的问题")
+            plan = dict(self.scheduler.last_plan)
+            print(f"📝 发现 {len(problems_to_fix)} 个需要修复的问题（候选 {plan['candidates']} 个，"
+                  f"预期收益 {plan['expected_gain']:.1f} 分，预计耗时 {plan['estimated_seconds']:.0f}s，"
+                  f"推迟 {plan['deferred']} 个）")
             
             # 3. AI智能修复
             print("3️⃣ 执行AI智能修复...")
@@ -79,6 +117,7 @@ class AIAuditFixController:
             # 4. 验证修复效果
             print("4️⃣ 验证修复效果...")
             validation_results = self._validate_fixes(fix_results)
+            self.scheduler.record(validation_results)
             
             # 5. 记录本轮结果
             cycle_data = {
@@ -88,7 +127,10 @@ class AIAuditFixController:
                 'fixes_attempted': len(fix_results),
                 'fixes_successful': len([f for f in validation_results if f.get('validation', {}).get('is_fixed', False)]),
                 'fixes_failed': len([f for f in validation_results if not f.get('validation', {}).get('is_fixed', False)]),
-                'cycle_improvement': self._calculate_improvement(audit_result, validation_results)
+                'cycle_improvement': self._calculate_improvement(audit_result, validation_results),
+                'schedule': plan,
+                'issue_fingerprint': convergence['fingerprint'][:12],
+                'pages_excluded': len(tracker.excluded())
             }
             
             cycle_result['cycles'].append(cycle_data)
@@ -99,11 +141,18 @@ class AIAuditFixController:
             # 6. 检查是否需要继续
             if cycle_data['fixes_successful'] == 0:
                 print("⚠️ 本轮无成功修复，停止循环")
+                cycle_result['stop_reason'] = '本轮无成功修复'
                 break
         
+        cycle_result['convergence'] = {
+            OSCILLATING: tracker.excluded(OSCILLATING),
+            STALLED: tracker.excluded(STALLED),
+        }
+        
         # 最终审查
-        print("\n🏁 执行最终审查...")
-        final_audit = self._run_audit(target_modules)
+        if final_audit is None:
+            print("\n🏁 执行最终审查...")
+            final_audit = self._run_audit(target_modules)
         cycle_result['final_audit'] = self._summarize_audit(final_audit)
         cycle_result['end_time'] = datetime.now().isoformat()
         
@@ -133,8 +182,23 @@ class AIAuditFixController:
     def _filter_problems(self, 
                         audit_result: Dict[str, Any], 
                         priority_filter: Optional[List[str]] = None,
-                        max_fixes: int = 10) -> List[Dict[str, Any]]:
-        """筛选需要修复的问题"""
+                        max_fixes: int = 10,
+                        problems: Optional[List[Dict[str, Any]]] = None,
+                        time_budget: Optional[float] = None) -> List[Dict[str, Any]]:
+        """筛选需要修复的问题（problems 为已提取的问题列表时不再从审查结果中提取）"""
+        all_problems = list(problems) if problems is not None else self._extract_problems(audit_result)
+        
+        # 应用优先级过滤
+        if priority_filter:
+            all_problems = [p for p in all_problems if p['severity'] in priority_filter]
+        
+        # 按 收益/成本 调度，在数量上限与时间预算内选择
+        if time_budget is None:
+            return self.scheduler.plan(all_problems, max_fixes)
+        return self.scheduler.plan(all_problems, max_fixes, time_budget)
+    
+    def _extract_problems(self, audit_result: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """从审查结果中提取全部问题"""
         all_problems = []
         
         # 从审查结果中提取问题
@@ -155,73 +219,68 @@ class AIAuditFixController:
                                 }
                                 all_problems.append(problem)
         
-        # 应用优先级过滤
-        if priority_filter:
-            all_problems = [p for p in all_problems if p['severity'] in priority_filter]
-        
-        # 按优先级排序
-        priority_order = {'P0': 0, 'P1': 1, 'P2': 2}
-        all_problems.sort(key=lambda x: priority_order.get(x['severity'], 3))
-        
-        # 限制数量
-        return all_problems[:max_fixes]
+        return all_problems
     
     def _run_ai_fixes(self, problems: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """执行AI修复"""
-        fix_results = []
-        
-        for i, problem in enumerate(problems, 1):
-            print(f"  🔧 修复 {i}/{len(problems)}: {problem['type']} - {problem['file_path']}")
+        """执行AI修复：由引擎按文件分组调度，不同文件的修复并发请求模型，同一文件的问题依次修复"""
+        return self.fix_engine.fix_issues([(problem, problem['file_path']) for problem in problems],
+                                          fix=lambda i: self._run_ai_fix(i + 1, problems))
+    
+    async def _run_ai_fix(self, number: int, problems: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """修复单个问题"""
+        problem = problems[number - 1]
+        print(f"  🔧 修复 {number}/{len(problems)}: {problem['type']} - {problem['file_path']}")
+        started = time.perf_counter()
+        
+        try:
+            # 1. 分析问题
+            analysis = self.fix_engine.analyze_problem(problem)
             
-            try:
-                # 1. 分析问题
-                analysis = self.fix_engine.analyze_problem(problem)
-                
-                # 2. 收集上下文
-                context = self.fix_engine.gather_context(problem['file_path'], analysis['context_needed'])
-                
-                # 3. 生成修复提示
-                fix_prompt = self.fix_engine.generate_fix_prompt(analysis, context)
-                
-                # 4. 这里应该调用AI API进行修复
-                # 由于没有实际的AI API，我们使用模拟的修复逻辑
-                fixed_content = self._simulate_ai_fix(problem, context, fix_prompt)
-                
-                if fixed_content:
-                    # 5. 应用修复
-                    success = self.fix_engine.apply_ai_fix(problem['file_path'], fixed_content)
-                    
-                    fix_result = {
-                        'problem': problem,
-                        'analysis': analysis,
-                        'fix_prompt': fix_prompt,
-                        'status': 'success' if success else 'failed',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                else:
-                    fix_result = {
-                        'problem': problem,
-                        'analysis': analysis,
-                        'status': 'failed',
-                        'error': 'AI修复生成失败',
-                        'timestamp': datetime.now().isoformat()
-                    }
-                
-                fix_results.append(fix_result)
-                
-            except Exception as e:
-                print(f"    ❌ 修复失败: {e}")
-                fix_results.append({
+            # 2. 收集上下文
+            context = self.fix_engine.gather_context(problem['file_path'], analysis['context_needed'])
+            
+            # 3. 生成修复提示
+            fix_prompt = self.fix_engine.generate_fix_prompt(analysis, context)
+            
+            # 4. 调用模型后端生成修复（并发数、超时与重试由引擎的分发器控制），转换为针对原文件的编辑操作
+            edits = await self.fix_engine.generate_fix(problem, analysis, context, fix_prompt)
+            
+            if edits:
+                # 5. 原地应用编辑，只在被修改的区域上验证
+                success = self.fix_engine.apply_ai_fix(problem['file_path'], edits)
+                result = {
                     'problem': problem,
-                    'status': 'failed',
-                    'error': str(e),
+                    'analysis': analysis,
+                    'fix_prompt': fix_prompt,
+                    'status': 'success' if success else 'failed',
+                    'edits': len(edits),
+                    'duration': time.perf_counter() - started,
                     'timestamp': datetime.now().isoformat()
-                })
-        
-        return fix_results
+                }
+                if success:
+                    result['validation'] = self.fix_engine.validate_edits(context['file_content'], edits, problem)
+                return result
+            return {
+                'problem': problem,
+                'analysis': analysis,
+                'status': 'failed',
+                'error': 'AI修复生成失败',
+                'duration': time.perf_counter() - started,
+                'timestamp': datetime.now().isoformat()
+            }
+            
+        except Exception as e:
+            print(f"    ❌ 修复失败: {e}")
+            return {
+                'problem': problem,
+                'status': 'failed',
+                'error': str(e),
+                'duration': time.perf_counter() - started,
+                'timestamp': datetime.now().isoformat()
+            }
     
     def _simulate_ai_fix(self, problem: Dict[str, Any], context: Dict[str, Any], prompt: str) -> Optional[str]:
-        """模拟AI修复（实际应用中应该调用真实的AI API）"""
+        """模拟AI修复（实际应用中应该调用真实的AI API），返回锚定编辑 JSON"""
         file_content = context.get('file_content', '')
         
         if not file_content:
@@ -229,17 +288,34 @@ class AIAuditFixController:
         
         # 根据问题类型进行简单的模拟修复
         if '面包屑导航' in problem['description']:
-            return self._add_breadcrumb_simulation(file_content, problem)
+            edits = self._add_breadcrumb_simulation(file_content, problem)
         elif '页面标题' in problem['description']:
-            return self._add_title_simulation(file_content, problem)
+            edits = self._add_title_simulation(file_content, problem)
         elif '响应式设计' in problem['description']:
-            return self._add_responsive_simulation(file_content, problem)
+            edits = self._add_responsive_simulation(file_content, problem)
         elif '无障碍访问' in problem['description']:
-            return self._add_accessibility_simulation(file_content, problem)
+            edits = self._add_accessibility_simulation(file_content, problem)
+        else:
+            return None
         
-        return None
+        return json.dumps({'edits': edits}, ensure_ascii=False) if edits else None
+    
+    @staticmethod
+    def _anchored(content: str, match: re.Match, op: str, text: str) -> Dict[str, Any]:
+        """以匹配到的原文为锚点的编辑（occurrence 为该原文在文件中第几次出现）"""
+        anchor = match.group(0)
+        return {'op': op, 'anchor': anchor, 'occurrence': content.count(anchor, 0, match.start()) + 1, 'text': text}
     
-    def _add_breadcrumb_simulation(self, content: str, problem: Dict[str, Any]) -> str:
+    def _body_start_edit(self, content: str, html: str) -> List[Dict[str, Any]]:
+        """完整页面插入到 <body> 开头；没有 <body> 的组件片段插入到文件开头"""
+        body_match = re.search(r'<body[^>]*>', content, re.IGNORECASE)
+        if body_match:
+            return [self._anchored(content, body_match, 'insert_after', html)]
+        if re.search(r'<!doctype|<html', content, re.IGNORECASE):
+            return []
+        return [{'op': 'insert_before', 'anchor': '', 'text': html}]
+    
+    def _add_breadcrumb_simulation(self, content: str, problem: Dict[str, Any]) -> List[Dict[str, Any]]:
         """模拟添加面包屑导航"""
         page_name = problem.get('page', '页面')
         module_name = problem.get('module', '模块')
@@ -255,73 +331,66 @@ class AIAuditFixController:
 </nav>
 '''
         
-        # 如果是HTML片段（组件），直接在开头添加
-        if not content.strip().startswith('<html'):
-            return breadcrumb_html + content
-        
-        # 如果是完整HTML，在body开头添加
-        body_match = re.search(r'<body[^>]*>', content, re.IGNORECASE)
-        if body_match:
-            insert_pos = body_match.end()
-            return content[:insert_pos] + breadcrumb_html + content[insert_pos:]
-        
-        return content
+        return self._body_start_edit(content, breadcrumb_html)
     
-    def _add_title_simulation(self, content: str, problem: Dict[str, Any]) -> str:
+    def _add_title_simulation(self, content: str, problem: Dict[str, Any]) -> List[Dict[str, Any]]:
         """模拟添加页面标题"""
         page_name = problem.get('page', '页面')
         
         title_html = f'<h1 class="page-title">{page_name}</h1>\n'
         
-        # 如果是HTML片段，直接在开头添加
-        if not content.strip().startswith('<html'):
-            return title_html + content
-        
-        # 如果是完整HTML，在主内容区域添加
-        main_match = re.search(r'<main[^>]*>|<div[^>]*class=["\'][^"\']*(main|content)[^"\']* ["\']', content, re.IGNORECASE)
+        # 在主内容区域开头添加，没有主内容区域时添加到 <body> 开头
+        main_match = re.search(r'<main[^>]*>|<div[^>]*class=["\'][^"\']*(main|content)[^"\']*["\'][^>]*>', content, re.IGNORECASE)
         if main_match:
-            insert_pos = main_match.end()
-            return content[:insert_pos] + title_html + content[insert_pos:]
+            return [self._anchored(content, main_match, 'insert_after', title_html)]
         
-        return content
+        return self._body_start_edit(content, title_html)
     
-    def _add_responsive_simulation(self, content: str, problem: Dict[str, Any]) -> str:
+    def _add_responsive_simulation(self, content: str, problem: Dict[str, Any]) -> List[Dict[str, Any]]:
         """模拟添加响应式设计"""
-        # 如果是HTML片段，跳过viewport添加
-        if content.strip().startswith('<html'):
-            # 检查是否已有viewport
-            if not re.search(r'<meta[^>]*name=["\']viewport["\']', content, re.IGNORECASE):
-                viewport_meta = '<meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
-                head_match = re.search(r'<head[^>]*>', content, re.IGNORECASE)
-                if head_match:
-                    insert_pos = head_match.end()
-                    content = content[:insert_pos] + viewport_meta + content[insert_pos:]
+        edits = []
+        # 组件片段没有 <head>，跳过viewport添加
+        if not re.search(r'<meta[^>]*name=["\']viewport["\']', content, re.IGNORECASE):
+            head_match = re.search(r'<head[^>]*>', content, re.IGNORECASE)
+            if head_match:
+                viewport_meta = '\n<meta name="viewport" content="width=device-width, initial-scale=1.0">'
+                edits.append(self._anchored(content, head_match, 'insert_after', viewport_meta))
         
         # 添加响应式类
-        if 'class=' in content:
-            content = re.sub(r'class="([^"]*)"', r'class="\1 responsive"', content, count=1)
+        class_match = re.search(r'class="([^"]*)"', content)
+        if class_match and 'responsive' not in class_match.group(1).split():
+            edits.append(self._anchored(content, class_match, 'replace', f'class="{class_match.group(1)} responsive"'))
         
-        return content
+        return edits
     
-    def _add_accessibility_simulation(self, content: str, problem: Dict[str, Any]) -> str:
+    def _add_accessibility_simulation(self, content: str, problem: Dict[str, Any]) -> List[Dict[str, Any]]:
         """模拟添加无障碍访问特性"""
-        # 为按钮添加aria-label
-        content = re.sub(r'<button([^>]*)>', r'<button\1 aria-label="操作按钮">', content)
-        
-        # 为输入框添加aria-describedby
-        content = re.sub(r'<input([^>]*)>', r'<input\1 aria-describedby="input-help">', content)
-        
-        # 为图片添加alt属性
-        content = re.sub(r'<img([^>]*?)(?<!alt=["\'][^"\']*)>', r'<img\1 alt="图片描述">', content)
-        
-        return content
+        edits = []
+        patterns = (
+            # 为按钮添加aria-label
+            (r'<button\b([^>]*)>', 'aria-label', 'aria-label="操作按钮"'),
+            # 为输入框添加aria-describedby
+            (r'<input\b([^>]*?)\s*/?>', 'aria-describedby', 'aria-describedby="input-help"'),
+            # 为图片添加alt属性
+            (r'<img\b([^>]*?)\s*/?>', 'alt', 'alt="图片描述"'),
+        )
+        for pattern, attribute, addition in patterns:
+            for match in re.finditer(pattern, content, re.IGNORECASE):
+                if re.search(rf'\b{attribute}\s*=', match.group(1), re.IGNORECASE):
+                    continue
+                tag = match.group(0)
+                closing = '/>' if tag.endswith('/>') else '>'
+                new_tag = f'{tag[:-len(closing)].rstrip()} {addition}{closing}'
+                edits.append(self._anchored(content, match, 'replace', new_tag))
+        
+        return edits
     
     def _validate_fixes(self, fix_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """验证修复效果"""
         validated_results = []
         
         for fix_result in fix_results:
-            if fix_result.get('status') == 'success':
+            if fix_result.get('status') == 'success' and 'validation' not in fix_result:
                 problem = fix_result['problem']
                 validation = self.fix_engine.validate_fix(problem['file_path'], problem)
                 fix_result['validation'] = validation
@@ -376,6 +445,7 @@ class AIAuditFixController:
 **开始时间**: {cycle_result['start_time']}
 **结束时间**: {cycle_result['end_time']}
 **总修复数**: {cycle_result['total_fixes_applied']}
+**回滚命令**: `python backup_store.py rollback {cycle_result['session_id']}`
 
 ## 循环概览
 
@@ -390,8 +460,23 @@ class AIAuditFixController:
 - **修复成功**: {cycle['fixes_successful']} 个
 - **修复失败**: {cycle['fixes_failed']} 个
 - **成功率**: {cycle['fixes_successful'] / cycle['fixes_attempted'] * 100 if cycle['fixes_attempted'] > 0 else 0:.1f}%
+- **调度**: 预期收益 {cycle.get('schedule', {}).get('expected_gain', 0):.1f} 分，预计耗时 {cycle.get('schedule', {}).get('estimated_seconds', 0):.0f}s，推迟 {cycle.get('schedule', {}).get('deferred', 0)} 个
+- **问题指纹**: `{cycle.get('issue_fingerprint', '')}`（已排除页面 {cycle.get('pages_excluded', 0)} 个）
+
+"""
+        
+        convergence = cycle_result.get('convergence', {})
+        report += f"""
+## 收敛情况
+
+- **停止原因**: {cycle_result.get('stop_reason', '')}
+- **振荡页面**: {len(convergence.get(OSCILLATING, []))} 个
+- **无进展页面**: {len(convergence.get(STALLED, []))} 个
 
 """
+        for label, key in (('振荡', OSCILLATING), ('无进展', STALLED)):
+            for path in convergence.get(key, []):
+                report += f"- {label}: {path}\n"
         
         final_audit = cycle_result.get('final_audit', {})
         report += f"""
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI修复模型后端
+
+AIIntelligentFixEngine / AIAuditFixController 在“调用AI”的位置统一通过后端接口生成修复：
+1. ModelBackend：异步接口 complete(request) -> 响应文本，接入真实模型时只需实现该方法
+2. FixDispatcher：信号量限制并发数，单次请求超时，失败按指数退避重试
+3. SimulatedBackend：包装现有的同步模拟修复函数（演示 / 无模型环境）
+4. ReplayBackend：回放录制的响应并模拟真实延迟，供测试与基准使用；
+   RecordingBackend 包装任意后端并把响应录制到文件
+
+模型调用耗时以秒计时，一轮 10 个修复在并发下约等于一次调用的耗时。
+命令行（并发效果演示）：
+    python ai_fix_backends.py --requests 10 --latency 2 --concurrency 10
+"""
+
+import json
+import time
+import random
+import asyncio
+import hashlib
+import argparse
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from atomic_io import write_text_atomic
+
+try:
+    from audit_config import AI_FIX_CONCURRENCY, AI_FIX_TIMEOUT, AI_FIX_RETRIES
+except ImportError:
+    AI_FIX_CONCURRENCY = 10
+    AI_FIX_TIMEOUT = 60
+    AI_FIX_RETRIES = 2
+
+
+class BackendError(Exception):
+    """可重试的后端错误（限流、网络中断、服务端 5xx 等）"""
+
+
+@dataclass
+class FixRequest:
+    request_id: str
+    file_path: str
+    strategy: str
+    prompt: str
+    problem: Dict[str, Any] = field(default_factory=dict)
+    context: Dict[str, Any] = field(default_factory=dict, repr=False)
+
+    @property
+    def prompt_hash(self) -> str:
+        return hashlib.sha256(self.prompt.encode('utf-8')).hexdigest()
+
+
+@dataclass
+class FixResponse:
+    request_id: str
+    content: Optional[str] = None
+    attempts: int = 0
+    latency: float = 0.0
+    error: str = ''
+
+    @property
+    def ok(self) -> bool:
+        return self.content is not None and not self.error
+
+
+class ModelBackend:
+    """模型后端接口"""
+
+    name = 'base'
+    model_version = ''
+
+    async def complete(self, request: FixRequest) -> Optional[str]:
+        raise NotImplementedError
+
+
+class SimulatedBackend(ModelBackend):
+    """包装同步的模拟修复函数：fix_fn(request) -> 修复内容或 None"""
+
+    name = 'simulated'
+    model_version = 'simulated-1'
+
+    def __init__(self, fix_fn: Callable[[FixRequest], Optional[str]], latency: Tuple[float, float] = (0.0, 0.0)):
+        self.fix_fn = fix_fn
+        self.latency = latency
+
+    async def complete(self, request: FixRequest) -> Optional[str]:
+        if self.latency[1] > 0:
+            await asyncio.sleep(random.uniform(*self.latency))
+        # 模拟函数会读取文件，放到线程中执行，不阻塞其他请求
+        return await asyncio.to_thread(self.fix_fn, request)
+
+
+class ReplayBackend(ModelBackend):
+    """回放录制的响应：先按提示词哈希匹配，再按 策略:文件路径 匹配"""
+
+    name = 'replay'
+
+    def __init__(self, recordings=None, latency: Tuple[float, float] = (0.8, 2.5),
+                 failure_rate: float = 0.0, seed: Optional[int] = None):
+        if isinstance(recordings, (str, Path)):
+            data = json.loads(Path(recordings).read_text(encoding='utf-8'))
+            recordings = data.get('responses', {})
+            self.model_version = data.get('model_version', 'replay')
+        else:
+            self.model_version = 'replay'
+        self.recordings: Dict[str, str] = dict(recordings or {})
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.random = random.Random(seed)
+        self.calls = 0
+
+    async def complete(self, request: FixRequest) -> Optional[str]:
+        self.calls += 1
+        await asyncio.sleep(self.random.uniform(*self.latency))
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            raise BackendError('replay: 模拟的限流/网络错误')
+        return self.recordings.get(request.prompt_hash,
+                                   self.recordings.get(f'{request.strategy}:{request.file_path}'))
+
+
+class RecordingBackend(ModelBackend):
+    """包装任意后端，把成功的响应按提示词哈希录制到文件，供 ReplayBackend 回放"""
+
+    def __init__(self, inner: ModelBackend, output: Path):
+        self.inner = inner
+        self.output = Path(output)
+        self.name = f'recording:{inner.name}'
+        self.model_version = inner.model_version
+        self.responses: Dict[str, str] = {}
+
+    async def complete(self, request: FixRequest) -> Optional[str]:
+        content = await self.inner.complete(request)
+        if content is not None:
+            self.responses[request.prompt_hash] = content
+            self.responses[f'{request.strategy}:{request.file_path}'] = content
+            write_text_atomic(self.output, json.dumps(
+                {'model_version': self.model_version, 'responses': self.responses},
+                ensure_ascii=False, indent=2))
+        return content
+
+
+class FixDispatcher:
+    """带并发限制、超时与重试的请求分发器"""
+
+    def __init__(self, backend: ModelBackend, concurrency: int = AI_FIX_CONCURRENCY,
+                 timeout: float = AI_FIX_TIMEOUT, retries: int = AI_FIX_RETRIES, backoff: float = 1.0):
+        self.backend = backend
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self._semaphores = {}  # 每个事件循环一个信号量（asyncio.run 每次创建新循环）
+        self.stats = {'requests': 0, 'succeeded': 0, 'failed': 0, 'retries': 0, 'timeouts': 0, 'busy_seconds': 0.0}
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(id(loop))
+        if semaphore is None:
+            self._semaphores = {id(loop): asyncio.Semaphore(self.concurrency)}
+            semaphore = self._semaphores[id(loop)]
+        return semaphore
+
+    async def complete(self, request: FixRequest) -> FixResponse:
+        """发送一个修复请求；超时或 BackendError 时退避重试，其余异常直接失败"""
+        response = FixResponse(request.request_id)
+        self.stats['requests'] += 1
+        async with self._semaphore():
+            started = time.perf_counter()
+            for attempt in range(self.retries + 1):
+                response.attempts = attempt + 1
+                try:
+                    response.content = await asyncio.wait_for(self.backend.complete(request), self.timeout)
+                    response.error = ''
+                    break
+                except asyncio.TimeoutError:
+                    self.stats['timeouts'] += 1
+                    response.error = f'请求超时（{self.timeout}s）'
+                except BackendError as e:
+                    response.error = str(e)
+                except Exception as e:
+                    response.error = f'{type(e).__name__}: {e}'
+                    break
+                if attempt < self.retries:
+                    self.stats['retries'] += 1
+                    await asyncio.sleep(self.backoff * (2 ** attempt) * random.uniform(0.5, 1.5))
+            response.latency = time.perf_counter() - started
+            self.stats['busy_seconds'] += response.latency
+        self.stats['succeeded' if response.ok else 'failed'] += 1
+        return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description='AI修复后端并发演示（回放后端）')
+    parser.add_argument('--requests', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=2.0, help='单次调用平均延迟（秒）')
+    parser.add_argument('--concurrency', type=int, default=AI_FIX_CONCURRENCY)
+    parser.add_argument('--failure-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    requests = [FixRequest(f'r{i}', f'page{i}.html', 'add_page_title', f'prompt {i}') for i in range(args.requests)]
+    recordings = {f'{r.strategy}:{r.file_path}': '<h1>页面标题</h1>' for r in requests}
+    backend = ReplayBackend(recordings, latency=(args.latency * 0.8, args.latency * 1.2),
+                            failure_rate=args.failure_rate, seed=42)
+    dispatcher = FixDispatcher(backend, concurrency=args.concurrency, backoff=0.2)
+
+    async def run_all():
+        return await asyncio.gather(*(dispatcher.complete(r) for r in requests))
+
+    started = time.perf_counter()
+    asyncio.run(run_all())
+    elapsed = time.perf_counter() - started
+    stats = dispatcher.stats
+    print(f"⚡ {args.requests} 个请求, 并发 {args.concurrency}: 总耗时 {elapsed:.2f}s, "
+          f"串行约需 {stats['busy_seconds']:.2f}s")
+    print(f"   成功 {stats['succeeded']} | 失败 {stats['failed']} | 重试 {stats['retries']} | 超时 {stats['timeouts']}")
+
+
+if __name__ == '__main__':
+    main()
@@ -8,17 +8,46 @@ AI智能修复引擎
 import os
 import json
 import re
+import asyncio
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Optional, Tuple, Callable, Awaitable
 from pathlib import Path
 
+from atomic_io import encode_like, write_bytes_atomic
+from backup_store import BackupStore
+from context_window import build_window
+from ai_fix_backends import FixDispatcher, FixRequest, ModelBackend, SimulatedBackend
+from ai_response_cache import ResponseCache, cache_key, templatize, fill_template
+from fix_edits import TextEdit, parse_edits, resolve_edits, check_edits, diff_edits, apply_edits, touched_text
+
 class AIIntelligentFixEngine:
     """AI智能修复引擎"""
     
-    def __init__(self, project_root: str):
+    # 上下文缓存条目上限（每个页面约 6 条：文件内容 + 各类提取结果）
+    CONTEXT_CACHE_SIZE = 128
+    
+    def __init__(self, project_root: str, session_id: Optional[str] = None,
+                 backend: Optional[ModelBackend] = None, response_cache: Optional[ResponseCache] = None):
         self.project_root = Path(project_root)
         self.fix_history = []
-        self.context_cache = {}
+        # LRU 上下文缓存：(路径, mtime_ns, 文件大小, 上下文类型) -> 提取结果
+        self.context_cache = OrderedDict()
+        self.context_cache_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+        # 提示词上下文窗口的 token 估算（窗口化前 / 后）
+        self.prompt_stats = {'prompts': 0, 'original_tokens': 0, 'window_tokens': 0}
+        # 模型后端：未指定时使用演示用的模拟修复
+        self.backend = backend or SimulatedBackend(
+            lambda request: self._simulate_fix_for_demo(request.problem, request.context))
+        self.dispatcher = FixDispatcher(self.backend)
+        # 持久化的响应缓存（规范化提示词 + 策略 + 模型版本），命中的响应需重新验证后才应用
+        self.response_cache = response_cache or ResponseCache()
+        # 正在请求中的缓存键：同一批次中提示词相同的请求等待第一个请求的结果
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 修复前后的版本存入内容寻址的备份仓库，不再在页面旁生成 *.backup_* 文件
+        # 仓库放在被修复项目自己的根目录下，不同项目的备份与 refs 互不混杂
+        self.backup_store = BackupStore(store_dir=self.project_root / '.audit_backups', root=self.project_root)
+        self.backup_session = self.backup_store.begin_session(session_id)
         
     def analyze_problem(self, problem_info: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -89,39 +118,65 @@ class AIIntelligentFixEngine:
             'file_type': '',
             'related_files': [],
             'dependencies': [],
-            'current_structure': {}
+            'current_structure': {},
+            'cache_stamp': None
         }
         
-        # 读取文件内容
+        # 读取文件内容（同一页面的多个问题共用缓存，文件修改后 mtime/大小变化自动失效）
         full_path = self.project_root / file_path
+        stamp = (str(file_path), 0, 0)
         if full_path.exists():
             try:
-                with open(full_path, 'r', encoding='utf-8') as f:
-                    context['file_content'] = f.read()
+                stat = full_path.stat()
+                stamp = (str(file_path), stat.st_mtime_ns, stat.st_size)
+                context['file_content'] = self._cached_context(stamp, 'file_content', full_path.read_text, encoding='utf-8')
                 context['file_type'] = full_path.suffix
+                context['cache_stamp'] = stamp
             except Exception as e:
                 print(f"读取文件失败: {e}")
                 return context
         
         # 根据上下文类型收集特定信息
+        content = context['file_content']
         for ctx_type in context_types:
             if ctx_type == 'navigation_structure':
-                context['navigation_info'] = self._extract_navigation_info(context['file_content'])
+                context['navigation_info'] = self._cached_context(stamp, ctx_type, self._extract_navigation_info, content)
                 
             elif ctx_type == 'page_hierarchy':
-                context['hierarchy_info'] = self._extract_page_hierarchy(file_path)
+                context['hierarchy_info'] = self._cached_context(stamp, ctx_type, self._extract_page_hierarchy, file_path)
                 
             elif ctx_type == 'css_structure':
-                context['css_info'] = self._extract_css_info(context['file_content'])
+                context['css_info'] = self._cached_context(stamp, ctx_type, self._extract_css_info, content)
                 
             elif ctx_type == 'html_structure':
-                context['html_structure'] = self._extract_html_structure(context['file_content'])
+                context['html_structure'] = self._cached_context(stamp, ctx_type, self._extract_html_structure, content)
                 
             elif ctx_type == 'form_structure':
-                context['form_info'] = self._extract_form_structure(context['file_content'])
+                context['form_info'] = self._cached_context(stamp, ctx_type, self._extract_form_structure, content)
         
         return context
     
+    def _cached_context(self, stamp: Tuple[str, int, int], ctx_type: str, loader, *args, **kwargs):
+        """按 (路径, mtime_ns, 大小, 上下文类型) 查询 LRU 缓存，未命中时调用 loader 并写入"""
+        key = stamp + (ctx_type,)
+        if key in self.context_cache:
+            self.context_cache.move_to_end(key)
+            self.context_cache_stats['hits'] += 1
+            return self.context_cache[key]
+        self.context_cache_stats['misses'] += 1
+        value = self.context_cache[key] = loader(*args, **kwargs)
+        while len(self.context_cache) > self.CONTEXT_CACHE_SIZE:
+            self.context_cache.popitem(last=False)
+            self.context_cache_stats['evictions'] += 1
+        return value
+    
+    def invalidate_context(self, file_path: str):
+        """丢弃某个文件的全部缓存上下文（写入修复后调用）"""
+        stale = [key for key in self.context_cache if key[0] == str(file_path)]
+        for key in stale:
+            del self.context_cache[key]
+        self.context_cache_stats['invalidations'] += len(stale)
+    
     def _extract_navigation_info(self, content: str) -> Dict[str, Any]:
         """提取导航信息"""
         nav_info = {
@@ -282,6 +337,18 @@ class AIIntelligentFixEngine:
         Returns:
             AI修复提示词
         """
+        # 只嵌入与修复策略相关的页面区域，窗口保存在 context 中供 merge_ai_response 拼接
+        strategy = analysis.get('fix_strategy', '')
+        if context.get('cache_stamp'):
+            window = self._cached_context(context['cache_stamp'], f'window:{strategy}',
+                                          build_window, context['file_content'], strategy)
+        else:
+            window = build_window(context['file_content'], strategy)
+        context['window'] = window
+        self.prompt_stats['prompts'] += 1
+        self.prompt_stats['original_tokens'] += window.original_tokens
+        self.prompt_stats['window_tokens'] += window.window_tokens
+        
         prompt = f"""
 你是一个专业的前端代码修复专家。请根据以下信息修复代码问题：
 
@@ -291,9 +358,12 @@ class AIIntelligentFixEngine:
 - 严重级别：{analysis['severity']}
 - 文件路径：{analysis['file_path']}
 
-## 当前代码内容
+## 当前代码片段
+共 {len(window.regions)} 个片段，约 {window.window_tokens} tokens（完整文件约 {window.original_tokens} tokens，缩减 {window.reduction:.0%}）。
+`/*@@elided:N@@*/` 为省略的样式/脚本内容，标记为 truncated 的片段在末尾截断。
+
 ```{context.get('file_type', 'html')}
-{context['file_content']}
+{window.render()}
 ```
 
 ## 上下文信息
@@ -331,7 +401,9 @@ class AIIntelligentFixEngine:
         prompt += f"""
 
 ## 修复要求
-1. 请提供完整的修复后代码
+1. 以编辑操作的形式返回修改，不要返回整个文件：
+   `{{"edits": [{{"op": "insert_before|insert_after|replace", "anchor": "原文片段", "text": "新内容"}}]}}`
+   anchor 从上面的片段中逐字复制且在文件中唯一（或给出 occurrence），不能包含省略占位符，插入位置不能在标签内部
 2. 确保修复符合Web标准和最佳实践
 3. 保持代码风格与现有代码一致
 4. 添加必要的注释说明修复内容
@@ -340,39 +412,95 @@ class AIIntelligentFixEngine:
 ## 修复策略
 根据问题类型 "{analysis['fix_strategy']}"，请采用相应的修复方案。
 
-请直接提供修复后的完整代码，不需要额外解释。
+请直接提供编辑操作 JSON（也可以是统一差异格式），不需要额外解释。
 """
         
         return prompt
     
-    def apply_ai_fix(self, file_path: str, fixed_content: str) -> bool:
+    def merge_ai_response(self, context: Dict[str, Any], response: str) -> List[TextEdit]:
+        """
+        把AI返回内容转换为针对原文件的编辑操作
+        
+        Args:
+            context: generate_fix_prompt 使用过的上下文（含窗口）
+            response: AI返回内容：锚定编辑 JSON / 统一差异 / 按片段标记返回的片段 / 完整文件
+            
+        Returns:
+            定位并校验过的编辑操作；响应无法定位或与页面结构冲突时抛出 ValueError
+        """
+        content = context['file_content']
+        edits = parse_edits(response)
+        if edits is not None:
+            return resolve_edits(content, edits)
+        window = context.get('window')
+        if window is not None and window.has_regions(response):
+            # 片段整体替换缩减为片段内的最小行级差异
+            result = []
+            for start, end, text in window.replacements(content, response):
+                result.extend(diff_edits(content[start:end], text, start))
+            return check_edits(content, result)
+        return check_edits(content, diff_edits(content, response))
+    
+    def validate_edits(self, original_content: str, edits: List[TextEdit],
+                       original_problem: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        只在被修改的区域上验证修复
+        
+        Args:
+            original_content: 修复前的文件内容
+            edits: 编辑操作
+            original_problem: 原始问题信息
+            
+        Returns:
+            验证结果（同 validate_content）
+        """
+        fixed_content = apply_edits(original_content, edits)
+        validation = self.validate_content(touched_text(fixed_content, edits), original_problem, fragment=True)
+        # 标签完整性按每处编辑比较：新内容中未闭合的尖括号不应多于原内容
+        for edit in edits:
+            if edit.new.count('<') - edit.new.count('>') != edit.old.count('<') - edit.old.count('>'):
+                validation['new_issues'].append('HTML标签不匹配')
+                break
+        return validation
+    
+    def apply_ai_fix(self, file_path: str, edits: List[TextEdit]) -> bool:
         """
         应用AI修复结果
         
         Args:
             file_path: 文件路径
-            fixed_content: 修复后的内容
+            edits: 编辑操作（merge_ai_response 的结果）；传入字符串时视为修复后的完整内容
             
         Returns:
             是否修复成功
         """
         try:
             full_path = self.project_root / file_path
+            original_content = full_path.read_text(encoding='utf-8')
+            if isinstance(edits, str):
+                edits = diff_edits(original_content, edits)
             
-            # 备份原文件
-            backup_path = full_path.with_suffix(f"{full_path.suffix}.backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
-            if full_path.exists():
-                full_path.rename(backup_path)
+            # 在当前文件上原地应用编辑；对应位置的原文已变化时放弃本次修复
+            fixed_content = apply_edits(original_content, edits)
             
-            # 写入修复后的内容
-            with open(full_path, 'w', encoding='utf-8') as f:
-                f.write(fixed_content)
+            # 按原文件的换行风格与 BOM 编码，备份记录的新版本与写入磁盘的字节完全一致
+            fixed_bytes = encode_like(full_path, fixed_content)
+            
+            # 备份原文件、修复后的版本与每处编辑（写入之前完成，写入失败时仍可回滚）
+            backup = self.backup_session.record(full_path, fixed_bytes,
+                                                edits=[edit.to_dict() for edit in edits])
+            
+            # 原子写入修复后的内容（临时文件 + fsync + 替换），中途失败原文件保持不变
+            write_bytes_atomic(full_path, fixed_bytes)
+            self.invalidate_context(file_path)
             
             # 记录修复历史
             self.fix_history.append({
                 'file_path': file_path,
                 'timestamp': datetime.now().isoformat(),
-                'backup_path': str(backup_path),
+                'backup_session': self.backup_session.session_id,
+                'backup_hash': backup['before'],
+                'edits': len(edits),
                 'status': 'success'
             })
             
@@ -388,6 +516,109 @@ class AIIntelligentFixEngine:
             })
             return False
     
+    def rollback_session(self) -> List[str]:
+        """
+        回滚本次会话中的全部修复
+        
+        Returns:
+            已恢复的文件列表
+        """
+        restored = self.backup_session.rollback()
+        print(f"⏪ 已回滚会话 {self.backup_session.session_id}: {len(restored)} 个文件")
+        return restored
+    
+    async def generate_fix(self, problem_info: Dict[str, Any], analysis: Dict[str, Any],
+                           context: Dict[str, Any], prompt: str) -> Optional[List[TextEdit]]:
+        """
+        通过模型后端生成修复（受并发数、超时与重试限制），并转换为针对原文件的编辑操作；
+        优先使用响应缓存，命中的响应重新验证失败时丢弃并重新调用模型
+        
+        Returns:
+            编辑操作列表，失败时返回 None
+        """
+        file_path = problem_info.get('file_path', '')
+        strategy = analysis.get('fix_strategy', '')
+        key = cache_key(prompt, file_path, strategy, self.backend.model_version)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            template = await asyncio.shield(inflight)
+            if template is not None:
+                candidate = self._revalidate_cached(fill_template(template, file_path), problem_info, context)
+                if candidate is not None:
+                    self.response_cache.stats['hits'] += 1
+                    return candidate
+        
+        cached = self.response_cache.get(key, file_path)
+        if cached is not None:
+            candidate = self._revalidate_cached(cached, problem_info, context)
+            if candidate is not None:
+                return candidate
+            self.response_cache.reject(key)
+        
+        future = self._inflight[key] = asyncio.get_running_loop().create_future()
+        content = None
+        try:
+            content = await self._request_fix(problem_info, analysis, context, prompt)
+        finally:
+            self._inflight.pop(key, None)
+            shareable = content is not None and self._is_cacheable(content)
+            future.set_result(templatize(content, file_path) if shareable else None)
+        if content is None:
+            return None
+        try:
+            edits = self.merge_ai_response(context, content)
+        except ValueError as e:
+            print(f"AI修复无法应用到页面: {e}")
+            return None
+        if self._is_cacheable(content):
+            self.response_cache.put(key, content, file_path, strategy)
+        return edits
+    
+    @staticmethod
+    def _is_cacheable(response: str) -> bool:
+        """只有锚定编辑 / 统一差异格式的响应可以在页面间复用（片段、完整文件响应带有原页面的内容）"""
+        try:
+            return parse_edits(response) is not None
+        except ValueError:
+            return False
+    
+    async def _request_fix(self, problem_info: Dict[str, Any], analysis: Dict[str, Any],
+                           context: Dict[str, Any], prompt: str) -> Optional[str]:
+        """调用模型后端，返回原始响应"""
+        request = FixRequest(
+            request_id=f"{problem_info.get('file_path', '')}#{len(self.fix_history)}",
+            file_path=problem_info.get('file_path', ''),
+            strategy=analysis.get('fix_strategy', ''),
+            prompt=prompt,
+            problem=problem_info,
+            context=context,
+        )
+        response = await self.dispatcher.complete(request)
+        if not response.ok:
+            if response.error:
+                print(f"模型调用失败（{response.attempts} 次尝试）: {response.error}")
+            return None
+        return response.content
+    
+    def _revalidate_cached(self, cached: str, problem_info: Dict[str, Any],
+                           context: Dict[str, Any]) -> Optional[List[TextEdit]]:
+        """
+        重新验证缓存的响应：编辑必须能定位到当前页面，修改区域修复了目标问题（有对应验证规则时）且不引入新问题
+        
+        Returns:
+            通过验证的编辑操作，否则返回 None
+        """
+        if not self._is_cacheable(cached):
+            return None
+        try:
+            edits = self.merge_ai_response(context, cached)
+            validation = self.validate_edits(context['file_content'], edits, problem_info)
+        except ValueError:
+            return None
+        if not edits or validation['new_issues'] or (validation['checked'] and not validation['is_fixed']):
+            return None
+        return edits
+    
     def fix_issue(self, issue: Dict[str, Any], page_path: str = None) -> Dict[str, Any]:
         """
         修复单个问题（兼容演示脚本的接口）
@@ -399,6 +630,38 @@ class AIIntelligentFixEngine:
         Returns:
             修复结果字典
         """
+        return asyncio.run(self.fix_issue_async(issue, page_path))
+    
+    def fix_issues(self, issues: List[Tuple[Dict[str, Any], Optional[str]]],
+                   fix: Optional[Callable[[int], Awaitable[Dict[str, Any]]]] = None) -> List[Dict[str, Any]]:
+        """
+        批量修复问题：不同文件并发生成，同一文件的问题按顺序修复（后一个基于前一个的结果）
+        
+        Args:
+            issues: (问题信息, 页面路径) 列表
+            fix: 按下标修复单个问题的协程函数，默认为 fix_issue_async(*issues[i])
+            
+        Returns:
+            与输入顺序一致的修复结果列表
+        """
+        fix = fix or (lambda i: self.fix_issue_async(*issues[i]))
+        groups: Dict[str, List[int]] = {}
+        for i, (issue, page_path) in enumerate(issues):
+            groups.setdefault(page_path or issue.get('page_path', ''), []).append(i)
+        results: List[Optional[Dict[str, Any]]] = [None] * len(issues)
+        
+        async def fix_file(indexes: List[int]):
+            for i in indexes:
+                results[i] = await fix(i)
+        
+        async def fix_all():
+            await asyncio.gather(*(fix_file(indexes) for indexes in groups.values()))
+        
+        asyncio.run(fix_all())
+        return results
+    
+    async def fix_issue_async(self, issue: Dict[str, Any], page_path: str = None) -> Dict[str, Any]:
+        """fix_issue 的异步实现"""
         try:
             # 转换问题格式
             problem_info = {
@@ -418,21 +681,21 @@ class AIIntelligentFixEngine:
             # 生成修复提示
             fix_prompt = self.generate_fix_prompt(analysis, context)
             
-            # 模拟AI修复（实际应用中这里会调用AI API）
-            fixed_content = self._simulate_fix_for_demo(problem_info, context)
+            # 调用模型后端生成修复（编辑操作）
+            edits = await self.generate_fix(problem_info, analysis, context, fix_prompt)
             
-            if fixed_content:
+            if edits:
                 # 应用修复
-                success = self.apply_ai_fix(problem_info['file_path'], fixed_content)
+                success = self.apply_ai_fix(problem_info['file_path'], edits)
                 
                 if success:
-                    # 验证修复
-                    validation = self.validate_fix(problem_info['file_path'], problem_info)
+                    # 验证修复：只检查被修改的区域
+                    validation = self.validate_edits(context['file_content'], edits, problem_info)
                     
                     return {
                         'success': True,
                         'description': f"已修复: {problem_info['description']}",
-                        'changes_made': [f"更新文件: {problem_info['file_path']}"],
+                        'changes_made': [f"更新文件: {problem_info['file_path']}（{len(edits)} 处编辑）"],
                         'validation': validation
                     }
                 else:
@@ -464,7 +727,7 @@ class AIIntelligentFixEngine:
             context: 上下文信息
             
         Returns:
-            模拟的修复后内容
+            模拟的修复编辑（锚定编辑 JSON）
         """
         try:
             file_path = self.project_root / problem_info['file_path']
@@ -487,33 +750,36 @@ class AIIntelligentFixEngine:
     </ol>
 </nav>\n'''
                 
-                # 在主内容区域开头插入面包屑
+                # 在主内容区域开头插入面包屑，没有主内容区域时插入到 <body> 开头
                 if '<main' in original_content:
-                    return original_content.replace('<main', breadcrumb_html + '<main')
+                    anchor = '<main'
                 elif '<div class="content"' in original_content:
-                    return original_content.replace('<div class="content"', breadcrumb_html + '<div class="content"')
+                    anchor = '<div class="content"'
                 else:
-                    return breadcrumb_html + original_content
+                    return self._demo_body_edit(original_content, breadcrumb_html)
+                return self._demo_edits({'op': 'insert_before', 'anchor': anchor, 'occurrence': 1,
+                                         'text': breadcrumb_html})
                     
             elif '页面标题' in description:
                 # 添加页面标题
                 title = file_path.stem.replace('_', ' ').title()
                 title_html = f'<h1>{title}</h1>\n'
                 
-                # 在主内容区域开头插入标题
-                if '<main' in original_content:
-                    return original_content.replace('<main', title_html + '<main')
-                else:
-                    return title_html + original_content
+                # 在主内容区域开头插入标题，没有主内容区域时插入到 <body> 开头
+                if '<main' not in original_content:
+                    return self._demo_body_edit(original_content, title_html)
+                return self._demo_edits({'op': 'insert_before', 'anchor': '<main', 'occurrence': 1,
+                                         'text': title_html})
                     
             elif '响应式设计' in description:
                 # 添加viewport meta标签
                 viewport_meta = '<meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
                 
-                if '<head>' in original_content:
-                    return original_content.replace('<head>', '<head>\n' + viewport_meta)
-                else:
-                    return viewport_meta + original_content
+                head = re.search(r'<head\b[^>]*>', original_content, re.IGNORECASE)
+                if head:
+                    return self._demo_edits({'op': 'insert_after', 'anchor': head.group(0), 'occurrence': 1,
+                                             'text': '\n' + viewport_meta})
+                return None
             
             # 如果没有特定的修复逻辑，返回原内容（表示无法修复）
             return None
@@ -521,6 +787,19 @@ class AIIntelligentFixEngine:
         except Exception as e:
             print(f"模拟修复失败: {e}")
             return None
+    
+    @staticmethod
+    def _demo_edits(*edits: Dict[str, Any]) -> str:
+        return json.dumps({'edits': list(edits)}, ensure_ascii=False)
+
+    @classmethod
+    def _demo_body_edit(cls, content: str, html: str) -> Optional[str]:
+        """插入到 <body> 开始标签之后；页面没有 <body> 时无法定位"""
+        body = re.search(r'<body\b[^>]*>', content, re.IGNORECASE)
+        if not body:
+            return None
+        return cls._demo_edits({'op': 'insert_after', 'anchor': body.group(0), 'occurrence': 1,
+                                'text': '\n' + html})
 
     def validate_fix(self, file_path: str, original_problem: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -533,8 +812,47 @@ class AIIntelligentFixEngine:
         Returns:
             验证结果
         """
+        # 重新读取修复后的文件
+        full_path = self.project_root / file_path
+        if not full_path.exists():
+            return {
+                'is_fixed': False,
+                'checked': False,
+                'confidence': 0.0,
+                'remaining_issues': ['文件不存在'],
+                'new_issues': [],
+                'recommendations': []
+            }
+        try:
+            with open(full_path, 'r', encoding='utf-8') as f:
+                fixed_content = f.read()
+        except Exception as e:
+            return {
+                'is_fixed': False,
+                'checked': False,
+                'confidence': 0.0,
+                'remaining_issues': [f'验证过程出错: {e}'],
+                'new_issues': [],
+                'recommendations': []
+            }
+        return self.validate_content(fixed_content, original_problem)
+    
+    def validate_content(self, fixed_content: str, original_problem: Dict[str, Any],
+                         fragment: bool = False) -> Dict[str, Any]:
+        """
+        验证修复后的内容（尚未写入磁盘的候选内容同样适用）
+        
+        Args:
+            fixed_content: 修复后的完整文件内容，或 fragment=True 时的被修改区域
+            original_problem: 原始问题信息
+            fragment: 只验证被修改区域，跳过整文件结构检查
+            
+        Returns:
+            验证结果；checked 表示该问题类型有对应的验证规则
+        """
         validation_result = {
             'is_fixed': False,
+            'checked': True,
             'confidence': 0.0,
             'remaining_issues': [],
             'new_issues': [],
@@ -542,15 +860,6 @@ class AIIntelligentFixEngine:
         }
         
         try:
-            # 重新读取修复后的文件
-            full_path = self.project_root / file_path
-            if not full_path.exists():
-                validation_result['remaining_issues'].append('文件不存在')
-                return validation_result
-            
-            with open(full_path, 'r', encoding='utf-8') as f:
-                fixed_content = f.read()
-            
             # 根据问题类型进行验证
             problem_type = original_problem.get('type', '')
             
@@ -566,8 +875,12 @@ class AIIntelligentFixEngine:
             elif '无障碍访问' in problem_type:
                 validation_result = self._validate_accessibility_fix(fixed_content, validation_result)
             
+            else:
+                validation_result['checked'] = False
+            
             # 通用验证
-            validation_result = self._validate_general_quality(fixed_content, validation_result)
+            if not fragment:
+                validation_result = self._validate_general_quality(fixed_content, validation_result)
             
         except Exception as e:
             validation_result['remaining_issues'].append(f'验证过程出错: {e}')
@@ -718,6 +1031,26 @@ class AIIntelligentFixEngine:
                 report += "\n"
         
         report += f"""
+## 上下文缓存
+
+- **命中**: {self.context_cache_stats['hits']}
+- **未命中**: {self.context_cache_stats['misses']}
+- **命中率**: {self.context_cache_stats['hits'] / max(self.context_cache_stats['hits'] + self.context_cache_stats['misses'], 1) * 100:.1f}%
+- **淘汰 / 失效**: {self.context_cache_stats['evictions']} / {self.context_cache_stats['invalidations']}
+
+## 提示词上下文
+
+- **提示词数**: {self.prompt_stats['prompts']}
+- **完整文件估算**: {self.prompt_stats['original_tokens']} tokens
+- **窗口化后估算**: {self.prompt_stats['window_tokens']} tokens
+- **缩减比例**: {(1 - self.prompt_stats['window_tokens'] / max(self.prompt_stats['original_tokens'], 1)) * 100:.1f}%
+
+## 响应缓存
+
+- **命中 / 未命中**: {self.response_cache.stats['hits']} / {self.response_cache.stats['misses']}
+- **重新验证未通过**: {self.response_cache.stats['rejected']}
+- **过期 / 淘汰**: {self.response_cache.stats['expired']} / {self.response_cache.stats['evicted']}
+
 ## 修复统计
 
 | 指标 | 数量 | 百分比 |
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI修复响应缓存
+
+同类问题（缺少面包屑、缺少 viewport 等）会在模板几乎相同的多个页面、多轮控制器循环中反复出现，
+每次都调用模型既慢又贵。本缓存：
+1. 键 = 规范化提示词（空白折叠，文件路径、页面层级与 token 估算等整页统计替换为占位符）
+   + 修复策略 + 模型版本 的哈希
+2. 响应中的文件路径同样以占位符保存，命中时替换为当前页面的路径
+3. 每个条目一个 JSON 文件（audit_reports/ai_response_cache/<键>.json），命中时更新 mtime；
+   条目有 TTL，总大小超过上限时按最近使用时间（mtime）淘汰
+只缓存锚定编辑 / 统一差异格式的响应：片段或完整文件形式的响应携带整段页面内容，
+而键只覆盖窗口化的提示词，复用到模板相同的其他页面会覆盖其正文。
+命中的响应必须由调用方重新验证（AIIntelligentFixEngine.validate_content）通过后才会应用，
+验证失败的条目会被删除。
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+from pathlib import Path
+from typing import Optional
+
+from atomic_io import write_text_atomic
+
+try:
+    from audit_config import AUDIT_DIR, AI_RESPONSE_CACHE_TTL, AI_RESPONSE_CACHE_MAX_BYTES
+except ImportError:
+    AUDIT_DIR = Path(__file__).resolve().parent / 'audit_reports'
+    AI_RESPONSE_CACHE_TTL = 7 * 24 * 3600
+    AI_RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+RESPONSE_CACHE_DIR = AUDIT_DIR / 'ai_response_cache'
+CACHE_VERSION = 1
+PATH_PLACEHOLDER = '{{file_path}}'
+WHITESPACE_RE = re.compile(r'\s+')
+# 提示词“页面层级”部分中随页面变化的行
+HIERARCHY_LINE_RE = re.compile(r'^- (页面层级|页面名称|所属模块|父级页面)：.*$', re.MULTILINE)
+# 整页统计信息（窗口/完整文件 token 估算、各类元素数量），只随页面大小变化，不影响修复内容
+WINDOW_STATS_RE = re.compile(r'约 \d+ tokens（完整文件约 \d+ tokens，缩减 -?\d+%）')
+COUNT_LINE_RE = re.compile(r'^- (导航元素数量|标题数量|交互元素数量|无障碍特性数量)：\d+$', re.MULTILINE)
+
+
+def normalize_prompt(prompt: str, file_path: str) -> str:
+    """规范化提示词：替换文件路径、页面层级与整页统计信息，折叠空白"""
+    if file_path:
+        prompt = prompt.replace(file_path, PATH_PLACEHOLDER)
+    prompt = HIERARCHY_LINE_RE.sub(lambda m: f'- {m.group(1)}：*', prompt)
+    prompt = WINDOW_STATS_RE.sub('约 * tokens', prompt)
+    prompt = COUNT_LINE_RE.sub(lambda m: f'- {m.group(1)}：*', prompt)
+    return WHITESPACE_RE.sub(' ', prompt).strip()
+
+
+def templatize(response: str, file_path: str) -> str:
+    """响应中的文件路径替换为占位符"""
+    return response.replace(file_path, PATH_PLACEHOLDER) if file_path else response
+
+
+def fill_template(template: str, file_path: str) -> str:
+    return template.replace(PATH_PLACEHOLDER, file_path) if file_path else template
+
+
+def cache_key(prompt: str, file_path: str, strategy: str, model_version: str) -> str:
+    normalized = normalize_prompt(prompt, file_path)
+    return hashlib.sha256(f'{model_version}\0{strategy}\0{normalized}'.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """持久化的 AI 响应缓存"""
+
+    def __init__(self, cache_dir: Path = RESPONSE_CACHE_DIR, ttl: float = AI_RESPONSE_CACHE_TTL,
+                 max_bytes: int = AI_RESPONSE_CACHE_MAX_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'rejected': 0, 'stored': 0, 'evicted': 0}
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f'{key}.json'
+
+    def get(self, key: str, file_path: str) -> Optional[str]:
+        """查询缓存，命中时返回替换好当前文件路径的响应"""
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            self.stats['misses'] += 1
+            return None
+        if entry.get('version') != CACHE_VERSION or time.time() - entry['created'] > self.ttl:
+            path.unlink(missing_ok=True)
+            self.stats['expired'] += 1
+            self.stats['misses'] += 1
+            return None
+        os.utime(path)  # mtime 作为最近使用时间
+        self.stats['hits'] += 1
+        return fill_template(entry['response'], file_path)
+
+    def put(self, key: str, response: str, file_path: str, strategy: str = ''):
+        write_text_atomic(self._path(key), json.dumps({
+            'version': CACHE_VERSION,
+            'strategy': strategy,
+            'created': time.time(),
+            'response': templatize(response, file_path),
+        }, ensure_ascii=False))
+        self.stats['stored'] += 1
+        self._evict()
+
+    def reject(self, key: str):
+        """命中的响应未通过重新验证：删除条目"""
+        path = self._path(key)
+        if path.exists():
+            path.unlink()
+            self.stats['rejected'] += 1
+
+    def _evict(self):
+        """总大小超过上限时，从最久未使用的条目开始删除"""
+        entries = [(p.stat().st_mtime, p.stat().st_size, p) for p in self.cache_dir.glob('*.json')]
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.stats['evicted'] += 1
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+医保审核系统静态资源打包与指纹化工具
+
+功能特性：
+1. 将页面中连续引用的本地样式表 / 脚本合并为一个文件（保持原有加载顺序）
+2. 合并结果按内容哈希命名（bundle.<hash>.css/js），可长期缓存，无需手工 ?v=3
+3. 简单压缩 CSS / JS（去注释、折叠空白），CSS 中的 url() 按新位置改写
+4. 页面引用原地改写，并以标记包裹；--restore 按清单还原为开发态引用
+资源路径解析与 ui_nav_audit_and_fix.py 共用 resource_paths.resolve_resource_path
+"""
+
+import re
+import json
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+# 导入公共配置
+try:
+    from audit_config import ROOT, ADMIN_DIR, BUILD_DIR, BUNDLE_BEGIN_MARK, BUNDLE_END_MARK
+except ImportError:
+    ROOT = Path(__file__).resolve().parent
+    ADMIN_DIR = ROOT / '1.0' / '超级管理员'
+    BUILD_DIR = ROOT / '1.0' / '构建产物'
+    BUNDLE_BEGIN_MARK = '<!-- asset-bundle:begin -->'
+    BUNDLE_END_MARK = '<!-- asset-bundle:end -->'
+
+from atomic_io import write_text_atomic
+from resource_paths import is_external, resolve_resource_path, relative_url, rewrite_css_urls
+from page_inventory import get_inventory, PAGE, TEST
+
+MANIFEST_NAME = 'manifest.json'
+
+# 仅打包"纯粹"的引用：<link rel="stylesheet" href> 与 <script src></script>，
+# 带 media / defer / async / type=module 等属性的标签保持原样
+LINK_TAG_RE = re.compile(
+    r'<link\s+(?:rel=["\']stylesheet["\']\s+href=["\']([^"\']+)["\']|href=["\']([^"\']+)["\']\s+rel=["\']stylesheet["\'])'
+    r'(?:\s+type=["\']text/css["\'])?\s*/?>',
+    re.IGNORECASE,
+)
+SCRIPT_TAG_RE = re.compile(
+    r'<script\s+src=["\']([^"\']+)["\'](?:\s+type=["\']text/javascript["\'])?\s*>\s*</script>',
+    re.IGNORECASE,
+)
+# 连续引用之间允许出现的内容（空白与HTML注释）
+GAP_RE = re.compile(r'^(?:\s|<!--(?!\s*asset-bundle)[\s\S]*?-->)*$')
+BUNDLE_BLOCK_RE = re.compile(re.escape(BUNDLE_BEGIN_MARK) + r'[\s\S]*?' + re.escape(BUNDLE_END_MARK))
+
+
+def minify_css(css: str) -> str:
+    """压缩CSS：去除注释、折叠空白（字符串内容保持不变）"""
+    parts = re.split(r'("(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)*\')', css)
+    out = []
+    for i, part in enumerate(parts):
+        if i % 2:
+            out.append(part)
+            continue
+        part = re.sub(r'/\*[\s\S]*?\*/', '', part)
+        part = re.sub(r'\s+', ' ', part)
+        part = re.sub(r'\s*([{};,>])\s*', r'\1', part)
+        part = part.replace(';}', '}')
+        out.append(part)
+    return ''.join(out).strip()
+
+
+def minify_js(code: str) -> str:
+    """保守压缩JS：去除注释、折叠空白；字符串/模板字符串/正则字面量原样保留，
+    含换行的空白保留为单个换行以免破坏自动分号插入"""
+    out = []
+    i, n = 0, len(code)
+    last_sig = ''  # 上一个有效（非空白）字符，用于区分除号与正则字面量
+    while i < n:
+        ch = code[i]
+        nxt = code[i + 1] if i + 1 < n else ''
+        if ch in '"\'`':
+            j = i + 1
+            while j < n and code[j] != ch:
+                j += 2 if code[j] == '\\' else 1
+            out.append(code[i:j + 1])
+            last_sig = ch
+            i = j + 1
+        elif ch == '/' and nxt == '/':
+            j = code.find('\n', i)
+            i = n if j == -1 else j
+        elif ch == '/' and nxt == '*':
+            j = code.find('*/', i + 2)
+            end = n if j == -1 else j + 2
+            if code.startswith('/*!', i):
+                out.append(code[i:end])  # 保留版权注释
+            i = end
+        elif ch == '/' and (not last_sig or last_sig in '(,=:[!&|?{};+-*%<>~^'):
+            j, in_class = i + 1, False
+            while j < n and code[j] != '\n':
+                if code[j] == '\\':
+                    j += 2
+                    continue
+                if code[j] == '[':
+                    in_class = True
+                elif code[j] == ']':
+                    in_class = False
+                elif code[j] == '/' and not in_class:
+                    break
+                j += 1
+            j += 1
+            while j < n and (code[j].isalnum() or code[j] == '_'):
+                j += 1  # 正则标志位
+            out.append(code[i:j])
+            last_sig = '/'
+            i = j
+        elif ch.isspace():
+            j = i
+            while j < n and code[j].isspace():
+                j += 1
+            if out:
+                out.append('\n' if '\n' in code[i:j] else ' ')
+            i = j
+        else:
+            out.append(ch)
+            last_sig = ch
+            i += 1
+    return re.sub(r'\n\s*\n+', '\n', ''.join(out)).strip()
+
+
+class AssetBundler:
+    """页面静态资源打包器"""
+
+    def __init__(self, admin_dir: Path = ADMIN_DIR, build_dir: Path = BUILD_DIR, dry_run: bool = False):
+        self.admin_dir = Path(admin_dir)
+        self.build_dir = Path(build_dir)
+        self.manifest_path = self.build_dir / MANIFEST_NAME
+        self.dry_run = dry_run
+        self.manifest = self._load_manifest()
+        self.stats = {'pages': 0, 'bundles_written': 0, 'requests_before': 0, 'requests_after': 0}
+
+    def _load_manifest(self) -> dict:
+        if self.manifest_path.exists():
+            try:
+                return json.loads(self.manifest_path.read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError):
+                print(f"⚠️  打包清单损坏，忽略: {self.manifest_path}")
+        return {'pages': {}, 'bundles': {}}
+
+    def _save_manifest(self):
+        if self.dry_run:
+            return
+        self.manifest['updated_at'] = datetime.now().isoformat()
+        self.build_dir.mkdir(parents=True, exist_ok=True)
+        write_text_atomic(self.manifest_path, json.dumps(self.manifest, ensure_ascii=False, indent=2))
+
+    def _page_key(self, page_path: Path) -> str:
+        return str(page_path.resolve().relative_to(ROOT))
+
+    def iter_pages(self) -> list:
+        """待处理页面：页面清单中的正式页面与测试页（排除组件片段与备份文件）"""
+        return sorted(get_inventory(self.admin_dir).paths(kinds=(PAGE, TEST)))
+
+    def _bundleable_path(self, page_path: Path, url: str, kind: str) -> Path | None:
+        """可打包的本地资源路径；外部资源、不存在或含 @import 的样式表返回 None"""
+        if is_external(url):
+            return None
+        path = resolve_resource_path(page_path, url)
+        if not path.is_file():
+            return None
+        if kind == 'css' and '@import' in path.read_text(encoding='utf-8', errors='ignore'):
+            return None
+        return path
+
+    def find_runs(self, page_path: Path, content: str) -> list:
+        """查找页面中连续的同类本地资源引用（仅由空白/注释分隔），返回 (kind, start, end, paths)"""
+        tags = []
+        for kind, pattern in (('css', LINK_TAG_RE), ('js', SCRIPT_TAG_RE)):
+            for m in pattern.finditer(content):
+                url = next(g for g in m.groups() if g)
+                tags.append((m.start(), m.end(), kind, self._bundleable_path(page_path, url, kind)))
+        tags.sort()
+
+        runs, current = [], []
+        for start, end, kind, path in tags:
+            contiguous = (
+                current and path is not None and current[-1][2] == kind
+                and GAP_RE.match(content[current[-1][1]:start])
+            )
+            if contiguous:
+                current.append((start, end, kind, path))
+                continue
+            if len(current) > 1:
+                runs.append(current)
+            current = [(start, end, kind, path)] if path is not None else []
+        if len(current) > 1:
+            runs.append(current)
+
+        return [(run[0][2], run[0][0], run[-1][1], [t[3] for t in run]) for run in runs]
+
+    def build_bundle(self, kind: str, sources: list) -> Path:
+        """合并并压缩资源，按内容哈希命名写入构建目录"""
+        chunks = []
+        for src in sources:
+            text = src.read_text(encoding='utf-8', errors='ignore')
+            if kind == 'css':
+                chunks.append(minify_css(rewrite_css_urls(text, src.parent, self.build_dir)))
+            else:
+                # 每个脚本以分号结尾，避免拼接后语句粘连
+                chunks.append(minify_js(text).rstrip(';') + ';')
+        payload = '\n'.join(chunks) + '\n'
+        digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:10]
+        bundle = self.build_dir / f'bundle.{digest}.{kind}'
+        if not bundle.exists() and not self.dry_run:
+            self.build_dir.mkdir(parents=True, exist_ok=True)
+            write_text_atomic(bundle, payload)
+            self.stats['bundles_written'] += 1
+        self.manifest['bundles'][bundle.name] = [str(s.relative_to(ROOT)) for s in sources]
+        return bundle
+
+    def bundle_page(self, page_path: Path) -> int:
+        """打包单个页面，返回减少的请求数"""
+        content = page_path.read_text(encoding='utf-8')
+        if BUNDLE_BEGIN_MARK in content:
+            # 已打包页面先还原，再按当前源文件重新打包
+            content = self._restore_content(page_path, content)
+
+        runs = self.find_runs(page_path, content)
+        if not runs:
+            return 0
+
+        blocks = []
+        new_content, cursor = [], 0
+        for kind, start, end, sources in runs:
+            bundle = self.build_bundle(kind, sources)
+            url = relative_url(bundle, page_path.parent)
+            tag = f'<link rel="stylesheet" href="{url}">' if kind == 'css' else f'<script src="{url}"></script>'
+            new_content.append(content[cursor:start])
+            new_content.append(f'{BUNDLE_BEGIN_MARK}{tag}{BUNDLE_END_MARK}')
+            cursor = end
+            blocks.append({'bundle': bundle.name, 'original': content[start:end]})
+        new_content.append(content[cursor:])
+
+        saved = sum(len(r[3]) - 1 for r in runs)
+        self.stats['requests_before'] += sum(len(r[3]) for r in runs)
+        self.stats['requests_after'] += len(runs)
+        self.manifest['pages'][self._page_key(page_path)] = blocks
+        if not self.dry_run:
+            write_text_atomic(page_path, ''.join(new_content))
+        print(f"📦 {page_path.relative_to(self.admin_dir)}: {len(runs)} 个合并包，减少 {saved} 个请求")
+        return saved
+
+    def _restore_content(self, page_path: Path, content: str) -> str:
+        """按清单将页面中的打包区块还原为原始引用"""
+        blocks = self.manifest['pages'].get(self._page_key(page_path), [])
+        matches = list(BUNDLE_BLOCK_RE.finditer(content))
+        if len(matches) != len(blocks):
+            print(f"⚠️  打包标记与清单不一致，跳过还原: {page_path}")
+            return content
+        for m, block in zip(reversed(matches), reversed(blocks)):
+            content = content[:m.start()] + block['original'] + content[m.end():]
+        return content
+
+    def run(self, pages: list = None) -> dict:
+        """打包全部（或指定）页面"""
+        for page_path in pages or self.iter_pages():
+            if self.bundle_page(page_path):
+                self.stats['pages'] += 1
+        self._save_manifest()
+        return self.stats
+
+    def restore(self, pages: list = None) -> int:
+        """还原为开发态引用，并清理构建产物"""
+        restored = 0
+        for page_path in pages or self.iter_pages():
+            content = page_path.read_text(encoding='utf-8')
+            if BUNDLE_BEGIN_MARK not in content:
+                continue
+            new_content = self._restore_content(page_path, content)
+            if new_content != content:
+                if not self.dry_run:
+                    write_text_atomic(page_path, new_content)
+                self.manifest['pages'].pop(self._page_key(page_path), None)
+                restored += 1
+                print(f"↩️  已还原: {page_path.relative_to(self.admin_dir)}")
+
+        if not self.manifest['pages'] and not self.dry_run:
+            for bundle in self.build_dir.glob('bundle.*'):
+                bundle.unlink()
+            if self.manifest_path.exists():
+                self.manifest_path.unlink()
+        else:
+            self._save_manifest()
+        return restored
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='医保审核系统静态资源打包与指纹化')
+    parser.add_argument('pages', nargs='*', help='仅处理指定页面（相对 超级管理员 目录），默认全部')
+    parser.add_argument('--restore', action='store_true', help='还原为开发态的独立引用并清理构建产物')
+    parser.add_argument('--dry-run', action='store_true', help='只输出计划，不写入文件')
+
+    args = parser.parse_args()
+
+    bundler = AssetBundler(dry_run=args.dry_run)
+    pages = [ADMIN_DIR / p for p in args.pages] or None
+
+    if args.restore:
+        restored = bundler.restore(pages)
+        print(f"\n✅ 已还原 {restored} 个页面")
+        return
+
+    stats = bundler.run(pages)
+    print(f"\n🎯 打包完成:")
+    print(f"   📄 改写页面: {stats['pages']} 个")
+    print(f"   📦 新生成合并包: {stats['bundles_written']} 个 -> {BUILD_DIR}")
+    print(f"   🌐 资源请求: {stats['requests_before']} -> {stats['requests_after']}")
+    if args.dry_run:
+        print("   ℹ️  dry-run 模式，未写入任何文件")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+原子文件写入
+
+各修复器原先直接 write_text 覆盖页面，进程中途退出会留下写了一半的文件；
+apply_ai_fix 更是先把原文件改名再写入。统一改为：
+1. 写入同目录下的隐藏临时文件并 fsync，再 os.replace 原子替换（保留原文件权限）
+2. 保留原文件的 UTF-8 BOM 与 CRLF 换行（read_text 读入时已被统一成 \\n）；
+   encode_like 给出实际写入的字节，供备份仓库记录与磁盘一致的版本
+3. 内容与磁盘上完全一致时不写入，避免无意义的 mtime 变化使浏览器缓存、
+   页面清单与打包缓存失效
+"""
+
+import os
+import codecs
+import tempfile
+from pathlib import Path
+
+
+def _fsync_dir(directory: Path):
+    """替换后同步目录项，保证掉电后改名结果可见（Windows 不支持，忽略）"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_bytes_atomic(path, data: bytes) -> bool:
+    """原子写入字节内容，返回是否实际写入（内容未变化时返回 False）"""
+    path = Path(path)
+    try:
+        current = path.read_bytes()
+    except OSError:
+        current = None
+    if current == data:
+        return False
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f'.{path.name}.', suffix='.tmp', dir=path.parent)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        if current is not None:
+            os.chmod(tmp_name, path.stat().st_mode & 0o7777)
+        else:
+            # mkstemp 创建的文件权限为 0600，新文件改为常规权限
+            umask = os.umask(0)
+            os.umask(umask)
+            os.chmod(tmp_name, 0o666 & ~umask)
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(path.parent)
+    return True
+
+
+def encode_like(path, text: str, encoding: str = 'utf-8', newline: str = None) -> bytes:
+    """
+    按磁盘上原文件的风格编码文本，即 write_text_atomic 实际写入的字节
+
+    newline 为 None 时沿用原文件的换行风格（CRLF / LF）；原文件带 UTF-8 BOM 时同样保留
+    """
+    path = Path(path)
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(64 * 1024)
+    except OSError:
+        head = b''
+
+    if newline is None:
+        newline = '\r\n' if b'\r\n' in head else '\n'
+    if newline != '\n':
+        text = text.replace('\r\n', '\n').replace('\n', newline)
+
+    data = text.encode(encoding)
+    if head.startswith(codecs.BOM_UTF8) and encoding.lower().replace('_', '-') == 'utf-8' \
+            and not data.startswith(codecs.BOM_UTF8):
+        data = codecs.BOM_UTF8 + data
+    return data
+
+
+def write_text_atomic(path, text: str, encoding: str = 'utf-8', newline: str = None) -> bool:
+    """原子写入文本（按 encode_like 保留原文件的换行风格与 BOM），返回是否实际写入"""
+    return write_bytes_atomic(path, encode_like(path, text, encoding, newline))
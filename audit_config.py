@@ -12,55 +12,32 @@ IMG_DIR = ROOT / 'img'
 LOG_DIR = IMG_DIR / 'logs'
 AUDIT_DIR = ROOT / 'audit_reports'
 COMMON_CSS = ROOT / '1.0' / '样式文件' / '通用样式.css'
+BUILD_DIR = ROOT / '1.0' / '构建产物'
 BASE_URL = 'http://localhost:8000/1.0/超级管理员'
 
-# 审查页面配置
-AUDIT_PAGES = {
-    '工作台': [
-        '工作台/平台运营看板.html', 
-        '工作台/报告规则分析.html',
-    ],
-    '审核管理': [
-        '审核管理/审核流程/事中审核检查.html',
-        '审核管理/审核流程/事前审核记录.html',
-        '审核管理/审核流程/事后审核任务列表.html',
-        '审核管理/审核结果/审核结果.html',
-    ],
-    '规则管理': [
-        '规则管理/规则操作/规则参数配置.html',
-        '规则管理/规则操作/创建规则.html',
-        '规则管理/规则操作/编辑规则.html',
-        '规则管理/规则操作/规则管理完整版.html',
-        '规则管理/规则列表/规则管理主页.html',
-        '规则管理/规则列表/门诊规则管理.html',
-        '规则管理/规则列表/医保规则管理系统v2.html',
-        '规则管理/规则详情/规则详情.html',
-        '规则管理/规则详情/门诊规则详情.html',
-        '规则管理/规则详情/临床规则详情.html',
-        '规则管理/规则详情/慢病规则详情.html',
-        '规则管理/规则详情/政策规则详情.html',
-    ],
-    '用户权限管理': [
-        '用户权限管理/用户管理/用户列表.html',
-        '用户权限管理/权限管理/权限管理.html',
-        '用户权限管理/组织管理/科室管理.html',
-        '用户权限管理/组织管理/企业详情.html',
-        '用户权限管理/组织管理/租户管理.html',
-        '用户权限管理/组织管理/租户表单.html',
-    ],
-    '系统管理': [
-        '系统管理/全局设置.html',
-        '系统管理/系统监控.html',
-    ],
-    '知识库': [
-        '系统管理/知识库目录.html?catalog=drug',
-        '系统管理/知识库目录.html?catalog=treatment',
-        '系统管理/知识库目录.html?catalog=material',
-    ],
-    '登录': [
-        '登录.html'
-    ]
-}
+# 审查页面列表由页面清单服务按目录与菜单自动生成：page_inventory.get_inventory().audit_pages()
+# 审查忽略清单（备份、测试页等）与近似重复页面判定阈值（MinHash 估计的 Jaccard 相似度）
+AUDIT_IGNORE_FILE = ROOT / '.auditignore'
+DUPLICATE_SIMILARITY = 0.9
+
+# 修复备份仓库（内容寻址 + 差异存储，隐藏目录不参与页面扫描）与保留的会话数
+BACKUP_DIR = ROOT / '.audit_backups'
+BACKUP_KEEP_SESSIONS = 20
+
+# AI修复提示词中页面上下文的 token 预算（超出时按修复策略只截取相关区域）
+AI_CONTEXT_TOKEN_BUDGET = 6000
+
+# AI修复模型调用（与控制器每轮最大修复数一致）：最大并发数、单次超时（秒）与失败重试次数
+AI_FIX_CONCURRENCY = 10
+AI_FIX_TIMEOUT = 60
+AI_FIX_RETRIES = 2
+
+# 控制器每轮修复的预计耗时预算（秒），调度器按 收益/成本 在预算内选择问题
+AI_FIX_CYCLE_BUDGET = 300
+
+# AI修复响应缓存：条目有效期（秒）与缓存目录总大小上限
+AI_RESPONSE_CACHE_TTL = 7 * 24 * 3600
+AI_RESPONSE_CACHE_MAX_BYTES = 32 * 1024 * 1024
 
 # 标准菜单结构配置
 STANDARD_MENU_STRUCTURE = {
@@ -140,7 +117,71 @@ STANDARD_MENU_STRUCTURE = {
     }
 }
 
+# 性能预算（统一审查在"性能"维度强制执行，超出预算时报告问题并附上与上次记录的差值）
+# 生效顺序：default <- modules[模块名] <- pages[相对 超级管理员 的页面路径]
+PERFORMANCE_BUDGETS = {
+    'default': {
+        # 静态指标（无需浏览器，直接读取文件）
+        'html_bytes': 100000,       # 页面HTML体积
+        'static_bytes': 400000,     # HTML + 引用的本地CSS/JS体积
+        # 浏览器指标
+        'ttfb_ms': 600,             # 首字节时间
+        'dcl_ms': 1500,             # DOMContentLoaded
+        'load_time_ms': 3000,       # load 事件结束
+        'lcp_ms': 2500,             # 最大内容绘制
+        'cls': 0.1,                 # 累积布局偏移
+        'total_blocking_ms': 300,   # 长任务阻塞时间（超出50ms部分之和）
+        'total_bytes': 1500000,     # 传输总字节
+        'request_count': 40,        # 请求数
+        'dom_nodes': 1500,          # DOM节点数
+        'sidebar_ready_ms': 1000,   # 侧边栏就绪耗时
+    },
+    'modules': {
+        # 规则管理详情页内联了大量规则配置数据
+        '规则管理': {'html_bytes': 160000, 'static_bytes': 500000, 'dom_nodes': 2500},
+    },
+    'pages': {},
+}
+
+# 性能回退判定容差：较上次变差需同时超过相对容差与该指标的绝对容差，
+# 避免运行间的正常波动使超预算问题在 P0 / P1 之间来回变化
+PERFORMANCE_REGRESSION_TOLERANCE = {
+    'relative': 0.1,
+    'absolute': {
+        'html_bytes': 2048,
+        'static_bytes': 4096,
+        'ttfb_ms': 50,
+        'dcl_ms': 100,
+        'load_time_ms': 100,
+        'lcp_ms': 100,
+        'cls': 0.02,
+        'total_blocking_ms': 50,
+        'total_bytes': 10240,
+        'request_count': 2,
+        'dom_nodes': 50,
+        'sidebar_ready_ms': 50,
+    },
+}
+
+
+def get_performance_budget(page_rel: str) -> dict:
+    """获取页面生效的性能预算（page_rel 为相对 超级管理员 目录的路径）"""
+    page_rel = page_rel.split('?')[0].replace('\\', '/')
+    module = page_rel.split('/')[0]
+    budget = dict(PERFORMANCE_BUDGETS['default'])
+    budget.update(PERFORMANCE_BUDGETS['modules'].get(module, {}))
+    budget.update(PERFORMANCE_BUDGETS['pages'].get(page_rel, {}))
+    return budget
+
 # 自动修复标记
 SIDEBAR_SNIPPET_MARK = '/* unified-sidebar: injected */'
 CHART_CSS_MARK = '/* ui_audit_and_fix: charts min-height */'
-UI_FIX_MARK = '/* ui_nav_audit_and_fix: auto-applied */'
\ No newline at end of file
+UI_FIX_MARK = '/* ui_nav_audit_and_fix: auto-applied */'
+
+# 资源打包标记（asset_bundler.py 改写的 <link>/<script> 区块，--restore 据此还原）
+BUNDLE_BEGIN_MARK = '<!-- asset-bundle:begin -->'
+BUNDLE_END_MARK = '<!-- asset-bundle:end -->'
+
+# 侧边栏构建期内联标记（sidebar_include.py 渲染的区块，--dev 据此还原为运行时加载）
+SIDEBAR_INCLUDE_BEGIN_MARK = '<!-- sidebar-include:begin -->'
+SIDEBAR_INCLUDE_END_MARK = '<!-- sidebar-include:end -->'
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+审查流水线的分阶段计时
+
+审查、截图、日志采集、静态检查、自动修复与报告生成原先都不计时，无法判断完整运行的时间花在哪里。
+本模块提供进程内的全局分析器 PROFILER（默认关闭，关闭时 span 几乎没有开销）：
+1. with PROFILER.span('阶段名', cat='page', page=...)：记录嵌套的阶段耗时，
+   嵌套关系保存在 contextvars 中，线程与 asyncio 任务各自独立
+2. @profiled('阶段名')：函数级 span
+3. timings_report()：按阶段汇总（次数 / 总耗时 / 自身耗时 / 最大耗时）、最慢页面与各模块耗时，写入 JSON 报告
+4. write_chrome_trace()：Chrome trace 格式（chrome://tracing、Perfetto 可直接打开）
+   write_folded()：折叠栈格式（flamegraph.pl、speedscope 可直接生成火焰图）
+
+unified_audit_system.py / ui_nav_audit_and_fix.py 的 --profile 参数开启分析并在结束时输出上述文件。
+"""
+
+import os
+import json
+import time
+import threading
+import contextvars
+import functools
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from atomic_io import write_text_atomic
+
+try:
+    from audit_config import AUDIT_DIR
+except ImportError:
+    AUDIT_DIR = Path(__file__).resolve().parent / 'audit_reports'
+
+
+@dataclass
+class _Frame:
+    name: str
+    child_ns: int = 0
+
+
+@dataclass
+class SpanRecord:
+    name: str
+    cat: str
+    start_ns: int
+    dur_ns: int
+    self_ns: int
+    tid: int
+    stack: tuple
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+_stack: contextvars.ContextVar = contextvars.ContextVar('audit_profiler_stack', default=())
+
+
+class Profiler:
+    """分阶段计时器"""
+
+    def __init__(self):
+        self.enabled = False
+        self.records: List[SpanRecord] = []
+        self.origin_ns = time.perf_counter_ns()
+        self._lock = threading.Lock()
+
+    def enable(self):
+        self.enabled = True
+        self.records = []
+        self.origin_ns = time.perf_counter_ns()
+
+    @contextmanager
+    def span(self, name: str, cat: str = 'phase', **args):
+        if not self.enabled:
+            yield
+            return
+        frame = _Frame(name)
+        parents = _stack.get()
+        token = _stack.set(parents + (frame,))
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            dur = time.perf_counter_ns() - start
+            _stack.reset(token)
+            if parents:
+                parents[-1].child_ns += dur
+            record = SpanRecord(name, cat, start - self.origin_ns, dur, max(dur - frame.child_ns, 0),
+                                threading.get_ident(), tuple(f.name for f in parents) + (name,),
+                                {k: str(v) for k, v in args.items()})
+            with self._lock:
+                self.records.append(record)
+
+    # ---------- 汇总 ----------
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """按阶段名汇总，按总耗时降序"""
+        phases: Dict[str, Dict[str, float]] = {}
+        for record in self.records:
+            stats = phases.setdefault(record.name, {'count': 0, 'total_ms': 0.0, 'self_ms': 0.0, 'max_ms': 0.0})
+            stats['count'] += 1
+            stats['total_ms'] += record.dur_ns / 1e6
+            stats['self_ms'] += record.self_ns / 1e6
+            stats['max_ms'] = max(stats['max_ms'], record.dur_ns / 1e6)
+        for stats in phases.values():
+            for key in ('total_ms', 'self_ms', 'max_ms'):
+                stats[key] = round(stats[key], 2)
+        return dict(sorted(phases.items(), key=lambda item: item[1]['total_ms'], reverse=True))
+
+    def timings_report(self, top: int = 10) -> Dict[str, Any]:
+        """JSON 报告中的耗时部分"""
+        if not self.records:
+            return {}
+        wall_ns = max(r.start_ns + r.dur_ns for r in self.records) - min(r.start_ns for r in self.records)
+
+        def spans_of(cat: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+            spans = sorted((r for r in self.records if r.cat == cat), key=lambda r: r.dur_ns, reverse=True)
+            return [dict(r.args, name=r.name, ms=round(r.dur_ns / 1e6, 2)) for r in spans[:limit]]
+
+        return {
+            'wall_ms': round(wall_ns / 1e6, 2),
+            'phases': self.summary(),
+            'slowest_pages': spans_of('page', top),
+            'modules': spans_of('module'),
+        }
+
+    def print_summary(self, top: int = 15):
+        phases = self.summary()
+        if not phases:
+            return
+        print(f"\n⏱️  分阶段耗时（前 {min(top, len(phases))} 项，按总耗时）:")
+        print(f"   {'阶段':<32} {'次数':>6} {'总耗时ms':>12} {'自身ms':>12} {'最大ms':>10}")
+        for name, stats in list(phases.items())[:top]:
+            print(f"   {name:<32} {stats['count']:>6} {stats['total_ms']:>12.1f} "
+                  f"{stats['self_ms']:>12.1f} {stats['max_ms']:>10.1f}")
+
+    # ---------- 输出 ----------
+
+    def write_chrome_trace(self, path: Path) -> Path:
+        """Chrome trace 事件格式（完整事件 ph=X，时间单位微秒）"""
+        pid = os.getpid()
+        events = [{
+            'name': r.name, 'cat': r.cat, 'ph': 'X', 'pid': pid, 'tid': r.tid,
+            'ts': r.start_ns / 1000, 'dur': r.dur_ns / 1000, 'args': r.args,
+        } for r in sorted(self.records, key=lambda r: r.start_ns)]
+        write_text_atomic(Path(path), json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'}, ensure_ascii=False))
+        return Path(path)
+
+    def write_folded(self, path: Path) -> Path:
+        """折叠栈格式：每行 “父;子;孙 自身耗时(微秒)”"""
+        folded: Dict[str, int] = {}
+        for r in self.records:
+            key = ';'.join(r.stack)
+            folded[key] = folded.get(key, 0) + r.self_ns // 1000
+        write_text_atomic(Path(path), ''.join(f'{stack} {us}\n' for stack, us in sorted(folded.items()) if us))
+        return Path(path)
+
+    def write_outputs(self, prefix: str) -> List[Path]:
+        """在 audit_reports 下写出 Chrome trace 与折叠栈文件，并打印汇总"""
+        if not self.records:
+            return []
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        paths = [
+            self.write_chrome_trace(AUDIT_DIR / f'{prefix}_profile_{stamp}.trace.json'),
+            self.write_folded(AUDIT_DIR / f'{prefix}_profile_{stamp}.folded'),
+        ]
+        self.print_summary()
+        print("   Chrome trace: " + str(paths[0]))
+        print("   火焰图（折叠栈）: " + str(paths[1]))
+        return paths
+
+
+PROFILER = Profiler()
+
+
+def span(name: str, cat: str = 'phase', **args):
+    return PROFILER.span(name, cat, **args)
+
+
+def profiled(name: Optional[str] = None, cat: str = 'phase'):
+    """函数级 span 装饰器"""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            with PROFILER.span(label, cat):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
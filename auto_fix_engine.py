@@ -22,6 +22,8 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from enum import Enum
 
+from atomic_io import write_text_atomic
+
 # 导入公共配置
 try:
     from audit_config import (
@@ -362,7 +364,7 @@ document.addEventListener('DOMContentLoaded', function() {{
         else:
             new_content = content + sidebar_script
         
-        page_path.write_text(new_content, encoding='utf-8')
+        write_text_atomic(page_path, new_content)
         
         return FixResult(
             issue_id=issue.id,
@@ -415,7 +417,7 @@ document.addEventListener('DOMContentLoaded', function() {{
         )
         
         if new_content != content:
-            page_path.write_text(new_content, encoding='utf-8')
+            write_text_atomic(page_path, new_content)
             return True
         
         return False
@@ -433,7 +435,7 @@ document.addEventListener('DOMContentLoaded', function() {{
   <rect width="120" height="40" fill="#1890ff" rx="4"/>
   <text x="60" y="25" text-anchor="middle" fill="white" font-family="Arial" font-size="14" font-weight="bold">医保审核</text>
 </svg>'''
-            logo_path.write_text(svg_content, encoding='utf-8')
+            write_text_atomic(logo_path, svg_content)
             return True
         
         return False
@@ -458,7 +460,7 @@ document.addEventListener('DOMContentLoaded', function() {{
 '''
         
         new_content = content + chart_css
-        self.common_css.write_text(new_content, encoding='utf-8')
+        write_text_atomic(self.common_css, new_content)
         return True
 
 
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+修复备份仓库（内容寻址）
+
+AIIntelligentFixEngine.apply_ai_fix 原先把原文件重命名为同目录下的 *.backup_<时间戳>，
+每次修复都保存一份完整副本，并且备份文件会被页面扫描、快照与打包重复读到。
+现在统一存入项目根目录下的隐藏目录 .audit_backups/：
+1. objects/   按内容 sha256 寻址的 zlib 压缩对象，相同内容只存一份
+2. 同一文件的后续版本以行级差异（相对上一版本）存储，差异链长度有上限
+3. sessions/  每次修复会话一个清单，记录每个文件修复前后的内容哈希（AI修复还记录每处编辑）
+4. rollback() 一条命令回滚整个会话；prune() 只保留最近的若干会话并清理无引用对象
+
+命令行：
+    python backup_store.py list
+    python backup_store.py show <会话ID>
+    python backup_store.py rollback <会话ID>
+    python backup_store.py prune [--keep N]
+    python backup_store.py import-legacy    # 把树中遗留的 *.backup_* 文件收入仓库
+"""
+
+import sys
+import json
+import zlib
+import difflib
+import hashlib
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from atomic_io import write_bytes_atomic, write_text_atomic
+
+try:
+    from audit_config import ROOT, BACKUP_DIR, BACKUP_KEEP_SESSIONS
+except ImportError:
+    ROOT = Path(__file__).resolve().parent
+    BACKUP_DIR = ROOT / '.audit_backups'
+    BACKUP_KEEP_SESSIONS = 20
+
+FULL = b'F'
+DELTA = b'D'
+MAX_DELTA_CHAIN = 8
+# 差异压缩后不到完整对象的该比例时才按差异存储
+DELTA_RATIO = 0.5
+LEGACY_PATTERN = '*.backup_*'
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _line_delta(base: bytes, data: bytes) -> Optional[list]:
+    """行级差异：[起, 止] 表示复用基准版本的行区间，字符串表示新增内容；非文本返回 None"""
+    try:
+        base_lines = base.decode('utf-8').splitlines(keepends=True)
+        new_lines = data.decode('utf-8').splitlines(keepends=True)
+    except UnicodeDecodeError:
+        return None
+    ops = []
+    matcher = difflib.SequenceMatcher(None, base_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j2 > j1:
+            ops.append(''.join(new_lines[j1:j2]))
+    return ops
+
+
+def _apply_delta(base: bytes, ops: list) -> bytes:
+    base_lines = base.decode('utf-8').splitlines(keepends=True)
+    parts = [''.join(base_lines[op[0]:op[1]]) if isinstance(op, list) else op for op in ops]
+    return ''.join(parts).encode('utf-8')
+
+
+class BackupStore:
+    """内容寻址的备份仓库"""
+
+    def __init__(self, store_dir: Path = BACKUP_DIR, root: Path = ROOT):
+        self.store_dir = Path(store_dir)
+        self.root = Path(root)
+        self.objects_dir = self.store_dir / 'objects'
+        self.sessions_dir = self.store_dir / 'sessions'
+        self.refs_file = self.store_dir / 'refs.json'
+        self._refs = None  # 相对路径 -> 最近一次存储的内容哈希（差异基准）
+
+    # ---------- 对象 ----------
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def has(self, digest: str) -> bool:
+        return self._object_path(digest).exists()
+
+    def put(self, data: bytes, base: Optional[str] = None) -> str:
+        """存入内容并返回哈希；已存在则直接复用。给出 base 时尝试按差异存储"""
+        digest = content_hash(data)
+        path = self._object_path(digest)
+        if path.exists():
+            return digest
+        payload = FULL + zlib.compress(data, 9)
+        if base and base != digest and self.has(base) and self._chain_depth(base) < MAX_DELTA_CHAIN:
+            ops = _line_delta(self.get(base), data)
+            if ops is not None:
+                delta = DELTA + base.encode('ascii') + zlib.compress(
+                    json.dumps(ops, ensure_ascii=False, separators=(',', ':')).encode('utf-8'), 9)
+                if len(delta) < len(payload) * DELTA_RATIO:
+                    payload = delta
+        write_bytes_atomic(path, payload)
+        return digest
+
+    def _read_raw(self, digest: str):
+        raw = self._object_path(digest).read_bytes()
+        if raw[:1] == DELTA:
+            return raw[1:65].decode('ascii'), raw[65:]
+        return None, raw[1:]
+
+    def _chain_depth(self, digest: str) -> int:
+        depth = 0
+        base, _ = self._read_raw(digest)
+        while base:
+            depth += 1
+            base, _ = self._read_raw(base)
+        return depth
+
+    def get(self, digest: str) -> bytes:
+        base, body = self._read_raw(digest)
+        if base is None:
+            return zlib.decompress(body)
+        return _apply_delta(self.get(base), json.loads(zlib.decompress(body).decode('utf-8')))
+
+    # ---------- 差异基准 ----------
+
+    def _load_refs(self) -> Dict[str, str]:
+        if self._refs is None:
+            try:
+                self._refs = json.loads(self.refs_file.read_text(encoding='utf-8'))
+            except (OSError, ValueError):
+                self._refs = {}
+        return self._refs
+
+    def _save_refs(self):
+        write_text_atomic(self.refs_file, json.dumps(self._load_refs(), ensure_ascii=False, indent=2))
+
+    def _rel(self, file_path: Path) -> str:
+        file_path = Path(file_path)
+        try:
+            return file_path.resolve().relative_to(self.root.resolve()).as_posix()
+        except ValueError:
+            return file_path.as_posix()
+
+    def store_version(self, file_path: Path, data: bytes) -> str:
+        """存入某个文件的一个版本，以该文件上一次存储的版本为差异基准"""
+        rel = self._rel(file_path)
+        refs = self._load_refs()
+        digest = self.put(data, base=refs.get(rel))
+        refs[rel] = digest
+        return digest
+
+    # ---------- 会话 ----------
+
+    def begin_session(self, session_id: str = None) -> 'BackupSession':
+        return BackupSession(self, session_id or datetime.now().strftime('%Y%m%d_%H%M%S'))
+
+    def _manifest_path(self, session_id: str) -> Path:
+        return self.sessions_dir / f'{session_id}.json'
+
+    def load_manifest(self, session_id: str) -> dict:
+        return json.loads(self._manifest_path(session_id).read_text(encoding='utf-8'))
+
+    def sessions(self) -> List[str]:
+        if not self.sessions_dir.exists():
+            return []
+        return sorted(p.stem for p in self.sessions_dir.glob('*.json'))
+
+    def rollback(self, session_id: str, dry_run: bool = False) -> List[str]:
+        """把会话中修改过的文件恢复到会话开始前的内容；会话中新建的文件会被删除"""
+        manifest = self.load_manifest(session_id)
+        originals = {}
+        for entry in manifest['entries']:
+            originals.setdefault(entry['path'], entry['before'])
+        restored = []
+        for rel, before in originals.items():
+            target = self.root / rel
+            if not dry_run:
+                if before is None:
+                    if target.exists():
+                        target.unlink()
+                else:
+                    write_bytes_atomic(target, self.get(before))
+            restored.append(rel)
+        if not dry_run:
+            manifest['rolled_back_at'] = datetime.now().isoformat()
+            write_text_atomic(self._manifest_path(session_id), json.dumps(manifest, ensure_ascii=False, indent=2))
+        return restored
+
+    def prune(self, keep: int = BACKUP_KEEP_SESSIONS) -> dict:
+        """只保留最近 keep 个会话，删除不再被引用的对象（差异基准随引用对象保留）"""
+        sessions = self.sessions()
+        removed_sessions = sessions[:-keep] if keep > 0 else sessions
+        for session_id in removed_sessions:
+            self._manifest_path(session_id).unlink()
+
+        live = set(self._load_refs().values())
+        for session_id in self.sessions():
+            for entry in self.load_manifest(session_id)['entries']:
+                live.update(h for h in (entry['before'], entry['after']) if h)
+        pending = list(live)
+        while pending:
+            digest = pending.pop()
+            if not self.has(digest):
+                continue
+            base, _ = self._read_raw(digest)
+            if base and base not in live:
+                live.add(base)
+                pending.append(base)
+
+        removed_objects, freed = 0, 0
+        if self.objects_dir.exists():
+            for path in self.objects_dir.glob('*/*'):
+                if path.parent.name + path.name not in live:
+                    freed += path.stat().st_size
+                    path.unlink()
+                    removed_objects += 1
+        self._refs = {rel: h for rel, h in self._load_refs().items() if self.has(h)}
+        self._save_refs()
+        return {'sessions': len(removed_sessions), 'objects': removed_objects, 'bytes': freed}
+
+    def stats(self) -> dict:
+        objects = list(self.objects_dir.glob('*/*')) if self.objects_dir.exists() else []
+        deltas = sum(1 for p in objects if p.read_bytes()[:1] == DELTA)
+        return {
+            'sessions': len(self.sessions()),
+            'objects': len(objects),
+            'delta_objects': deltas,
+            'bytes': sum(p.stat().st_size for p in objects),
+        }
+
+
+class BackupSession:
+    """一次修复会话：记录每个文件修复前后的版本，结束时写出清单"""
+
+    def __init__(self, store: BackupStore, session_id: str):
+        self.store = store
+        self.session_id = session_id
+        self.manifest = {
+            'session': session_id,
+            'started_at': datetime.now().isoformat(),
+            'entries': [],
+        }
+
+    def record(self, file_path: Path, new_content: bytes, edits: Optional[List[dict]] = None) -> dict:
+        """写入新内容之前调用：保存当前版本与新版本（以及本次的编辑操作），返回清单条目"""
+        file_path = Path(file_path)
+        before = self.store.store_version(file_path, file_path.read_bytes()) if file_path.exists() else None
+        after = self.store.store_version(file_path, new_content)
+        entry = {
+            'path': self.store._rel(file_path),
+            'before': before,
+            'after': after,
+            'timestamp': datetime.now().isoformat(),
+        }
+        if edits is not None:
+            entry['edits'] = edits
+        self.manifest['entries'].append(entry)
+        self.save()
+        return entry
+
+    def save(self):
+        """每条记录后立即落盘，进程中途退出时清单依然可用于回滚"""
+        write_text_atomic(self.store._manifest_path(self.session_id), json.dumps(self.manifest, ensure_ascii=False, indent=2))
+        self.store._save_refs()
+
+    def rollback(self) -> List[str]:
+        return self.store.rollback(self.session_id)
+
+
+def import_legacy_backups(store: BackupStore, search_dir: Path = None) -> int:
+    """把遗留的 *.backup_<时间戳> 文件收入仓库（作为对应文件的 before 版本）并从树中删除"""
+    search_dir = Path(search_dir or store.root / '1.0')
+    legacy = sorted(p for p in search_dir.rglob(LEGACY_PATTERN) if p.is_file())
+    if not legacy:
+        return 0
+    session = store.begin_session('legacy_' + datetime.now().strftime('%Y%m%d_%H%M%S'))
+    for backup in legacy:
+        original = backup.with_name(backup.name.split('.backup_', 1)[0])
+        data = backup.read_bytes()
+        entry = {
+            'path': store._rel(original),
+            'before': store.store_version(original, data),
+            'after': store.store_version(original, original.read_bytes()) if original.exists() else None,
+            'timestamp': datetime.now().isoformat(),
+            'legacy_file': store._rel(backup),
+        }
+        session.manifest['entries'].append(entry)
+        session.save()
+        backup.unlink()
+    return len(legacy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='修复备份仓库')
+    sub = parser.add_subparsers(dest='command')
+    sub.add_parser('list', help='列出会话')
+    show = sub.add_parser('show', help='查看会话清单')
+    show.add_argument('session')
+    rollback = sub.add_parser('rollback', help='回滚整个会话')
+    rollback.add_argument('session')
+    rollback.add_argument('--dry-run', action='store_true', help='只列出将恢复的文件')
+    prune = sub.add_parser('prune', help='清理旧会话与无引用对象')
+    prune.add_argument('--keep', type=int, default=BACKUP_KEEP_SESSIONS)
+    sub.add_parser('import-legacy', help='收入树中遗留的 *.backup_* 文件')
+    args = parser.parse_args()
+
+    store = BackupStore()
+    if args.command == 'show':
+        manifest = store.load_manifest(args.session)
+        print(f"🗂️  会话 {args.session}（开始于 {manifest['started_at']}）")
+        for entry in manifest['entries']:
+            before = entry['before'][:10] if entry['before'] else '新建'
+            edits = f"（{len(entry['edits'])} 处编辑）" if entry.get('edits') else ''
+            print(f"   {entry['path']}: {before} -> {entry['after'][:10] if entry['after'] else '删除'}{edits}")
+    elif args.command == 'rollback':
+        restored = store.rollback(args.session, dry_run=args.dry_run)
+        action = '将恢复' if args.dry_run else '已恢复'
+        print(f"⏪ {action} {len(restored)} 个文件（会话 {args.session}）")
+        for rel in restored:
+            print(f"   - {rel}")
+    elif args.command == 'prune':
+        result = store.prune(args.keep)
+        print(f"🧹 删除会话 {result['sessions']} 个, 对象 {result['objects']} 个, "
+              f"释放 {result['bytes'] / 1024:.1f}KB")
+    elif args.command == 'import-legacy':
+        count = import_legacy_backups(store)
+        print(f"📥 已收入遗留备份文件 {count} 个")
+    else:
+        stats = store.stats()
+        print(f"🗂️  备份仓库: {store.store_dir}")
+        print(f"   会话: {stats['sessions']} | 对象: {stats['objects']}（差异 {stats['delta_objects']}）"
+              f" | 占用: {stats['bytes'] / 1024:.1f}KB")
+        for session_id in store.sessions():
+            manifest = store.load_manifest(session_id)
+            flag = ' (已回滚)' if manifest.get('rolled_back_at') else ''
+            print(f"   - {session_id}: {len(manifest['entries'])} 个文件{flag}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -9,6 +9,8 @@
 from pathlib import Path
 import re
 
+from atomic_io import write_text_atomic
+
 # 页面 -> 专属样式 映射
 PAGE_STYLE_MAP = {
     # 工作台模块
@@ -51,14 +53,16 @@ def fix_page_specific_styles():
     print('开始批量修复页面专属样式引用...')
     print('=' * 60)
 
-    for html_file in ADMIN_DIR.rglob('*.html'):
-        # 跳过测试页等
-        if html_file.name == 'page-test.html':
-            continue
-        if html_file.name not in PAGE_STYLE_MAP:
+    # 页面清单已按 PAGE_STYLE_MAP 附加专属样式（延迟导入：page_inventory 依赖本模块的映射表）
+    from page_inventory import get_inventory
+
+    # 只处理正式页面（跳过测试页、组件片段与备份文件）
+    for entry in get_inventory(ADMIN_DIR).pages():
+        if not entry.page_style:
             continue
 
-        style_name = PAGE_STYLE_MAP[html_file.name]
+        html_file = ADMIN_DIR / entry.path
+        style_name = entry.page_style
         style_path = STYLES_DIR / style_name
         if not style_path.exists():
             print(f'⚠️ 样式文件不存在: {style_name} (页面: {html_file})')
@@ -89,7 +93,7 @@ def fix_page_specific_styles():
 
             insert_pos = m.end()
             new_content = content[:insert_pos] + style_link + content[insert_pos:]
-            html_file.write_text(new_content, encoding='utf-8')
+            write_text_atomic(html_file, new_content)
             print(f'✅ 成功添加专属样式: {html_file.name} -> {style_name}')
             success += 1
         except Exception as e:
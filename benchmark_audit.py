@@ -0,0 +1,517 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+审查与修复吞吐量基准测试
+
+修改 UnifiedAuditSystem、fix_strategies 或 UINavAuditor 后，无法判断整体变快还是变慢。本脚本：
+1. 按真实页面模板生成可伸缩的合成页面库（100 ~ 10000 个页面）：
+   侧边栏容器与加载脚本、面包屑、表单、图表、大段内联脚本与样式，
+   并按固定比例注入常见问题（缺面包屑 / 标题 / viewport / 加载状态 / 提交按钮），让修复器有活可干
+2. 离线测量（不启动浏览器）：
+   - 静态审查吞吐（UnifiedAuditSystem 静态审查、UINavAuditor 静态检查，页面/秒）
+   - 修复会话吞吐（auto_fix_issues，含模板修复传播，页面/秒）
+   - 报告生成耗时（Markdown / JSON）
+   - 各阶段结束时的峰值 RSS
+3. 结果写入 audit_reports/benchmarks/，带提交号，--compare 与之前的结果逐项对比
+
+多个规模时每个规模在独立子进程中运行，峰值 RSS 互不影响。
+合成页面库位于临时目录，修复器的输出目录（通用CSS、面包屑根目录）在运行期间指向该目录，不会改动真实页面。
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import platform
+import argparse
+import tempfile
+import subprocess
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 导入公共配置
+try:
+    from audit_config import ROOT, ADMIN_DIR, AUDIT_DIR, COMMON_CSS
+except ImportError:
+    ROOT = Path(__file__).resolve().parent
+    ADMIN_DIR = ROOT / '1.0' / '超级管理员'
+    AUDIT_DIR = ROOT / 'audit_reports'
+    COMMON_CSS = ROOT / '1.0' / '样式文件' / '通用样式.css'
+
+from audit_profiler import PROFILER
+
+BENCHMARK_DIR = AUDIT_DIR / 'benchmarks'
+DEFAULT_SIZES = [100, 1000]
+
+# 合成页面库的模块与子目录（与真实菜单结构一致的层级深度）
+CORPUS_MODULES = {
+    '规则管理': ['规则列表', '规则详情', '规则操作'],
+    '审核管理': ['审核流程', '审核结果'],
+    '用户权限管理': ['用户管理', '组织管理'],
+    '工作台': [''],
+    '系统管理': ['系统设置'],
+    '慢病管理': ['慢病档案'],
+}
+PAGE_TEMPLATES = ('list', 'form', 'dashboard', 'detail')
+# 注入问题的比例
+DEFECT_RATES = {
+    'breadcrumb': 0.3,
+    'title': 0.1,
+    'viewport': 0.15,
+    'loading': 0.25,
+    'submit': 0.2,
+}
+# 从真实项目复制到页面库中的共享文件（相对 1.0 目录）
+SHARED_FILES = [
+    '样式文件/通用样式.css',
+    '超级管理员/样式文件/通用样式.css',
+    '超级管理员/样式文件/unified-sidebar.css',
+    '超级管理员/组件/_unified-sidebar.html',
+]
+
+SIDEBAR_LOADER = '''
+    <!-- 加载统一菜单组件 -->
+    <script>
+        // 加载统一侧边栏
+        fetch('{prefix}组件/_unified-sidebar.html')
+            .then(response => response.text())
+            .then(html => {{
+                const sidebarContainer = document.getElementById('sidebar-container');
+                sidebarContainer.innerHTML = html;
+                // 手动执行插入的脚本
+                sidebarContainer.querySelectorAll('script').forEach(script => {{
+                    const newScript = document.createElement('script');
+                    newScript.textContent = script.textContent;
+                    document.head.appendChild(newScript);
+                    script.remove();
+                }});
+                setTimeout(() => {{
+                    if (typeof initSidebar === 'function') {{
+                        initSidebar();
+                    }}
+                }}, 100);
+            }})
+            .catch(error => console.error('Error loading sidebar:', error));
+    </script>'''
+
+
+# ---------- 合成页面库 ----------
+
+def _inline_style(rng: random.Random, blocks: int, loading: bool) -> str:
+    rules = []
+    for i in range(blocks):
+        rules.append(f'''        .block-{i} {{
+            margin: {rng.randint(0, 24)}px;
+            padding: {rng.randint(4, 24)}px;
+            border-radius: {rng.randint(2, 8)}px;
+            color: #{rng.randint(0, 0xFFFFFF):06x};
+        }}''')
+    if loading:
+        rules.append('''        .loading-spinner {
+            display: none;
+            width: 24px;
+            height: 24px;
+            border: 3px solid #e8e8e8;
+        }''')
+    return '\n'.join(rules)
+
+
+def _inline_script(rng: random.Random, functions: int) -> str:
+    body = []
+    for i in range(functions):
+        field = rng.choice(['status', 'amount', 'ruleName', 'deptName', 'createdAt'])
+        body.append(f'''        function handleRow{i}(row) {{
+            const value = row.{field} || '';
+            if (value.length > {rng.randint(4, 64)}) {{
+                return value.slice(0, {rng.randint(4, 32)}) + '...';
+            }}
+            return value;
+        }}''')
+    return '\n'.join(body)
+
+
+def _page_content(rng: random.Random, template: str, defects: set) -> str:
+    rows = rng.randint(5, 40)
+    if template == 'list':
+        cells = '\n'.join(
+            f'                    <tr><td>R{i:04d}</td><td>规则{i}</td><td>启用</td>'
+            f'<td><button class="btn-link" title="编辑">编辑</button></td></tr>'
+            for i in range(rows)
+        )
+        return f'''            <form class="search-form">
+                <input type="text" name="keyword" placeholder="请输入关键字" required>
+                <button type="submit" class="btn-primary">查询</button>
+            </form>
+            <table class="data-table">
+                <thead><tr><th>编号</th><th>名称</th><th>状态</th><th>操作</th></tr></thead>
+                <tbody>
+{cells}
+                </tbody>
+            </table>'''
+    if template == 'form':
+        groups = '\n'.join(f'''                <div class="form-group">
+                    <label for="field{i}">字段{i}</label>
+                    <input type="text" id="field{i}" name="field{i}" required>
+                </div>''' for i in range(rows // 4 + 2))
+        submit = '' if 'submit' in defects else \
+            '\n                <button type="submit" class="btn-primary" aria-label="保存">保存</button>'
+        return f'''            <form id="mainForm" class="edit-form">
+{groups}{submit}
+            </form>'''
+    if template == 'dashboard':
+        charts = '\n'.join(f'''            <div class="chart-card">
+                <div class="chart-title">指标{i}</div>
+                <canvas id="chart{i}" class="chart-container"></canvas>
+            </div>''' for i in range(rng.randint(2, 6)))
+        return f'''            <div class="chart-grid">
+{charts}
+            </div>'''
+    items = '\n'.join(f'                <div class="info-item"><span>属性{i}</span><span>值{i}</span></div>'
+                      for i in range(rows))
+    return f'''            <div class="info-grid">
+{items}
+            </div>'''
+
+
+def render_page(rng: random.Random, title: str, depth: int) -> str:
+    """按真实页面模板生成一个页面（depth 为页面相对 超级管理员 目录的层级）"""
+    template = rng.choice(PAGE_TEMPLATES)
+    defects = {name for name, rate in DEFECT_RATES.items() if rng.random() < rate}
+    prefix = '../' * depth
+    viewport = '' if 'viewport' in defects else \
+        '\n    <meta name="viewport" content="width=device-width, initial-scale=1.0">'
+    header = '' if 'title' in defects else f'''            <div class="header">
+                <h1 id="pageTitle">{title}</h1>
+            </div>
+'''
+    breadcrumb = '' if 'breadcrumb' in defects else f'''            <div class="breadcrumb">
+                <a href="{prefix}工作台/平台运营看板.html">首页</a>
+                <span>></span>
+                <span>{title}</span>
+            </div>
+'''
+    loading = 'loading' not in defects
+    data_script = ''
+    if template in ('list', 'dashboard'):
+        show = "document.querySelector('.loading-spinner').style.display = 'block';\n            " if loading else ''
+        data_script = f'''
+        function loadData() {{
+            {show}fetch('/api/{template}/data')
+                .then(response => response.json())
+                .then(data => render(data))
+                .catch(error => console.error(error));
+        }}'''
+    return f'''<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">{viewport}
+    <title>{title} - 医保审核系统</title>
+    <link rel="stylesheet" href="{prefix}样式文件/通用样式.css">
+    <link rel="stylesheet" href="{prefix}样式文件/unified-sidebar.css">
+    <style>
+{_inline_style(rng, rng.randint(20, 120), loading)}
+    </style>
+</head>
+<body>
+    <!-- 主容器 -->
+    <div class="main-container">
+        <!-- 统一左侧菜单 -->
+        <div id="sidebar-container"></div>
+
+        <!-- 页面内容 -->
+        <div class="page-content">
+            <div class="container">
+{header}{breadcrumb}{_page_content(rng, template, defects)}
+            </div>
+        </div>
+    </div>
+
+    <script>
+{_inline_script(rng, rng.randint(20, 200))}{data_script}
+    </script>
+{SIDEBAR_LOADER.format(prefix=prefix)}
+</body>
+</html>
+'''
+
+
+def generate_corpus(root: Path, pages: int, seed: int = 0) -> Dict[str, Any]:
+    """在 root 下生成 1.0/超级管理员 结构的合成页面库"""
+    rng = random.Random(seed)
+    root = Path(root)
+    source_root = ROOT / '1.0'
+    for rel in SHARED_FILES:
+        target = root / '1.0' / rel
+        target.parent.mkdir(parents=True, exist_ok=True)
+        source = source_root / rel
+        if source.is_file():
+            shutil.copyfile(source, target)
+        else:
+            target.write_text('', encoding='utf-8')
+
+    admin_dir = root / '1.0' / '超级管理员'
+    directories = [(module, sub) for module, subs in CORPUS_MODULES.items() for sub in subs]
+    total_bytes = 0
+    for i in range(pages):
+        module, sub = directories[i % len(directories)]
+        page_dir = admin_dir / module / sub if sub else admin_dir / module
+        page_dir.mkdir(parents=True, exist_ok=True)
+        title = f'{sub or module}{i:05d}'
+        depth = len(page_dir.relative_to(admin_dir).parts)
+        content = render_page(rng, title, depth)
+        (page_dir / f'{title}.html').write_text(content, encoding='utf-8')
+        total_bytes += len(content.encode('utf-8'))
+    return {'pages': pages, 'bytes': total_bytes, 'seed': seed}
+
+
+def corpus_pages(root: Path) -> List[Path]:
+    admin_dir = Path(root) / '1.0' / '超级管理员'
+    return sorted(p for module in CORPUS_MODULES for p in (admin_dir / module).rglob('*.html'))
+
+
+# ---------- 测量 ----------
+
+def peak_rss_mb() -> Optional[float]:
+    """进程峰值 RSS（MB）；平台不支持时返回 None"""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux 单位为 KB，macOS 为字节
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    try:
+        import psutil
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+    except (ImportError, AttributeError):
+        return None
+
+
+@contextmanager
+def _quiet():
+    """屏蔽被测代码的逐页输出"""
+    with open(os.devnull, 'w', encoding='utf-8') as devnull, redirect_stdout(devnull):
+        yield
+
+
+@contextmanager
+def _redirect_fixers(root: Path):
+    """修复器的面包屑根目录与通用CSS在运行期间指向合成页面库"""
+    from fix_strategies import FIX_STRATEGIES
+    import fix_planner
+
+    admin_dir = Path(root) / '1.0' / '超级管理员'
+    common_css = Path(root) / '1.0' / COMMON_CSS.relative_to(ROOT / '1.0')
+    fixers = {id(fn.__self__): fn.__self__ for fn in FIX_STRATEGIES.values() if hasattr(fn, '__self__')}
+    fixers[id(fix_planner._business)] = fix_planner._business
+    saved = [(fixer, dict(vars(fixer))) for fixer in fixers.values()]
+    for fixer in fixers.values():
+        if hasattr(fixer, 'admin_dir'):
+            fixer.admin_dir = admin_dir
+        if hasattr(fixer, 'common_css'):
+            fixer.common_css = common_css
+    try:
+        yield
+    finally:
+        for fixer, attrs in saved:
+            vars(fixer).update(attrs)
+
+
+def _phase(results: Dict[str, Any], name: str, seconds: float, pages: Optional[int] = None):
+    entry = {'seconds': round(seconds, 3), 'peak_rss_mb': peak_rss_mb()}
+    if pages is not None:
+        entry['pages_per_s'] = round(pages / seconds, 1) if seconds else None
+    results[name] = entry
+    rate = f", {entry['pages_per_s']} 页/秒" if pages is not None else ''
+    print(f"   {name:<16} {seconds:>8.2f}s{rate}（峰值RSS {entry['peak_rss_mb']} MB）")
+
+
+def run_benchmark(pages: int, seed: int = 0, keep: bool = False) -> Dict[str, Any]:
+    """生成指定规模的页面库并依次测量各阶段"""
+    from unified_audit_system import UnifiedAuditSystem, ModuleAuditResult
+    from page_inventory import get_inventory
+
+    root = Path(tempfile.mkdtemp(prefix='audit_bench_'))
+    print(f"\n📦 合成页面库: {pages} 个页面 -> {root}")
+    phases: Dict[str, Any] = {}
+    try:
+        start = time.perf_counter()
+        corpus = generate_corpus(root, pages, seed)
+        _phase(phases, 'generate', time.perf_counter() - start)
+        page_files = corpus_pages(root)
+
+        with _quiet():
+            system = UnifiedAuditSystem(root, use_browser=False)
+        system.performance_history = {}
+
+        start = time.perf_counter()
+        with _quiet():
+            get_inventory(system.admin_dir, refresh=True)
+        _phase(phases, 'inventory', time.perf_counter() - start, len(page_files))
+
+        # 静态审查：UnifiedAuditSystem 四个维度的静态检查与评分
+        start = time.perf_counter()
+        with _quiet():
+            page_results = [system.audit_single_page(page) for page in page_files]
+        _phase(phases, 'static_audit', time.perf_counter() - start, len(page_files))
+
+        # UINavAuditor 的静态检查（资源引用、侧边栏加载、UI一致性）
+        nav = system.ui_auditor
+        start = time.perf_counter()
+        with _quiet():
+            for page in page_files:
+                nav.check_static_resources(page)
+                nav.check_sidebar_loading(page)
+                nav.check_ui_consistency(page)
+        _phase(phases, 'nav_static', time.perf_counter() - start, len(page_files))
+
+        by_module: Dict[str, list] = {}
+        for result in page_results:
+            by_module.setdefault(system._get_module_name(Path(result.page_path)), []).append(result)
+        audit_results = [
+            ModuleAuditResult(module, results, system._generate_module_summary(results),
+                              system._generate_recommendations(results), datetime.now().strftime('%Y-%m-%d %H:%M:%S'))
+            for module, results in by_module.items()
+        ]
+        issues = sum(len(r.issues) for r in page_results)
+
+        # 报告生成
+        start = time.perf_counter()
+        markdown = system.generate_report(audit_results, 'markdown')
+        _phase(phases, 'report_markdown', time.perf_counter() - start)
+        start = time.perf_counter()
+        system.generate_report(audit_results, 'json')
+        _phase(phases, 'report_json', time.perf_counter() - start)
+
+        # 修复会话
+        start = time.perf_counter()
+        with _quiet(), _redirect_fixers(root):
+            fix_results = system.auto_fix_issues(audit_results)
+        _phase(phases, 'fix_session', time.perf_counter() - start, len(page_files))
+
+        return {
+            'pages': len(page_files),
+            'corpus_bytes': corpus['bytes'],
+            'issues': issues,
+            'fixes': {key: len(value) for key, value in fix_results.items()},
+            'report_bytes': len(markdown.encode('utf-8')),
+            'phases': phases,
+            'peak_rss_mb': peak_rss_mb(),
+            **({'timings': PROFILER.timings_report()} if PROFILER.enabled else {}),
+        }
+    finally:
+        if keep:
+            print(f"   页面库已保留: {root}")
+        else:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+def _run_isolated(pages: int, args) -> Dict[str, Any]:
+    """在子进程中运行单个规模，避免峰值 RSS 相互影响"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = Path(tmp) / 'run.json'
+        command = [sys.executable, str(Path(__file__).resolve()), '--sizes', str(pages),
+                   '--seed', str(args.seed), '--raw-output', str(output)]
+        if args.keep:
+            command.append('--keep')
+        if args.profile:
+            command.append('--profile')
+        subprocess.run(command, check=True)
+        return json.loads(output.read_text(encoding='utf-8'))
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+# ---------- 对比 ----------
+
+COMPARED_METRICS = [
+    ('static_audit', 'pages_per_s', True),
+    ('nav_static', 'pages_per_s', True),
+    ('fix_session', 'pages_per_s', True),
+    ('report_markdown', 'seconds', False),
+    ('report_json', 'seconds', False),
+]
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]):
+    """按页面规模逐项对比两次结果（↑ 表示变好）"""
+    print(f"\n📊 与基线对比: {baseline.get('commit')} ({baseline.get('timestamp')}) -> {current.get('commit')}")
+    baseline_runs = {run['pages']: run for run in baseline.get('runs', [])}
+    for run in current['runs']:
+        base = baseline_runs.get(run['pages'])
+        if not base:
+            print(f"   {run['pages']} 页: 基线中没有该规模")
+            continue
+        print(f"   {run['pages']} 页:")
+        for phase, key, higher_is_better in COMPARED_METRICS:
+            new = run['phases'].get(phase, {}).get(key)
+            old = base['phases'].get(phase, {}).get(key)
+            if not new or not old:
+                continue
+            change = (new - old) / old * 100
+            better = change > 0 if higher_is_better else change < 0
+            print(f"     {phase:<16} {key:<12} {old:>10} -> {new:<10} "
+                  f"{'↑' if better else '↓'} {change:+.1f}%")
+        old_rss, new_rss = base.get('peak_rss_mb'), run.get('peak_rss_mb')
+        if old_rss and new_rss:
+            print(f"     {'peak_rss_mb':<29} {old_rss:>10} -> {new_rss}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='医保审核系统审查与修复吞吐量基准测试')
+    parser.add_argument('--sizes', type=str, default=','.join(map(str, DEFAULT_SIZES)),
+                        help='页面库规模，逗号分隔（100 ~ 10000）')
+    parser.add_argument('--seed', type=int, default=0, help='页面库随机种子（相同种子生成相同页面）')
+    parser.add_argument('--output', type=str, help='结果文件路径，默认 audit_reports/benchmarks/ 下按时间与提交号命名')
+    parser.add_argument('--compare', type=str, help='与之前的结果文件对比')
+    parser.add_argument('--keep', action='store_true', help='保留生成的页面库目录')
+    parser.add_argument('--profile', action='store_true', help='在结果中附带分阶段耗时')
+    parser.add_argument('--raw-output', type=str, help=argparse.SUPPRESS)  # 子进程内部使用
+
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(',') if s.strip()]
+    if args.profile:
+        PROFILER.enable()
+
+    if args.raw_output:
+        run = run_benchmark(sizes[0], args.seed, args.keep)
+        Path(args.raw_output).write_text(json.dumps(run, ensure_ascii=False), encoding='utf-8')
+        return
+
+    runs = [run_benchmark(sizes[0], args.seed, args.keep)] if len(sizes) == 1 else \
+        [_run_isolated(pages, args) for pages in sizes]
+    commit = git_commit()
+    results = {
+        'commit': commit,
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'runs': runs,
+    }
+
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    output = Path(args.output) if args.output else BENCHMARK_DIR / f'benchmark_{stamp}_{commit}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"\n✅ 基准结果已保存: {output}")
+
+    if args.compare:
+        compare(results, json.loads(Path(args.compare).read_text(encoding='utf-8')))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+浏览器审查基准测试
+
+浏览器路径（menu_audit_enhanced.audit_single_page：加载、等待侧边栏、截图、采集日志与性能指标）
+是完整审查中最慢的部分，但此前没有可复现的测量方式。本脚本：
+1. 用 benchmark_audit.generate_corpus 按固定种子生成页面（含统一侧边栏片段与加载脚本），
+   由本机临时 HTTP 服务器提供，每个请求按配置注入人为延迟：
+   基础延迟 + 按URL哈希确定的抖动（同一URL每次相同）+ 侧边栏片段额外延迟
+2. 以不同的并发浏览器数（每个工作线程一个 headless Chrome，页面从共享队列领取）
+   和就绪等待策略（WAIT_STRATEGIES：fixed 固定等待 / ready 轮询就绪信号）运行浏览器审查
+3. 通过 PROFILER 记录每个页面各阶段（browser.load / wait_sidebar / screenshot / collect_logs 等）的耗时分布，
+   输出每种配置的吞吐量与相对单浏览器的加速比（扩展曲线）
+结果写入 audit_reports/benchmarks/，可用于客观评估浏览器池与就绪判定的改动。
+全部请求都在 127.0.0.1 上完成；截图与日志写入临时目录。
+"""
+
+import json
+import time
+import queue
+import shutil
+import hashlib
+import platform
+import argparse
+import tempfile
+import threading
+import functools
+import http.server
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import unquote
+from typing import Any, Dict, List
+
+# 导入公共配置
+try:
+    from audit_config import AUDIT_DIR
+except ImportError:
+    AUDIT_DIR = Path(__file__).resolve().parent / 'audit_reports'
+
+import menu_audit_enhanced
+from menu_audit_enhanced import audit_single_page, setup_driver, WAIT_STRATEGIES
+from benchmark_audit import BENCHMARK_DIR, generate_corpus, corpus_pages, git_commit, peak_rss_mb
+from audit_profiler import PROFILER
+
+DEFAULT_WORKERS = [1, 2, 4]
+SIDEBAR_FRAGMENT = '_unified-sidebar.html'
+
+
+# ---------- 本机夹具服务器 ----------
+
+class _LatencyHandler(http.server.SimpleHTTPRequestHandler):
+    """按服务器配置延迟后再应答的静态文件处理器"""
+
+    def do_GET(self):
+        time.sleep(self.server.delay_for(self.path))
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureServer(http.server.ThreadingHTTPServer):
+    """本机静态文件服务器，注入可控且确定的延迟"""
+
+    daemon_threads = True
+
+    def __init__(self, root: Path, latency_ms: float = 0, jitter_ms: float = 0,
+                 fragment_latency_ms: float = 0, port: int = 0):
+        handler = functools.partial(_LatencyHandler, directory=str(root))
+        super().__init__(('127.0.0.1', port), handler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.fragment_latency_ms = fragment_latency_ms
+        self._thread = None
+
+    def delay_for(self, path: str) -> float:
+        """请求延迟（秒）：抖动由URL哈希决定，同一URL每次相同"""
+        path = unquote(path.split('?', 1)[0])
+        delay = self.latency_ms
+        if self.jitter_ms:
+            delay += int(hashlib.sha1(path.encode('utf-8')).hexdigest()[:8], 16) % (int(self.jitter_ms) + 1)
+        if path.endswith(SIDEBAR_FRAGMENT):
+            delay += self.fragment_latency_ms
+        return delay / 1000
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_address[1]}/1.0/超级管理员'
+
+    def start(self) -> 'FixtureServer':
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+@contextmanager
+def _output_dirs(root: Path):
+    """截图与日志写入临时目录"""
+    saved = menu_audit_enhanced.IMG_DIR, menu_audit_enhanced.LOG_DIR
+    menu_audit_enhanced.IMG_DIR = root / 'img'
+    menu_audit_enhanced.LOG_DIR = root / 'img' / 'logs'
+    menu_audit_enhanced.LOG_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        yield
+    finally:
+        menu_audit_enhanced.IMG_DIR, menu_audit_enhanced.LOG_DIR = saved
+
+
+# ---------- 测量 ----------
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def phase_stats() -> Dict[str, Dict[str, float]]:
+    """PROFILER 中每个页面与浏览器阶段的耗时分布（毫秒）"""
+    durations: Dict[str, List[float]] = {}
+    for record in PROFILER.records:
+        if record.cat == 'page' or record.name.startswith('browser.'):
+            durations.setdefault(record.name, []).append(record.dur_ns / 1e6)
+    return {
+        name: {
+            'count': len(values),
+            'mean_ms': round(sum(values) / len(values), 1),
+            'p50_ms': round(_percentile(values, 0.5), 1),
+            'p95_ms': round(_percentile(values, 0.95), 1),
+        }
+        for name, values in sorted(durations.items())
+    }
+
+
+def run_config(drivers: list, pages: List[str], base_url: str, workers: int, wait_strategy: str) -> Dict[str, Any]:
+    """用前 workers 个浏览器审查全部页面，页面从共享队列领取"""
+    PROFILER.enable()
+    pending: 'queue.Queue[str]' = queue.Queue()
+    for page in pages:
+        pending.put(page)
+    failures = []
+
+    def worker(index: int):
+        driver = drivers[index]
+        while True:
+            try:
+                page = pending.get_nowait()
+            except queue.Empty:
+                return
+            with PROFILER.span('browser_page', cat='page', page=page, worker=index):
+                result = audit_single_page(driver, page, page.split('/', 1)[0], base_url, wait_strategy)
+            if not result.get('quality_indicators', {}).get('loads_successfully'):
+                failures.append(page)
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - start
+
+    return {
+        'wait_strategy': wait_strategy,
+        'workers': workers,
+        'pages': len(pages),
+        'failed': len(failures),
+        'wall_s': round(wall, 2),
+        'pages_per_s': round(len(pages) / wall, 2) if wall else None,
+        'phases': phase_stats(),
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def add_scaling(runs: List[Dict[str, Any]]):
+    """每种等待策略内，相对最少浏览器数的加速比与并行效率"""
+    for strategy in {run['wait_strategy'] for run in runs}:
+        group = sorted((r for r in runs if r['wait_strategy'] == strategy), key=lambda r: r['workers'])
+        base = group[0]
+        for run in group:
+            speedup = run['pages_per_s'] / base['pages_per_s'] if base['pages_per_s'] else 0
+            run['speedup'] = round(speedup, 2)
+            run['efficiency'] = round(speedup * base['workers'] / run['workers'], 2)
+
+
+def print_runs(runs: List[Dict[str, Any]]):
+    print(f"\n📈 扩展曲线:")
+    print(f"   {'等待策略':<8} {'浏览器数':>8} {'耗时s':>8} {'页面/秒':>8} {'加速比':>8} {'效率':>6} {'失败':>4}")
+    for run in runs:
+        print(f"   {run['wait_strategy']:<12} {run['workers']:>8} {run['wall_s']:>8} {run['pages_per_s']:>10} "
+              f"{run['speedup']:>10} {run['efficiency']:>8} {run['failed']:>6}")
+    print(f"\n⏱️  各阶段耗时（ms，mean / p50 / p95）:")
+    for run in runs:
+        print(f"   [{run['wait_strategy']} × {run['workers']}]")
+        for name, stats in run['phases'].items():
+            print(f"     {name:<30} {stats['mean_ms']:>8} {stats['p50_ms']:>8} {stats['p95_ms']:>8}  ({stats['count']}次)")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='医保审核系统浏览器审查基准测试（本机夹具服务器 + headless Chrome）')
+    parser.add_argument('--pages', type=int, default=20, help='夹具页面数')
+    parser.add_argument('--seed', type=int, default=0, help='夹具页面随机种子')
+    parser.add_argument('--workers', type=str, default=','.join(map(str, DEFAULT_WORKERS)),
+                        help='并发浏览器数，逗号分隔')
+    parser.add_argument('--wait', type=str, default=','.join(WAIT_STRATEGIES),
+                        help=f"就绪等待策略，逗号分隔（{' / '.join(WAIT_STRATEGIES)}）")
+    parser.add_argument('--latency-ms', type=float, default=50, help='每个请求的基础延迟')
+    parser.add_argument('--jitter-ms', type=float, default=20, help='按URL确定的附加延迟上限')
+    parser.add_argument('--fragment-latency-ms', type=float, default=100, help='侧边栏片段的额外延迟')
+    parser.add_argument('--port', type=int, default=0, help='夹具服务器端口，默认随机')
+    parser.add_argument('--output', type=str, help='结果文件路径，默认 audit_reports/benchmarks/ 下按时间与提交号命名')
+
+    args = parser.parse_args()
+    worker_counts = sorted({int(w) for w in args.workers.split(',') if w.strip()})
+    strategies = [s.strip() for s in args.wait.split(',') if s.strip()]
+    unknown = [s for s in strategies if s not in WAIT_STRATEGIES]
+    if unknown:
+        parser.error(f"未知的等待策略: {', '.join(unknown)}")
+
+    root = Path(tempfile.mkdtemp(prefix='browser_bench_'))
+    server = None
+    drivers = []
+    try:
+        generate_corpus(root, args.pages, args.seed)
+        admin_dir = root / '1.0' / '超级管理员'
+        pages = [p.relative_to(admin_dir).as_posix() for p in corpus_pages(root)]
+        server = FixtureServer(root, args.latency_ms, args.jitter_ms, args.fragment_latency_ms, args.port).start()
+        print(f"🌐 夹具服务器: {server.base_url}（{len(pages)} 个页面，延迟 {args.latency_ms}ms "
+              f"+ 抖动≤{args.jitter_ms}ms，侧边栏片段 +{args.fragment_latency_ms}ms）")
+
+        with _output_dirs(root):
+            start = time.perf_counter()
+            for _ in range(max(worker_counts)):
+                driver = setup_driver()
+                if not driver:
+                    print("❌ 无法启动 headless Chrome，浏览器基准测试中止")
+                    return
+                drivers.append(driver)
+            driver_setup = time.perf_counter() - start
+            print(f"🔧 启动 {len(drivers)} 个浏览器: {driver_setup:.1f}s")
+
+            # 每个浏览器先预热一次，避免首次加载的冷启动开销计入第一种配置
+            for driver in drivers:
+                audit_single_page(driver, pages[0], 'warmup', server.base_url, strategies[0])
+
+            runs = []
+            for strategy in strategies:
+                for workers in worker_counts:
+                    print(f"\n▶️  等待策略 {strategy}，{workers} 个浏览器")
+                    runs.append(run_config(drivers, pages, server.base_url, workers, strategy))
+
+        add_scaling(runs)
+        print_runs(runs)
+
+        commit = git_commit()
+        results = {
+            'commit': commit,
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'fixture': {
+                'pages': len(pages),
+                'seed': args.seed,
+                'latency_ms': args.latency_ms,
+                'jitter_ms': args.jitter_ms,
+                'fragment_latency_ms': args.fragment_latency_ms,
+            },
+            'driver_setup_s': round(driver_setup, 2),
+            'runs': runs,
+        }
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output = Path(args.output) if args.output else BENCHMARK_DIR / f'browser_benchmark_{stamp}_{commit}.json'
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"\n✅ 基准结果已保存: {output}")
+    finally:
+        for driver in drivers:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        if server:
+            server.stop()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
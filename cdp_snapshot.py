@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+CDP 内存快照服务
+
+浏览器审查默认通过 BASE_URL 从 simple_server.py / server.js 读取页面与资源。
+快照模式下改用 Chrome DevTools 的 Fetch.requestPaused 拦截发往 BASE_URL 源的请求，
+直接用 1.0/ 目录的内存快照应答（小文件一次性读入内存，大文件 mmap 映射，避免占用过多文件描述符）：
+1. 无需启动本地服务器，审查结果不受服务器状态影响
+2. 资源按扩展名返回正确的 MIME 类型
+3. 外部资源（CDN 等）不在拦截范围内，照常走网络
+
+依赖 Selenium 4 的 bidi_connection（随 selenium 安装的 trio / websocket）。
+"""
+
+import os
+import sys
+import mmap
+import base64
+import mimetypes
+import threading
+from pathlib import Path
+from urllib.parse import urlsplit, unquote
+
+try:
+    import trio
+    HAS_TRIO = True
+except ImportError:
+    HAS_TRIO = False
+
+try:
+    from audit_config import ROOT, BASE_URL
+except ImportError:
+    ROOT = Path(__file__).resolve().parent
+    BASE_URL = 'http://localhost:8000/1.0/超级管理员'
+
+# 快照目录（相对项目根目录，与本地服务器的站点根一致）
+SNAPSHOT_DIRS = ('1.0',)
+TEXT_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+# 超过该大小的文件才用 mmap 映射（每个映射占用一个文件描述符，macOS 默认上限 256）
+MMAP_MIN_BYTES = 1024 * 1024
+# 页面并发请求较多时，事件缓冲不足会被 selenium 丢弃，导致请求永远挂起
+EVENT_BUFFER_SIZE = 1024
+
+mimetypes.add_type('application/javascript', '.js')
+mimetypes.add_type('text/css', '.css')
+mimetypes.add_type('image/svg+xml', '.svg')
+mimetypes.add_type('font/woff2', '.woff2')
+
+
+def guess_mime_type(path: str) -> str:
+    """按扩展名推断 MIME 类型，文本类型附带 utf-8 编码"""
+    mime = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    if mime.startswith(TEXT_TYPES):
+        mime += '; charset=utf-8'
+    return mime
+
+
+class SiteSnapshot:
+    """站点文件的内存快照：URL 路径 -> 文件内容（bytes，大文件为 mmap 映射）"""
+
+    def __init__(self, root: Path = ROOT, dirs=SNAPSHOT_DIRS):
+        self.root = Path(root)
+        self.files = {}  # '1.0/超级管理员/登录.html' -> mmap / bytes
+        self._encoded = {}  # 同一资源多次请求时复用 base64 结果
+        self.total_bytes = 0
+        try:
+            for d in dirs:
+                self._load_dir(self.root / d)
+        except Exception:
+            self.close()
+            raise
+
+    def _load_dir(self, directory: Path):
+        for path in sorted(directory.rglob('*')):
+            if not path.is_file() or any(part.startswith('.') for part in path.relative_to(self.root).parts):
+                continue
+            key = path.relative_to(self.root).as_posix()
+            with open(path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size >= MMAP_MIN_BYTES:
+                    content = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    content = f.read()
+            self.files[key] = content
+            self.total_bytes += len(content)
+
+    def lookup(self, url: str):
+        """URL -> (快照键, 内容)，找不到返回 (键, None)"""
+        key = unquote(urlsplit(url).path).lstrip('/')
+        if not key or key.endswith('/'):
+            key += 'index.html'
+        return key, self.files.get(key)
+
+    def encoded_body(self, key: str) -> str:
+        body = self._encoded.get(key)
+        if body is None:
+            body = self._encoded[key] = base64.b64encode(self.files[key][:]).decode('ascii')
+        return body
+
+    def close(self):
+        for content in self.files.values():
+            if isinstance(content, mmap.mmap):
+                content.close()
+        self.files.clear()
+        self._encoded.clear()
+
+
+class SnapshotInterceptor:
+    """在后台线程中监听 Fetch.requestPaused，并用快照内容应答"""
+
+    def __init__(self, driver, snapshot: SiteSnapshot, base_url: str = BASE_URL):
+        self.driver = driver
+        self.snapshot = snapshot
+        parts = urlsplit(base_url)
+        self.origin = f"{parts.scheme}://{parts.netloc}"
+        self.stats = {'served': 0, 'missing': 0, 'bytes': 0}
+        self.error = None
+        self._ready = threading.Event()
+        self._thread = None
+        self._cancel_scope = None
+        self._trio_token = None
+
+    def start(self, timeout: float = 10) -> bool:
+        """启动拦截，返回是否已就绪"""
+        self._thread = threading.Thread(target=self._run, name='cdp-snapshot', daemon=True)
+        self._thread.start()
+        self._ready.wait(timeout)
+        return self._trio_token is not None and self.error is None
+
+    def stop(self):
+        if self._trio_token is not None:
+            try:
+                trio.from_thread.run_sync(self._cancel_scope.cancel, trio_token=self._trio_token)
+            except Exception:
+                pass
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._trio_token = None
+
+    def _run(self):
+        try:
+            trio.run(self._serve)
+        except Exception as e:
+            self.error = e
+        finally:
+            self._ready.set()
+
+    async def _serve(self):
+        async with self.driver.bidi_connection() as connection:
+            session, devtools = connection.session, connection.devtools
+            pattern = devtools.fetch.RequestPattern(
+                url_pattern=f"{self.origin}/*",
+                request_stage=devtools.fetch.RequestStage.REQUEST,
+            )
+            await session.execute(devtools.fetch.enable(patterns=[pattern]))
+            events = session.listen(devtools.fetch.RequestPaused, buffer_size=EVENT_BUFFER_SIZE)
+            with trio.CancelScope() as scope:
+                self._cancel_scope = scope
+                self._trio_token = trio.lowlevel.current_trio_token()
+                self._ready.set()
+                async with trio.open_nursery() as nursery:
+                    async for event in events:
+                        nursery.start_soon(self._fulfil, session, devtools, event)
+            with trio.move_on_after(2):
+                await session.execute(devtools.fetch.disable())
+
+    async def _fulfil(self, session, devtools, event):
+        key, content = self.snapshot.lookup(event.request.url)
+        if content is None:
+            status, mime, body = 404, 'text/plain; charset=utf-8', base64.b64encode(
+                f'Not in snapshot: /{key}'.encode('utf-8')).decode('ascii')
+            self.stats['missing'] += 1
+        else:
+            status, mime, body = 200, guess_mime_type(key), self.snapshot.encoded_body(key)
+            self.stats['served'] += 1
+            self.stats['bytes'] += len(content)
+        headers = [
+            devtools.fetch.HeaderEntry(name='Content-Type', value=mime),
+            devtools.fetch.HeaderEntry(name='Cache-Control', value='no-cache'),
+            devtools.fetch.HeaderEntry(name='Access-Control-Allow-Origin', value='*'),
+        ]
+        try:
+            await session.execute(devtools.fetch.fulfill_request(
+                request_id=event.request_id, response_code=status,
+                response_headers=headers, body=body,
+            ))
+        except Exception:
+            pass  # 页面已跳转，请求被浏览器取消
+
+
+def attach_snapshot(driver, base_url: str = BASE_URL, root: Path = ROOT):
+    """为 driver 启用快照模式，失败时返回 None（调用方继续使用 BASE_URL 服务器）"""
+    if not HAS_TRIO or not hasattr(driver, 'bidi_connection'):
+        print("⚠️  快照模式需要 Selenium 4 的 CDP 支持（trio），将继续使用本地服务器")
+        return None
+    try:
+        snapshot = SiteSnapshot(root)
+    except OSError as e:
+        print(f"⚠️  快照加载失败，将继续使用本地服务器: {e}")
+        return None
+    interceptor = SnapshotInterceptor(driver, snapshot, base_url)
+    if not interceptor.start():
+        print(f"⚠️  快照模式启动失败，将继续使用本地服务器: {interceptor.error}")
+        interceptor.stop()
+        snapshot.close()
+        return None
+    print(f"📦 快照模式已启用: {len(snapshot.files)} 个文件, "
+          f"{snapshot.total_bytes / 1024 / 1024:.1f}MB, 拦截源 {interceptor.origin}")
+    return interceptor
+
+
+def detach_snapshot(interceptor):
+    """停止拦截并释放快照映射"""
+    if interceptor is None:
+        return
+    interceptor.stop()
+    interceptor.snapshot.close()
+    stats = interceptor.stats
+    print(f"📦 快照模式已关闭: 应答 {stats['served']} 个请求, "
+          f"{stats['bytes'] / 1024:.1f}KB, 未命中 {stats['missing']} 个")
+
+
+def main():
+    """查看快照内容统计"""
+    snapshot = SiteSnapshot(ROOT)
+    print(f"📦 快照文件数: {len(snapshot.files)}")
+    print(f"📦 快照总大小: {snapshot.total_bytes / 1024 / 1024:.1f}MB")
+    for url in sys.argv[1:]:
+        key, content = snapshot.lookup(url)
+        status = f"{len(content)} 字节, {guess_mime_type(key)}" if content is not None else "未命中"
+        print(f"  {url} -> /{key}: {status}")
+    snapshot.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI修复提示词的上下文窗口
+
+generate_fix_prompt 原先把整个页面嵌入提示词，规则管理页面单个就有 150–190KB，
+而面包屑、viewport 之类的修复只关心页面的一小部分。本模块：
+1. 用 HTMLParser 解析页面结构，得到 head / nav / 主内容容器 / form 等元素的源码区间
+2. 按 fix_strategy 选取相关区间，区间内过长的 <style>/<script> 内容以占位符代替
+3. 按 token 预算截断，记录窗口前后的 token 估算值
+4. 模型按片段标记返回修改后的片段，再按区间拼接回完整文件（占位符还原为原内容）
+"""
+
+import re
+import hashlib
+from dataclasses import dataclass, field
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from audit_config import AI_CONTEXT_TOKEN_BUDGET
+except ImportError:
+    AI_CONTEXT_TOKEN_BUDGET = 6000
+
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+MAIN_CLASS_RE = re.compile(r'(?:^|\s)(main-content|main-container|page-content|content)(?:\s|$)')
+BREADCRUMB_CLASS_RE = re.compile(r'breadcrumb', re.IGNORECASE)
+# 区间内超过该长度的 <style>/<script> 内容以占位符代替
+ELIDE_MIN_CHARS = 200
+# 剩余预算不足以容纳有意义的片段时不再追加区域
+MIN_REGION_TOKENS = 200
+ELIDE_RE = re.compile(r'(<(style|script)\b[^>]*>)([\s\S]*?)(</\2\s*>)', re.IGNORECASE)
+PLACEHOLDER = '/*@@elided:{}@@*/'
+PLACEHOLDER_RE = re.compile(r'/\*@@elided:(\d+)@@\*/')
+REGION_RE = re.compile(r'<!--\s*region:(\d+)[^>]*-->\n?([\s\S]*?)\n?<!--\s*/region:\1\s*-->')
+
+# 各修复策略关注的页面区域（按优先级排列，预算不足时靠后的区域先被截断）
+STRATEGY_REGIONS = {
+    'add_breadcrumb_navigation': ('breadcrumb', 'main'),
+    'add_page_title': ('title', 'main'),
+    'enhance_responsive_design': ('head',),
+    'improve_accessibility': ('nav', 'main', 'form'),
+    'add_form_validation': ('form',),
+    'enhance_error_handling': ('form', 'main'),
+}
+DEFAULT_REGIONS = ('head', 'main')
+
+
+def estimate_tokens(text: str) -> int:
+    """粗略估算 token 数：ASCII 约 4 字符 1 token，中文等非 ASCII 字符约 1 字符 1 token"""
+    ascii_chars = len(text.encode('ascii', 'ignore'))
+    return ascii_chars // 4 + (len(text) - ascii_chars)
+
+
+class PageStructure(HTMLParser):
+    """记录页面中关心的元素在源码中的区间 [start, end)"""
+
+    def __init__(self, html: str):
+        super().__init__(convert_charrefs=False)
+        self.html = html
+        self.line_offsets = [0]
+        for m in re.finditer('\n', html):
+            self.line_offsets.append(m.end())
+        self.elements: Dict[str, List[Tuple[int, int]]] = {}
+        self._stack = []
+        self.feed(html)
+        self.close()
+
+    def _offset(self) -> int:
+        line, col = self.getpos()
+        return self.line_offsets[line - 1] + col
+
+    def _kind(self, tag: str, attrs: dict) -> Optional[str]:
+        classes = attrs.get('class') or ''
+        if tag in ('head', 'body', 'nav', 'main', 'form', 'title'):
+            if tag == 'nav' and BREADCRUMB_CLASS_RE.search(classes + (attrs.get('aria-label') or '')):
+                return 'breadcrumb'
+            return tag
+        if tag in ('div', 'section', 'ol', 'ul'):
+            if BREADCRUMB_CLASS_RE.search(classes):
+                return 'breadcrumb'
+            if tag in ('div', 'section') and MAIN_CLASS_RE.search(classes):
+                return 'main'
+        return None
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_ELEMENTS:
+            return
+        self._stack.append((tag, self._kind(tag, dict(attrs)), self._offset()))
+
+    def handle_endtag(self, tag):
+        # 容错：跳过未闭合的元素，直到匹配的开始标签
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                _, kind, start = self._stack[i]
+                del self._stack[i:]
+                if kind:
+                    end = self.html.find('>', self._offset()) + 1
+                    self.elements.setdefault(kind, []).append((start, end))
+                return
+
+    def spans(self, kind: str) -> List[Tuple[int, int]]:
+        """某类元素的区间；main 只取最外层（跳过嵌套的 content 容器），找不到时退回 body"""
+        spans = sorted(self.elements.get(kind, []))
+        if kind == 'main':
+            outer = [s for s in spans if not any(o[0] < s[0] and s[1] <= o[1] for o in spans)]
+            return outer[:1] or self.elements.get('body', [])[:1]
+        return spans
+
+
+@dataclass
+class Region:
+    index: int
+    kind: str
+    start: int
+    end: int
+    text: str  # 送入提示词的文本（过长的 style/script 已替换为占位符）
+    elided: Dict[str, str] = field(default_factory=dict)
+    truncated: bool = False
+
+
+@dataclass
+class ContextWindow:
+    strategy: str
+    content_hash: str
+    regions: List[Region]
+    original_tokens: int
+    window_tokens: int
+
+    @property
+    def reduction(self) -> float:
+        if not self.original_tokens:
+            return 0.0
+        return 1 - self.window_tokens / self.original_tokens
+
+    def render(self) -> str:
+        """提示词中的片段文本，每个片段以 region 标记包围"""
+        parts = []
+        for region in self.regions:
+            note = ' truncated' if region.truncated else ''
+            parts.append(f"<!-- region:{region.index} {region.kind}{note} -->\n{region.text}\n<!-- /region:{region.index} -->")
+        return '\n\n'.join(parts)
+
+    def has_regions(self, response: str) -> bool:
+        return bool(REGION_RE.search(response or ''))
+
+    def replacements(self, content: str, response: str) -> List[Tuple[int, int, str]]:
+        """模型返回的片段对应的原文区间替换 (start, end, 新文本)，占位符已还原；未返回的片段不替换"""
+        if hashlib.sha1(content.encode('utf-8')).hexdigest() != self.content_hash:
+            raise ValueError('文件在生成提示词后已被修改，无法拼接片段')
+        fixed = {int(m.group(1)): m.group(2) for m in REGION_RE.finditer(response)}
+        result = []
+        for region in self.regions:
+            if region.index not in fixed:
+                continue
+            text = fixed[region.index]
+            missing = set(region.elided) - set(PLACEHOLDER_RE.findall(text))
+            if missing:
+                raise ValueError(f'片段 {region.index} 丢失了省略内容占位符: {sorted(missing)}')
+            text = PLACEHOLDER_RE.sub(lambda m: region.elided.get(m.group(1), m.group(0)), text)
+            result.append((region.start, region.end, text))
+        return result
+
+
+def _elide(content: str, start: int, end: int, counter: List[int]) -> Tuple[list, Dict[str, str]]:
+    """把区间切分为 (原始起点, 原始终点, 文本) 片段，过长的 style/script 内容替换为占位符"""
+    pieces, elided, pos = [], {}, start
+    for m in ELIDE_RE.finditer(content, start, end):
+        body_start, body_end = m.start(3), m.end(3)
+        if body_end - body_start < ELIDE_MIN_CHARS:
+            continue
+        key = str(counter[0])
+        counter[0] += 1
+        elided[key] = content[body_start:body_end]
+        pieces.append((pos, body_start, content[pos:body_start]))
+        pieces.append((body_start, body_end, PLACEHOLDER.format(key)))
+        pos = body_end
+    pieces.append((pos, end, content[pos:end]))
+    return pieces, elided
+
+
+def _truncate(pieces: list, budget: int) -> Tuple[int, str]:
+    """在预算内截断片段序列，返回 (原始截断位置, 文本)；只在标签边界截断，不拆开占位符"""
+    text, used = '', 0
+    for orig_start, orig_end, piece in pieces:
+        cost = estimate_tokens(piece)
+        if used + cost <= budget:
+            text += piece
+            used += cost
+            continue
+        if not PLACEHOLDER_RE.fullmatch(piece):
+            # 二分查找预算内可保留的最长前缀，再回退到最近的标签结尾
+            lo, hi = 0, len(piece)
+            while lo < hi:
+                mid = (lo + hi + 1) // 2
+                if used + estimate_tokens(piece[:mid]) <= budget:
+                    lo = mid
+                else:
+                    hi = mid - 1
+            cut = piece.rfind('>', 0, lo) + 1
+            if cut > 0:
+                return orig_start + cut, text + piece[:cut]
+        return orig_start, text
+    return pieces[-1][1], text
+
+
+def build_window(content: str, strategy: str, budget: int = AI_CONTEXT_TOKEN_BUDGET) -> ContextWindow:
+    """按修复策略选取页面相关区域，生成不超过 token 预算的上下文窗口"""
+    content_hash = hashlib.sha1(content.encode('utf-8')).hexdigest()
+    original_tokens = estimate_tokens(content)
+    counter = [0]
+
+    if original_tokens <= budget:
+        # 小文件直接整体作为一个片段
+        region = Region(1, 'document', 0, len(content), content)
+        return ContextWindow(strategy, content_hash, [region], original_tokens, original_tokens)
+
+    structure = PageStructure(content)
+    spans = []
+    for kind in STRATEGY_REGIONS.get(strategy, DEFAULT_REGIONS):
+        for span in structure.spans(kind):
+            # 跳过与已选区域重叠的区间（如主内容中的 nav）
+            if not any(s < span[1] and span[0] < e for _, s, e in spans):
+                spans.append((kind, span[0], span[1]))
+    if not spans:
+        spans = [('head', s, e) for s, e in structure.spans('head')] or [('document', 0, len(content))]
+
+    regions, remaining = [], budget
+    for kind, start, end in spans:
+        if remaining < MIN_REGION_TOKENS:
+            break
+        pieces, elided = _elide(content, start, end, counter)
+        text = ''.join(p[2] for p in pieces)
+        truncated = False
+        if estimate_tokens(text) > remaining:
+            end, text = _truncate(pieces, remaining)
+            elided = {k: v for k, v in elided.items() if PLACEHOLDER.format(k) in text}
+            truncated = True
+            if end <= start:
+                continue
+        remaining -= estimate_tokens(text)
+        regions.append(Region(len(regions) + 1, kind, start, end, text, elided, truncated))
+
+    window_tokens = sum(estimate_tokens(r.text) for r in regions)
+    return ContextWindow(strategy, content_hash, regions, original_tokens, window_tokens)
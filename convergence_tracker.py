@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+审查修复循环的收敛检测
+
+AIAuditFixController 原先只在“没有问题”“本轮无成功修复”或满 5 轮时停止。
+修复“成功”却不改变审查结果、或在两种状态间来回（插入又删除面包屑）的页面，
+会让每一轮都重新跑一次完整审查。本模块在每轮审查后：
+1. 对每个页面的问题集合计算哈希，记录各轮历史
+2. 页面回到两轮以前出现过的状态 → 振荡；上一轮尝试修复后问题集合不变 → 无进展
+   两类页面从后续轮次的修复中排除
+3. 全部页面哈希组成整棵树的问题指纹，指纹与上一轮相同即判定收敛，循环立即结束
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+OSCILLATING = 'oscillating'
+STALLED = 'stalled'
+
+
+@dataclass
+class PageHistory:
+    hashes: List[str] = field(default_factory=list)
+    attempted_at: Optional[int] = None  # 最近一次尝试修复时的问题集合哈希位置
+    status: str = ''                    # '' / oscillating / stalled
+
+
+def issue_set_hash(problems: Iterable[Dict[str, Any]]) -> str:
+    """页面问题集合的哈希（与问题顺序无关）"""
+    keys = sorted({f"{p.get('type', '')}\0{p.get('description', '')}\0{p.get('severity', '')}" for p in problems})
+    return hashlib.sha1('\n'.join(keys).encode('utf-8')).hexdigest()
+
+
+class ConvergenceTracker:
+    """按轮次记录页面问题集合，识别振荡 / 无进展页面与整棵树的收敛"""
+
+    def __init__(self):
+        self.pages: Dict[str, PageHistory] = {}
+        self.fingerprints: List[str] = []
+
+    def observe(self, problems: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        记录一轮审查得到的全部问题（未经过优先级过滤与数量限制）
+
+        Returns:
+            本轮的收敛信息：树指纹、是否与上一轮相同、新识别的振荡 / 无进展页面
+        """
+        by_page: Dict[str, List[Dict[str, Any]]] = {}
+        for problem in problems:
+            by_page.setdefault(problem['file_path'], []).append(problem)
+
+        newly = {OSCILLATING: [], STALLED: []}
+        for path in set(by_page) | set(self.pages):
+            history = self.pages.setdefault(path, PageHistory())
+            current = issue_set_hash(by_page.get(path, []))
+            if not history.status and history.hashes:
+                previous = history.hashes[-1]
+                if current != previous and current in history.hashes[:-1]:
+                    history.status = OSCILLATING
+                elif current == previous and history.attempted_at == len(history.hashes) - 1 and path in by_page:
+                    history.status = STALLED
+                if history.status:
+                    newly[history.status].append(path)
+            history.hashes.append(current)
+
+        tree = hashlib.sha1('\n'.join(
+            f'{path}\0{history.hashes[-1]}' for path, history in sorted(self.pages.items())
+        ).encode('utf-8')).hexdigest()
+        converged = bool(self.fingerprints) and self.fingerprints[-1] == tree
+        self.fingerprints.append(tree)
+        return {
+            'fingerprint': tree,
+            'converged': converged,
+            'oscillating': newly[OSCILLATING],
+            'stalled': newly[STALLED],
+        }
+
+    def record_attempts(self, file_paths: Iterable[str]):
+        """记录本轮尝试修复的页面（以本轮观察到的问题集合为基准判断下一轮是否有进展）"""
+        for path in file_paths:
+            history = self.pages.setdefault(path, PageHistory())
+            history.attempted_at = len(history.hashes) - 1
+
+    def is_excluded(self, file_path: str) -> bool:
+        history = self.pages.get(file_path)
+        return bool(history and history.status)
+
+    def excluded(self, status: Optional[str] = None) -> List[str]:
+        return sorted(path for path, history in self.pages.items()
+                      if history.status and (status is None or history.status == status))
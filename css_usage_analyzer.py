@@ -0,0 +1,462 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+医保审核系统CSS使用率分析与冗余规则裁剪工具
+
+功能特性：
+1. 解析 1.0/样式文件 下全部样式表（含 @media / @supports 嵌套规则）
+2. 扫描全部页面及组件片段（含统一侧边栏），并静态识别脚本中动态添加的类名
+3. 计算每条选择器的使用情况，统计未使用规则数与字节数
+4. 可选：为每个页面输出裁剪后的专属关键样式表（--emit-critical）
+"""
+
+import re
+import json
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+# 导入公共配置
+try:
+    from audit_config import ROOT, ADMIN_DIR, AUDIT_DIR
+except ImportError:
+    ROOT = Path(__file__).resolve().parent
+    ADMIN_DIR = ROOT / '1.0' / '超级管理员'
+    AUDIT_DIR = ROOT / 'audit_reports'
+
+from atomic_io import write_text_atomic
+from resource_paths import is_external, resolve_resource_path, rewrite_css_urls
+from page_inventory import get_inventory, PAGE, COMPONENT, TEST
+
+try:
+    from batch_fix_page_styles import PAGE_STYLE_MAP
+except ImportError:
+    PAGE_STYLE_MAP = {}
+
+STYLES_DIR = ROOT / '1.0' / '样式文件'
+
+# 含嵌套规则的 at-rule，递归解析其内部规则
+NESTED_AT_RULES = ('@media', '@supports', '@document', '@layer', '@container')
+
+COMMENT_RE = re.compile(r'/\*[\s\S]*?\*/')
+HTML_COMMENT_RE = re.compile(r'<!--[\s\S]*?-->')
+CLASS_ATTR_RE = re.compile(r'\bclass\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+ID_ATTR_RE = re.compile(r'\bid\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+TAG_RE = re.compile(r'<([a-zA-Z][a-zA-Z0-9-]*)')
+SCRIPT_BLOCK_RE = re.compile(r'<script([^>]*)>([\s\S]*?)</script>', re.IGNORECASE)
+SCRIPT_SRC_RE = re.compile(r'src\s*=\s*["\']([^"\']+\.js)(?:\?[^"\']*)?["\']', re.IGNORECASE)
+STYLE_LINK_RE = re.compile(r'<link[^>]*rel=["\']stylesheet["\'][^>]*>', re.IGNORECASE)
+HREF_RE = re.compile(r'href\s*=\s*["\']([^"\']+)["\']', re.IGNORECASE)
+FETCH_HTML_RE = re.compile(r'fetch\(\s*[\'"`]([^\'"`]+\.html)[\'"`]')
+# JS字符串字面量（单引号、双引号、模板字符串）
+JS_STRING_RE = re.compile(r'\'((?:[^\'\\\n]|\\.)*)\'|"((?:[^"\\\n]|\\.)*)"|`((?:[^`\\]|\\.)*)`')
+JS_TOKEN_RE = re.compile(r'-?[_a-zA-Z][_a-zA-Z0-9-]*')
+# 动态拼接类名前缀：'status-' + x  /  `type-${x}`
+JS_PREFIX_CONCAT_RE = re.compile(r'[\'"]([_a-zA-Z][_a-zA-Z0-9-]*-)[\'"]\s*\+')
+JS_PREFIX_TEMPLATE_RE = re.compile(r'([_a-zA-Z][_a-zA-Z0-9-]*-)\$\{')
+
+SEL_CLASS_RE = re.compile(r'\.(-?[_a-zA-Z][_a-zA-Z0-9-]*)')
+SEL_ID_RE = re.compile(r'#(-?[_a-zA-Z][_a-zA-Z0-9-]*)')
+SEL_TAG_RE = re.compile(r'(?:^|[\s>+~(,])([a-zA-Z][a-zA-Z0-9-]*)')
+SEL_PSEUDO_FUNC_RE = re.compile(r':(?:not|has|is|where)\([^()]*\)')
+SEL_ATTR_RE = re.compile(r'\[[^\]]*\]')
+SEL_PSEUDO_RE = re.compile(r'::?[a-zA-Z-]+(?:\([^()]*\))?')
+
+
+class CSSRule:
+    """样式规则（选择器 + 声明块）"""
+
+    def __init__(self, sheet: str, selectors: list, text: str, context: str = '', at_rule: bool = False):
+        self.sheet = sheet
+        self.selectors = selectors
+        self.text = text
+        self.context = context  # 外层 @media 等条件
+        self.at_rule = at_rule  # 无法按选择器判断、始终保留的 at-rule
+        self.size = len(text.encode('utf-8'))
+
+
+def _find_block_end(css: str, open_pos: int) -> int:
+    """返回与 open_pos 处 '{' 匹配的 '}' 位置"""
+    depth = 0
+    i = open_pos
+    length = len(css)
+    quote = None
+    while i < length:
+        ch = css[i]
+        if quote:
+            if ch == '\\':
+                i += 2
+                continue
+            if ch == quote:
+                quote = None
+        elif ch in ('"', "'"):
+            quote = ch
+        elif ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    return length - 1
+
+
+def split_selector_list(selector_text: str) -> list:
+    """按顶层逗号拆分选择器列表（忽略括号内逗号）"""
+    parts, depth, current = [], 0, []
+    for ch in selector_text:
+        if ch in '([':
+            depth += 1
+        elif ch in ')]':
+            depth = max(0, depth - 1)
+        if ch == ',' and depth == 0:
+            parts.append(''.join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if ''.join(current).strip():
+        parts.append(''.join(current).strip())
+    return [p for p in parts if p]
+
+
+def parse_css(css: str, sheet: str, context: str = '') -> list:
+    """解析CSS文本为规则列表"""
+    rules = []
+    css = COMMENT_RE.sub('', css)
+    pos = 0
+    length = len(css)
+    while pos < length:
+        brace = css.find('{', pos)
+        semi = css.find(';', pos)
+        # 无块 at-rule（@import / @charset）
+        if semi != -1 and (brace == -1 or semi < brace) and css[pos:semi].strip().startswith('@'):
+            text = css[pos:semi + 1].strip()
+            rules.append(CSSRule(sheet, [], text, context, at_rule=True))
+            pos = semi + 1
+            continue
+        if brace == -1:
+            break
+        prelude = css[pos:brace].strip()
+        end = _find_block_end(css, brace)
+        body = css[brace + 1:end]
+        text = css[pos:end + 1].strip()
+        pos = end + 1
+        if not prelude:
+            continue
+        lowered = prelude.lower()
+        if lowered.startswith(NESTED_AT_RULES):
+            rules.extend(parse_css(body, sheet, prelude))
+        elif lowered.startswith('@'):
+            # @font-face / @keyframes 等无法按选择器判断，始终保留
+            rules.append(CSSRule(sheet, [], text, context, at_rule=True))
+        else:
+            rules.append(CSSRule(sheet, split_selector_list(prelude), text, context))
+    return rules
+
+
+class UsageSet:
+    """页面可能用到的类名、ID、标签名集合"""
+
+    def __init__(self):
+        self.classes = set()
+        self.ids = set()
+        self.tags = {'html', 'body'}
+        self.prefixes = set()
+
+    def update(self, other: 'UsageSet'):
+        self.classes |= other.classes
+        self.ids |= other.ids
+        self.tags |= other.tags
+        self.prefixes |= other.prefixes
+
+    def has_class(self, name: str) -> bool:
+        return name in self.classes or any(name.startswith(p) for p in self.prefixes)
+
+    def has_id(self, name: str) -> bool:
+        return name in self.ids or any(name.startswith(p) for p in self.prefixes)
+
+
+def scan_html_usage(content: str) -> UsageSet:
+    """扫描HTML标记中的类名、ID与标签"""
+    usage = UsageSet()
+    markup = HTML_COMMENT_RE.sub('', content)
+    for m in CLASS_ATTR_RE.finditer(markup):
+        usage.classes.update(t for t in m.group(1).split() if '${' not in t)
+    for m in ID_ATTR_RE.finditer(markup):
+        usage.ids.add(m.group(1).strip())
+    usage.tags.update(t.lower() for t in TAG_RE.findall(markup))
+    return usage
+
+
+def scan_js_usage(code: str) -> UsageSet:
+    """静态识别脚本中可能添加的类名/ID（保守：字符串字面量中的标识符均视为可能使用）"""
+    usage = UsageSet()
+    for m in JS_STRING_RE.finditer(code):
+        literal = m.group(1) or m.group(2) or m.group(3) or ''
+        if '<' in literal:
+            # 模板字符串/字符串中的HTML片段
+            usage.update(scan_html_usage(literal))
+        tokens = JS_TOKEN_RE.findall(literal)
+        usage.classes.update(tokens)
+        usage.ids.update(tokens)
+        usage.tags.update(t.lower() for t in tokens)
+    usage.prefixes.update(JS_PREFIX_CONCAT_RE.findall(code))
+    usage.prefixes.update(JS_PREFIX_TEMPLATE_RE.findall(code))
+    return usage
+
+
+def selector_used(selector: str, usage: UsageSet) -> bool:
+    """判断选择器是否可能命中页面元素（所有类名/ID/标签都存在才算命中）"""
+    sel = SEL_PSEUDO_FUNC_RE.sub('', selector)
+    sel = SEL_ATTR_RE.sub('', sel)
+    sel = SEL_PSEUDO_RE.sub('', sel)
+    for cls in SEL_CLASS_RE.findall(sel):
+        if not usage.has_class(cls):
+            return False
+    for ident in SEL_ID_RE.findall(sel):
+        if not usage.has_id(ident):
+            return False
+    stripped = SEL_CLASS_RE.sub('', SEL_ID_RE.sub('', sel))
+    for tag in SEL_TAG_RE.findall(stripped):
+        if tag.lower() not in usage.tags:
+            return False
+    return True
+
+
+def resolve_local(base_file: Path, url: str) -> Path | None:
+    """将页面内的相对/站点绝对路径解析为本地文件路径，外部资源返回 None"""
+    if is_external(url) or not url.split('?')[0].split('#')[0]:
+        return None
+    return resolve_resource_path(base_file, url)
+
+
+class CSSUsageAnalyzer:
+    """CSS使用率分析器"""
+
+    def __init__(self, admin_dir: Path = ADMIN_DIR, styles_dir: Path = STYLES_DIR):
+        self.admin_dir = Path(admin_dir)
+        self.styles_dir = Path(styles_dir)
+        self.timestamp = datetime.now().strftime('%Y%m%d_%H%M')
+        self.rules: dict[Path, list] = {}
+        self.pages: dict[Path, dict] = {}
+        self._js_cache: dict[Path, UsageSet] = {}
+        self._fragment_cache: dict[Path, UsageSet] = {}
+
+    def load_stylesheets(self):
+        """加载并解析全部样式表（含各模块下的样式副本）"""
+        sheets = set(self.styles_dir.glob('*.css')) | set(self.admin_dir.rglob('*.css'))
+        for sheet in sorted(sheets):
+            try:
+                css = sheet.read_text(encoding='utf-8', errors='ignore')
+            except OSError:
+                continue
+            self.rules[sheet.resolve()] = parse_css(css, str(sheet))
+
+    def _script_usage(self, js_path: Path) -> UsageSet:
+        if js_path not in self._js_cache:
+            try:
+                self._js_cache[js_path] = scan_js_usage(js_path.read_text(encoding='utf-8', errors='ignore'))
+            except OSError:
+                self._js_cache[js_path] = UsageSet()
+        return self._js_cache[js_path]
+
+    def _document_usage(self, html_path: Path, content: str, depth: int = 0) -> UsageSet:
+        """页面/片段的完整使用集合：标记 + 内联脚本 + 外部脚本 + fetch 加载的组件片段"""
+        usage = scan_html_usage(SCRIPT_BLOCK_RE.sub('', content))
+        for attrs, body in SCRIPT_BLOCK_RE.findall(content):
+            src = SCRIPT_SRC_RE.search(attrs)
+            if src:
+                js_path = resolve_local(html_path, src.group(1))
+                if js_path and js_path.exists():
+                    usage.update(self._script_usage(js_path))
+            if body.strip():
+                usage.update(scan_js_usage(body))
+        if depth < 2:
+            for frag_url in FETCH_HTML_RE.findall(content):
+                frag = resolve_local(html_path, frag_url)
+                if frag and frag.exists():
+                    usage.update(self._fragment_usage(frag, depth + 1))
+        return usage
+
+    def _fragment_usage(self, frag: Path, depth: int) -> UsageSet:
+        if frag not in self._fragment_cache:
+            text = frag.read_text(encoding='utf-8', errors='ignore')
+            self._fragment_cache[frag] = self._document_usage(frag, text, depth)
+        return self._fragment_cache[frag]
+
+    def _page_stylesheets(self, html_path: Path, content: str) -> list:
+        """页面引用的样式表（<link> + PAGE_STYLE_MAP 映射的专属样式）"""
+        sheets = []
+        for link in STYLE_LINK_RE.findall(content):
+            href = HREF_RE.search(link)
+            if not href:
+                continue
+            target = resolve_local(html_path, href.group(1))
+            if target and target in self.rules and target not in sheets:
+                sheets.append(target)
+        mapped = PAGE_STYLE_MAP.get(html_path.name)
+        if mapped:
+            target = (self.styles_dir / mapped).resolve()
+            if target in self.rules and target not in sheets:
+                sheets.append(target)
+        # 加载统一侧边栏的页面同时使用侧边栏样式
+        if '_unified-sidebar.html' in content:
+            target = (self.styles_dir / 'unified-sidebar.css').resolve()
+            if target in self.rules and target not in sheets:
+                sheets.append(target)
+        return sheets
+
+    def scan_pages(self):
+        """扫描全部页面与组件片段（跳过备份文件）"""
+        for html_path in sorted(get_inventory(self.admin_dir).paths(kinds=(PAGE, COMPONENT, TEST))):
+            content = html_path.read_text(encoding='utf-8', errors='ignore')
+            self.pages[html_path.resolve()] = {
+                'usage': self._document_usage(html_path, content),
+                'stylesheets': self._page_stylesheets(html_path.resolve(), content),
+            }
+
+    def analyze(self) -> dict:
+        """计算每个样式表/选择器的使用情况"""
+        if not self.rules:
+            self.load_stylesheets()
+        if not self.pages:
+            self.scan_pages()
+
+        sheet_pages: dict[Path, list] = {sheet: [] for sheet in self.rules}
+        for page, info in self.pages.items():
+            for sheet in info['stylesheets']:
+                sheet_pages[sheet].append(page)
+
+        report = {
+            'audit_time': datetime.now().isoformat(),
+            'summary': {
+                'stylesheets': len(self.rules),
+                'pages': len(self.pages),
+                'total_rules': 0,
+                'unused_rules': 0,
+                'total_bytes': 0,
+                'unused_bytes': 0,
+            },
+            'stylesheets': {},
+        }
+
+        for sheet, rules in self.rules.items():
+            pages = sheet_pages[sheet]
+            sheet_report = {
+                'linked_pages': [self._rel(p) for p in pages],
+                'total_rules': len(rules),
+                'unused_rules': 0,
+                'total_bytes': sum(r.size for r in rules),
+                'unused_bytes': 0,
+                'selectors': {},
+                'unused': [],
+            }
+            for rule in rules:
+                if rule.at_rule:
+                    continue
+                rule_used = False
+                for selector in rule.selectors:
+                    hits = sum(1 for p in pages if selector_used(selector, self.pages[p]['usage']))
+                    sheet_report['selectors'][selector] = sheet_report['selectors'].get(selector, 0) + hits
+                    rule_used = rule_used or hits > 0
+                if not rule_used:
+                    sheet_report['unused_rules'] += 1
+                    sheet_report['unused_bytes'] += rule.size
+                    sheet_report['unused'].append({
+                        'selectors': rule.selectors,
+                        'context': rule.context,
+                        'bytes': rule.size,
+                    })
+            report['stylesheets'][self._rel(sheet)] = sheet_report
+            for key in ('total_rules', 'unused_rules', 'total_bytes', 'unused_bytes'):
+                report['summary'][key] += sheet_report[key]
+        return report
+
+    def critical_css_for_page(self, page: Path, output_file: Path) -> str:
+        """生成页面裁剪后的关键样式表（仅保留命中的规则，保持原有顺序与 @media 包裹）"""
+        info = self.pages[page]
+        chunks = []
+        for sheet in info['stylesheets']:
+            chunks.append(f'/* {sheet.name} */')
+            current_context, buffer = None, []
+            for rule in self.rules[sheet]:
+                keep = rule.at_rule or any(selector_used(s, info['usage']) for s in rule.selectors)
+                if not keep:
+                    continue
+                text = rewrite_css_urls(rule.text, sheet.parent, output_file.parent)
+                if rule.context != current_context:
+                    if current_context:
+                        chunks.append(f'{current_context} {{\n' + '\n'.join(buffer) + '\n}')
+                    elif buffer:
+                        chunks.extend(buffer)
+                    current_context, buffer = rule.context, []
+                buffer.append(text)
+            if current_context:
+                chunks.append(f'{current_context} {{\n' + '\n'.join(buffer) + '\n}')
+            else:
+                chunks.extend(buffer)
+        return '\n'.join(chunks) + '\n'
+
+    def emit_critical(self, output_dir: Path) -> list:
+        """为每个完整页面输出裁剪后的关键样式表"""
+        written = []
+        for page, info in self.pages.items():
+            if not info['stylesheets'] or page.name.startswith('_'):
+                continue
+            rel = page.relative_to(self.admin_dir.resolve())
+            output_file = (Path(output_dir) / rel).with_suffix('.critical.css')
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            css = self.critical_css_for_page(page, output_file.resolve())
+            write_text_atomic(output_file, css)
+            written.append(output_file)
+        return written
+
+    def _rel(self, path: Path) -> str:
+        try:
+            return str(path.relative_to(ROOT))
+        except ValueError:
+            return str(path)
+
+    def print_summary(self, report: dict, top: int = 10):
+        """打印分析摘要"""
+        summary = report['summary']
+        ratio = summary['unused_bytes'] / summary['total_bytes'] * 100 if summary['total_bytes'] else 0
+        print(f"\n🎯 CSS使用率分析完成:")
+        print(f"   🎨 样式表: {summary['stylesheets']} 个, 页面: {summary['pages']} 个")
+        print(f"   📏 规则: {summary['total_rules']} 条, 未使用: {summary['unused_rules']} 条")
+        print(f"   💾 体积: {summary['total_bytes'] / 1024:.1f} KB, 可裁剪: {summary['unused_bytes'] / 1024:.1f} KB ({ratio:.1f}%)")
+        ranked = sorted(report['stylesheets'].items(), key=lambda kv: kv[1]['unused_bytes'], reverse=True)
+        print(f"\n📊 未使用字节最多的样式表 (Top {top}):")
+        for name, data in ranked[:top]:
+            orphan = ' ⚠️ 无页面引用' if not data['linked_pages'] else ''
+            print(f"   - {name}: {data['unused_rules']}/{data['total_rules']} 条, {data['unused_bytes'] / 1024:.1f} KB{orphan}")
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='医保审核系统CSS使用率分析与冗余规则裁剪')
+    parser.add_argument('--output', type=str, help='JSON报告输出路径（默认 audit_reports/css_usage_<时间>.json）')
+    parser.add_argument('--emit-critical', type=str, metavar='DIR', help='为每个页面输出裁剪后的关键样式表到指定目录')
+    parser.add_argument('--top', type=int, default=10, help='摘要中列出的样式表数量')
+
+    args = parser.parse_args()
+
+    analyzer = CSSUsageAnalyzer()
+    print("🔍 解析样式表与页面...")
+    report = analyzer.analyze()
+
+    AUDIT_DIR.mkdir(parents=True, exist_ok=True)
+    output = Path(args.output) if args.output else AUDIT_DIR / f"css_usage_{analyzer.timestamp}.json"
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    analyzer.print_summary(report, args.top)
+    print(f"\n📄 分析报告: {output}")
+
+    if args.emit_critical:
+        written = analyzer.emit_critical(Path(args.emit_critical))
+        print(f"✂️  已输出 {len(written)} 个页面关键样式表到: {args.emit_critical}")
+
+
+if __name__ == '__main__':
+    main()
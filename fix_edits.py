@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI修复的结构化编辑
+
+AI修复原先以整个文件为单位：模型返回完整文件（或由片段拼接成完整文件），apply_ai_fix 整体重写，
+validate_fix 再读回整个文件重新跑一遍正则。大页面上插入一行面包屑也意味着巨大的模型输出与整文件验证。
+现在修复结果统一表示为针对原文件的编辑操作：
+1. 锚定编辑（模型首选的返回格式，JSON）：
+   {"edits": [{"op": "insert_before|insert_after|replace", "anchor": "原文片段", "text": "新内容", "occurrence": 1}]}
+   occurrence 为锚点第几次出现（从 1 开始），省略时锚点必须唯一；
+   anchor 为空时 insert_before / insert_after 分别表示文件开头 / 结尾（同样受下述结构校验约束）
+2. 统一差异格式（@@ 块），每个块按“上下文 + 删除行”定位，替换为“上下文 + 新增行”
+3. 片段或完整文件形式的响应按行差异转换为最小的替换操作
+所有编辑（包括由片段、完整文件响应转换而来的）先在解析出的标签区间上校验
+（锚点存在且唯一、插入位置不在标签内部、编辑互不重叠），
+以及文档结构（不在 <!DOCTYPE> 之前写入内容，正文内容只能写入 <body> 内部），再原地应用；
+验证只检查被修改的区域，每个编辑随备份会话记录（回滚按备份的整文件版本进行）。
+"""
+
+import re
+import json
+import bisect
+import difflib
+from dataclasses import dataclass, asdict
+from typing import List, Optional, Tuple
+
+EDIT_OPS = ('insert_before', 'insert_after', 'replace')
+# 标签、注释与 script/style 整块：编辑边界不能落在这些区间内部
+MARKUP_RE = re.compile(r'<!--[\s\S]*?-->|<(script|style)\b[^>]*>[\s\S]*?</\1\s*>|<[^>]*>', re.IGNORECASE)
+JSON_FENCE_RE = re.compile(r'```(?:json)?\s*\n([\s\S]*?)\n```')
+HUNK_RE = re.compile(r'^@@ -\d+(?:,\d+)? \+\d+(?:,\d+)? @@', re.MULTILINE)
+DOCTYPE_RE = re.compile(r'<!doctype\b[^>]*>', re.IGNORECASE)
+BODY_OPEN_RE = re.compile(r'<body\b[^>]*>', re.IGNORECASE)
+BODY_CLOSE_RE = re.compile(r'</body\s*>', re.IGNORECASE)
+FIRST_TAG_RE = re.compile(r'\s*(?:<!--[\s\S]*?-->\s*)*<(!?[a-zA-Z][\w-]*)')
+# 可以出现在 <body> 之外的元素；以其他标签或文本开头的编辑内容视为正文内容
+NON_BODY_TAGS = {
+    '!doctype', 'html', 'head', 'body', 'meta', 'link', 'title', 'base', 'style', 'script', 'noscript', 'template',
+}
+
+
+@dataclass
+class FixEdit:
+    """模型给出的编辑（按锚点文本定位）"""
+    op: str
+    anchor: str
+    text: str = ''
+    occurrence: int = 0
+
+
+@dataclass
+class TextEdit:
+    """定位后的编辑：把原文件 [start, end) 的 old 替换为 new"""
+    start: int
+    end: int
+    old: str
+    new: str
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def parse_edits(response: str) -> Optional[List[FixEdit]]:
+    """解析锚定编辑（JSON）或统一差异；响应不是编辑格式时返回 None"""
+    if not response:
+        return None
+    text = response.strip()
+    fence = JSON_FENCE_RE.search(text)
+    if fence:
+        text = fence.group(1).strip()
+    if text.startswith('{'):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            data = None
+        if isinstance(data, dict) and isinstance(data.get('edits'), list):
+            edits = []
+            for item in data['edits']:
+                if item.get('op') not in EDIT_OPS:
+                    raise ValueError(f"未知的编辑操作: {item.get('op')}")
+                edits.append(FixEdit(item['op'], item.get('anchor', ''), item.get('text', ''),
+                                     int(item.get('occurrence', 0))))
+            return edits
+    if HUNK_RE.search(response):
+        return parse_unified_diff(response)
+    return None
+
+
+def parse_unified_diff(diff: str) -> List[FixEdit]:
+    """统一差异的每个块转换为一次替换：锚点 = 上下文 + 删除行，新内容 = 上下文 + 新增行"""
+    edits, old, new, in_hunk = [], [], [], False
+
+    def flush():
+        if in_hunk and (old != new):
+            if not old:
+                raise ValueError('差异块缺少上下文，无法定位')
+            edits.append(FixEdit('replace', '\n'.join(old), '\n'.join(new)))
+
+    for line in diff.splitlines():
+        if HUNK_RE.match(line):
+            flush()
+            old, new, in_hunk = [], [], True
+        elif not in_hunk or line.startswith(('--- ', '+++ ', '\\')):
+            continue
+        elif line.startswith('-'):
+            old.append(line[1:])
+        elif line.startswith('+'):
+            new.append(line[1:])
+        else:
+            old.append(line[1:])
+            new.append(line[1:])
+    flush()
+    return edits
+
+
+def is_body_content(text: str) -> bool:
+    """编辑内容是否为正文内容（以正文元素或非空文本开头）"""
+    m = FIRST_TAG_RE.match(text)
+    if m:
+        return m.group(1).lower() not in NON_BODY_TAGS
+    return bool(re.sub(r'<!--[\s\S]*?-->', '', text).strip())
+
+
+class MarkupIndex:
+    """页面中标签 / 注释 / script、style 整块的区间，用于校验编辑边界"""
+
+    def __init__(self, content: str):
+        self.spans = []
+        self.raw_text = []  # script/style 的内容区间
+        for m in MARKUP_RE.finditer(content):
+            if m.group(1):
+                # script/style 只有开始、结束标签不可拆开，内容（CSS 规则、脚本语句）可以按行编辑
+                open_end = content.index('>', m.start()) + 1
+                close_start = content.rindex('</', m.start(), m.end())
+                self.spans.append((m.start(), open_end))
+                self.spans.append((close_start, m.end()))
+                self.raw_text.append((open_end, close_start))
+            else:
+                self.spans.append((m.start(), m.end()))
+        self.starts = [s for s, _ in self.spans]
+        self.raw_starts = [s for s, _ in self.raw_text]
+        doctype = DOCTYPE_RE.search(content)
+        self.doctype_start = doctype.start() if doctype else None
+        # 正文区间：<body> 开始标签之后到 </body> 之前；片段文件（无 <body>）不做限制
+        body_open = BODY_OPEN_RE.search(content)
+        body_closes = list(BODY_CLOSE_RE.finditer(content, body_open.end())) if body_open else []
+        self.body = (body_open.end(), body_closes[-1].start() if body_closes else len(content)) if body_open else None
+
+    def enclosing(self, pos: int) -> Optional[Tuple[int, int]]:
+        """严格包含 pos 的区间（pos 落在标签边界上时返回 None）"""
+        i = bisect.bisect_right(self.starts, pos) - 1
+        if i >= 0 and self.spans[i][0] < pos < self.spans[i][1]:
+            return self.spans[i]
+        return None
+
+    def in_raw_text(self, start: int, end: int) -> bool:
+        """[start, end) 是否位于同一个 script/style 的内容中"""
+        i = bisect.bisect_right(self.raw_starts, start) - 1
+        return i >= 0 and self.raw_text[i][0] <= start and end <= self.raw_text[i][1]
+
+
+def _locate(content: str, edit: FixEdit) -> int:
+    """锚点在原文中的位置"""
+    positions, pos = [], content.find(edit.anchor)
+    while pos != -1:
+        positions.append(pos)
+        if not edit.occurrence and len(positions) > 1:
+            raise ValueError(f'锚点不唯一: {edit.anchor[:60]!r}')
+        pos = content.find(edit.anchor, pos + 1)
+    index = (edit.occurrence or 1) - 1
+    if index >= len(positions):
+        raise ValueError(f'锚点不存在: {edit.anchor[:60]!r}')
+    return positions[index]
+
+
+def resolve_edits(content: str, edits: List[FixEdit]) -> List[TextEdit]:
+    """把锚定编辑定位到原文并校验：插入位置不在标签内部，替换不拆开标签，编辑互不重叠"""
+    markup = MarkupIndex(content)
+    resolved = []
+    for edit in edits:
+        if not edit.anchor:
+            if edit.op == 'replace':
+                raise ValueError('replace 操作缺少锚点')
+            pos = 0 if edit.op == 'insert_before' else len(content)
+            resolved.append(TextEdit(pos, pos, '', edit.text))
+            continue
+        start = _locate(content, edit)
+        end = start + len(edit.anchor)
+        if edit.op == 'insert_before':
+            resolved.append(TextEdit(start, start, '', edit.text))
+        elif edit.op == 'insert_after':
+            resolved.append(TextEdit(end, end, '', edit.text))
+        else:
+            resolved.append(TextEdit(start, end, edit.anchor, edit.text))
+    return check_edits(content, resolved, markup)
+
+
+def check_edits(content: str, edits: List[TextEdit], markup: Optional[MarkupIndex] = None) -> List[TextEdit]:
+    """
+    校验定位后的编辑（锚定编辑与按行差异得到的编辑共用）：
+    插入位置不在标签内部，替换不拆开标签，符合文档结构，编辑互不重叠
+    """
+    markup = markup or MarkupIndex(content)
+    for edit in edits:
+        outer = markup.enclosing(edit.start)
+        if edit.start == edit.end:
+            if outer:
+                raise ValueError(f'插入位置位于标签内部: {content[outer[0]:outer[1]][:60]!r}')
+        elif outer != markup.enclosing(edit.end) and (outer or markup.enclosing(edit.end)):
+            # 替换区间要么完全在同一个标签内（修改属性），要么两端都在标签之外
+            raise ValueError(f'替换区间拆开了标签: {edit.old[:60]!r}')
+        check_structure(markup, edit)
+    check_overlaps(edits)
+    return edits
+
+
+def check_structure(markup: MarkupIndex, edit: TextEdit):
+    """文档结构校验：<!DOCTYPE> 之前不写入内容，正文内容只能写入 <body> 内部"""
+    doctype = markup.doctype_start
+    if doctype is not None and (edit.start < doctype or (edit.start == edit.end == doctype)):
+        raise ValueError(f'编辑位于 <!DOCTYPE> 之前: {edit.new[:60]!r}')
+    if markup.body and is_body_content(edit.new) and not markup.in_raw_text(edit.start, edit.end):
+        body_start, body_end = markup.body
+        if edit.start < body_start or edit.end > body_end:
+            raise ValueError(f'正文内容位于 <body> 之外: {edit.new[:60]!r}')
+
+
+def check_overlaps(edits: List[TextEdit]):
+    ordered = sorted(edits, key=lambda e: (e.start, e.end))
+    for prev, cur in zip(ordered, ordered[1:]):
+        if cur.start < prev.end or (cur.start == prev.start and prev.start == prev.end == cur.end):
+            raise ValueError(f'编辑区间重叠: [{prev.start}, {prev.end}) 与 [{cur.start}, {cur.end})')
+
+
+def diff_edits(old: str, new: str, offset: int = 0) -> List[TextEdit]:
+    """按行差异把“新全文”转换为最小的替换操作（offset 为 old 在文件中的起点）"""
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    old_pos = [0]
+    for line in old_lines:
+        old_pos.append(old_pos[-1] + len(line))
+    edits = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag != 'equal':
+            edits.append(TextEdit(offset + old_pos[i1], offset + old_pos[i2],
+                                  ''.join(old_lines[i1:i2]), ''.join(new_lines[j1:j2])))
+    return edits
+
+
+def apply_edits(content: str, edits: List[TextEdit]) -> str:
+    """原地应用编辑；原文对应位置的内容与编辑记录不一致时抛出 ValueError"""
+    result = content
+    for edit in sorted(edits, key=lambda e: (e.start, e.end), reverse=True):
+        if content[edit.start:edit.end] != edit.old:
+            raise ValueError(f'文件在生成修复后已被修改: 位置 {edit.start}')
+        result = result[:edit.start] + edit.new + result[edit.end:]
+    return result
+
+
+def edited_spans(edits: List[TextEdit]) -> List[Tuple[int, int]]:
+    """编辑后的文件中被修改的区间"""
+    spans, delta = [], 0
+    for edit in sorted(edits, key=lambda e: (e.start, e.end)):
+        start = edit.start + delta
+        spans.append((start, start + len(edit.new)))
+        delta += len(edit.new) - (edit.end - edit.start)
+    return spans
+
+
+def touched_text(content: str, edits: List[TextEdit]) -> str:
+    """编辑后文件中被修改的区域（扩展到整行），供验证使用"""
+    parts = []
+    for start, end in edited_spans(edits):
+        line_start = content.rfind('\n', 0, start) + 1
+        line_end = content.find('\n', end)
+        parts.append(content[line_start:line_end if line_end != -1 else len(content)])
+    return '\n'.join(parts)
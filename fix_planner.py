@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+模板级修复传播
+
+规则管理、审核管理下的许多页面共用同一套骨架，auto_fix_issues 原先对每个页面重复执行
+相同的正则改写（fix_missing_breadcrumb、fix_responsive_issues、fix_missing_loading_states 等）。
+修复规划器：
+1. 按结构指纹（骨架元素的标签路径集合）把待修复页面分簇
+2. 每簇只对代表页面运行一次修复器，把修改前后的差异提取为定位补丁：
+   每处插入以“某标签路径第 n 次出现的开始/结束标签之前/之后”定位，
+   补丁文本中与页面相关的部分（面包屑、标题）以参数占位
+3. 簇内其他页面按定位补丁直接插入，再用廉价的问题检查确认修复生效；
+   定位失败或检查不通过的页面退回逐页修复
+批量修复的耗时与簇数而不是页面数成正比。
+"""
+
+import re
+import difflib
+import hashlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from atomic_io import write_text_atomic
+from fix_strategies import FIX_STRATEGIES, BusinessLogicFixer
+
+# 骨架深度：更深的元素（卡片、表格行、列表项等）随页面内容变化，不计入指纹
+SKELETON_DEPTH = 4
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr', '!doctype',
+}
+MARKUP_RE = re.compile(r'<!--[\s\S]*?-->|<(script|style)\b[^>]*>[\s\S]*?</\1\s*>|<[^>]*>', re.IGNORECASE)
+TOKEN_RE = re.compile(MARKUP_RE.pattern + r'|[^<]+', re.IGNORECASE)
+TAG_RE = re.compile(r'<(/?)([a-zA-Z!][\w-]*)([^>]*)>')
+CLASS_RE = re.compile(r'\bclass=["\']([^"\']*)["\']')
+
+_business = BusinessLogicFixer()
+
+# 支持模板传播的修复策略：问题检查（返回 True 表示问题仍存在）
+ISSUE_CHECKS: Dict[str, Callable[[str], bool]] = {
+    'fix_missing_breadcrumb': lambda c: 'breadcrumb' not in c.lower() and '面包屑' not in c,
+    'fix_missing_page_title': lambda c: not re.search(r'<h1[^>]*>', c, re.IGNORECASE),
+    'fix_responsive_issues': lambda c: 'viewport' not in c,
+    'fix_missing_loading_states': lambda c: (
+        ('fetch(' in c or 'XMLHttpRequest' in c or '$.ajax' in c)
+        and not ('loading' in c.lower() or 'spinner' in c.lower())
+    ),
+}
+# 补丁文本中随页面变化的参数
+PAGE_PARAMETERS: Dict[str, List[Callable[[Path], str]]] = {
+    'fix_missing_breadcrumb': [_business._generate_breadcrumb],
+    'fix_missing_page_title': [_business._generate_page_title],
+}
+
+
+@dataclass
+class TagToken:
+    start: int
+    end: int
+    key: Tuple[str, int, str]  # (标签路径, 出现序号, open/close)
+
+
+class PageSkeleton:
+    """页面的标签序列：结构指纹 + 标签边界定位"""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.tags: List[TagToken] = []
+        self.by_key: Dict[Tuple[str, int, str], TagToken] = {}
+        self.ends: Dict[int, TagToken] = {}    # 标签结束位置 -> 标签
+        self.starts: Dict[int, TagToken] = {}  # 标签开始位置 -> 标签
+        paths = set()
+        stack: List[str] = []
+        names: List[str] = []  # 与 stack 对应的标签名
+        seen: Dict[Tuple[str, str], int] = {}
+
+        for m in MARKUP_RE.finditer(content):
+            text = m.group(0)
+            if text.startswith('<!--'):
+                continue
+            tag_m = TAG_RE.match(text)
+            if not tag_m:
+                continue
+            closing, name, attrs = tag_m.group(1), tag_m.group(2).lower(), tag_m.group(3)
+            if m.group(1):  # script/style 整块：视为一个开始标签
+                closing, name = '', m.group(1).lower()
+            if closing:
+                if name not in names:
+                    continue
+                while names.pop() != name:
+                    stack.pop()
+                label = stack.pop()
+                path = '>'.join(stack + [label])
+                edge = 'close'
+            else:
+                class_m = CLASS_RE.search(attrs)
+                label = name + ('.' + '.'.join(sorted(class_m.group(1).split())) if class_m and name == 'div' else '')
+                path = '>'.join(stack + [label])
+                edge = 'open'
+                if len(stack) < SKELETON_DEPTH:
+                    paths.add(path)
+                if name not in VOID_ELEMENTS and not m.group(1) and not text.endswith('/>'):
+                    stack.append(label)
+                    names.append(name)
+            n = seen.get((path, edge), 0)
+            seen[(path, edge)] = n + 1
+            token = TagToken(m.start(), m.end(), (path, n, edge))
+            self.tags.append(token)
+            self.by_key[token.key] = token
+            self.ends[token.end] = token
+            self.starts[token.start] = token
+
+        self.fingerprint = hashlib.sha1('\n'.join(sorted(paths)).encode('utf-8')).hexdigest()
+
+    def anchor_for(self, offset: int) -> Optional[Tuple[Tuple[str, int, str], str]]:
+        """把源码位置转换为标签锚点：(标签键, after/before)；空白文本中的位置吸附到前一个标签之后"""
+        if offset in self.ends:
+            return self.ends[offset].key, 'after'
+        if offset in self.starts:
+            return self.starts[offset].key, 'before'
+        prev = max((t for t in self.tags if t.end <= offset), key=lambda t: t.end, default=None)
+        if prev is not None and not self.content[prev.end:offset].strip():
+            return prev.key, 'after'
+        return None
+
+    def resolve(self, anchor: Tuple[Tuple[str, int, str], str]) -> Optional[int]:
+        key, side = anchor
+        token = self.by_key.get(key)
+        if token is None:
+            return None
+        return token.end if side == 'after' else token.start
+
+
+@dataclass
+class PositionalPatch:
+    strategy: str
+    inserts: List[Tuple[Tuple[Tuple[str, int, str], str], str]]  # (锚点, 插入文本模板)
+    params: List[str] = field(default_factory=list)  # 代表页面的参数值
+
+    def render(self, page_path: Path) -> List[Tuple[Tuple[Tuple[str, int, str], str], str]]:
+        """为某个页面生成插入文本：代表页面的参数值替换为该页面的参数值"""
+        values = [fn(page_path) for fn in PAGE_PARAMETERS.get(self.strategy, [])]
+        inserts = []
+        for anchor, text in self.inserts:
+            for i, value in enumerate(values):
+                text = text.replace(f'@@param{i}@@', value)
+            inserts.append((anchor, text))
+        return inserts
+
+
+def build_patch(strategy: str, page_path: Path, skeleton: PageSkeleton, after: str) -> Optional[PositionalPatch]:
+    """由代表页面修复前的骨架与修复后的内容提取定位补丁；存在删除或无法定位的修改时返回 None"""
+    before = skeleton.content
+    old_tokens = [m.group(0) for m in TOKEN_RE.finditer(before)]
+    new_tokens = [m.group(0) for m in TOKEN_RE.finditer(after)]
+    offsets = [0]
+    for token in old_tokens:
+        offsets.append(offsets[-1] + len(token))
+
+    params = [fn(page_path) for fn in PAGE_PARAMETERS.get(strategy, [])]
+    inserts = []
+    matcher = difflib.SequenceMatcher(None, old_tokens, new_tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            continue
+        old, new = ''.join(old_tokens[i1:i2]), ''.join(new_tokens[j1:j2])
+        # 只接受纯插入：去掉公共前后缀后原文应为空；优先在 token 边界插入
+        if new.endswith(old):
+            prefix, suffix = 0, len(old)
+        elif new.startswith(old):
+            prefix, suffix = len(old), 0
+        else:
+            prefix = next((k for k in range(min(len(old), len(new))) if old[k] != new[k]), min(len(old), len(new)))
+            suffix = 0
+            while suffix < len(old) - prefix and old[len(old) - 1 - suffix] == new[len(new) - 1 - suffix]:
+                suffix += 1
+            if len(old) - prefix - suffix > 0:
+                return None
+        anchor = skeleton.anchor_for(offsets[i1] + prefix)
+        # 指纹只保证骨架元素一致，锚定在更深元素上的修改不能传播
+        if anchor is None or anchor[0][0].count('>') >= SKELETON_DEPTH:
+            return None
+        text = new[prefix:len(new) - suffix]
+        for i, value in enumerate(params):
+            if value:
+                text = text.replace(value, f'@@param{i}@@')
+        inserts.append((anchor, text))
+    return PositionalPatch(strategy, inserts, params) if inserts else None
+
+
+def apply_patch(patch: PositionalPatch, page_path: Path, skeleton: PageSkeleton) -> Optional[str]:
+    """按定位补丁修改页面；锚点缺失或修改后问题仍存在时返回 None"""
+    content = skeleton.content
+    positioned = []
+    for anchor, text in patch.render(page_path):
+        pos = skeleton.resolve(anchor)
+        if pos is None:
+            return None
+        positioned.append((pos, text))
+    new_content = content
+    for pos, text in sorted(positioned, key=lambda p: p[0], reverse=True):
+        new_content = new_content[:pos] + text + new_content[pos:]
+    if ISSUE_CHECKS[patch.strategy](new_content):
+        return None
+    return new_content
+
+
+class FixPlanner:
+    """按结构指纹分簇，代表页面修复一次，定位补丁传播到簇内其他页面"""
+
+    def __init__(self):
+        self.stats = {'pages': 0, 'clusters': 0, 'fixer_runs': 0, 'propagated': 0, 'fallbacks': 0, 'skipped': 0,
+                      'failed': 0}
+        self.failures: Dict[Path, str] = {}  # 最近一批中修复失败的页面 -> 错误信息
+
+    @staticmethod
+    def supports(strategy: str) -> bool:
+        return strategy in ISSUE_CHECKS and strategy in FIX_STRATEGIES
+
+    def cluster(self, pages: List[Path]) -> Dict[str, List[Tuple[Path, PageSkeleton]]]:
+        """结构指纹 -> [(页面, 骨架)]；组件片段各自单独成簇"""
+        clusters: Dict[str, List[Tuple[Path, PageSkeleton]]] = {}
+        for page in pages:
+            skeleton = PageSkeleton(page.read_text(encoding='utf-8', errors='ignore'))
+            key = f'component:{page}' if page.name.startswith('_') else skeleton.fingerprint
+            clusters.setdefault(key, []).append((page, skeleton))
+        return clusters
+
+    def _fail(self, page: Path, error: Exception):
+        self.stats['failed'] += 1
+        self.failures[page] = str(error)
+
+    def _run_fixer(self, strategy: str, page: Path) -> Optional[List[str]]:
+        """运行原修复器；单个页面出错时记录到 failures 并返回 None，不中断同批其他页面"""
+        self.stats['fixer_runs'] += 1
+        try:
+            return FIX_STRATEGIES[strategy](page)
+        except Exception as e:
+            self._fail(page, e)
+            return None
+
+    def fix_pages(self, strategy: str, pages: List[Path]) -> Dict[Path, List[str]]:
+        """修复一批存在同一问题的页面，返回 页面 -> 修改说明；失败的页面记录在 failures 中"""
+        check = ISSUE_CHECKS[strategy]
+        results: Dict[Path, List[str]] = {}
+        self.failures = {}
+        for members in self.cluster(pages).values():
+            self.stats['clusters'] += 1
+            self.stats['pages'] += len(members)
+            pending = [(p, sk) for p, sk in members if check(sk.content)]
+            self.stats['skipped'] += len(members) - len(pending)
+            members = pending
+            patch = None
+            representative = None
+            for index, (page, skeleton) in enumerate(members):
+                if patch is None:
+                    # 代表页面（以及补丁无法提取时的每个页面）运行原修复器；
+                    # 代表页面修复失败时由下一个页面担任代表
+                    changes = self._run_fixer(strategy, page)
+                    if changes is None:
+                        continue
+                    results[page] = changes
+                    if index < len(members) - 1:
+                        after = page.read_text(encoding='utf-8', errors='ignore')
+                        patch = build_patch(strategy, page, skeleton, after) or False
+                        representative = page
+                    continue
+                new_content = apply_patch(patch, page, skeleton) if patch else None
+                if new_content is None:
+                    self.stats['fallbacks'] += 1
+                    changes = self._run_fixer(strategy, page)
+                    if changes is not None:
+                        results[page] = changes
+                    continue
+                try:
+                    write_text_atomic(page, new_content)
+                except OSError as e:
+                    self._fail(page, e)
+                    continue
+                self.stats['propagated'] += 1
+                results[page] = [f"{strategy}: 按模板补丁修复 {page.name}（代表页面 {representative.name}）"]
+        return results
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI修复调度：按单位成本的预期得分收益排序
+
+AIAuditFixController._filter_problems 原先按优先级排序后直接取前 max_fixes_per_cycle 个问题，
+不区分修复的成本与成功率。调度器为每个问题估算：
+1. 收益 = 问题的评分权重（UnifiedAuditSystem.priority_weights × 每个问题 5 分）× 该修复策略的历史成功率
+   （成功率带先验：(成功 + 1) / (尝试 + 2)，新策略按 50% 计）
+2. 成本 = 该策略历史平均耗时，没有历史时按 analyze_problem 给出的 estimated_complexity 估算
+按 收益/成本 放入优先队列，依次取出，直到达到每轮数量上限或预计耗时超出时间预算：
+同一文件的修复串行执行，不同文件按模型并发数并行，预计耗时取两者中较大者。
+每轮结束后记录各策略的尝试次数、成功次数与耗时，持久化到 audit_reports/fix_strategy_stats.json。
+"""
+
+import json
+import heapq
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from atomic_io import write_text_atomic
+
+try:
+    from audit_config import AUDIT_DIR, AI_FIX_CONCURRENCY, AI_FIX_CYCLE_BUDGET
+except ImportError:
+    AUDIT_DIR = Path(__file__).resolve().parent / 'audit_reports'
+    AI_FIX_CONCURRENCY = 10
+    AI_FIX_CYCLE_BUDGET = 300
+
+FIX_STATS_FILE = AUDIT_DIR / 'fix_strategy_stats.json'
+# 没有历史数据时各复杂度的预计耗时（秒）
+COMPLEXITY_SECONDS = {'low': 5.0, 'medium': 15.0, 'high': 40.0}
+DEFAULT_PRIORITY_WEIGHTS = {'P0': 2.0, 'P1': 1.0, 'P2': 0.3}
+# 每个问题对页面评分的最大扣分（与 UnifiedAuditSystem 的评分规则一致）
+POINTS_PER_ISSUE = 5
+
+
+@dataclass
+class ScheduledFix:
+    problem: Dict[str, Any]
+    strategy: str
+    gain: float      # 预期得分收益
+    cost: float      # 预计耗时（秒）
+    success_rate: float
+
+    @property
+    def ratio(self) -> float:
+        return self.gain / max(self.cost, 0.1)
+
+
+class FixScheduler:
+    """按 收益/成本 选择每轮要修复的问题"""
+
+    def __init__(self, analyze: Callable[[Dict[str, Any]], Dict[str, Any]],
+                 priority_weights: Optional[Dict[str, float]] = None,
+                 stats_file: Path = FIX_STATS_FILE, concurrency: int = AI_FIX_CONCURRENCY):
+        self.analyze = analyze
+        self.priority_weights = priority_weights or DEFAULT_PRIORITY_WEIGHTS
+        self.stats_file = Path(stats_file)
+        self.concurrency = concurrency
+        self.history = self._load()
+        self.last_plan: Dict[str, Any] = {}
+
+    def _load(self) -> Dict[str, Dict[str, float]]:
+        try:
+            return json.loads(self.stats_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+
+    def success_rate(self, strategy: str) -> float:
+        stats = self.history.get(strategy, {})
+        return (stats.get('successes', 0) + 1) / (stats.get('attempts', 0) + 2)
+
+    def estimate_cost(self, strategy: str, complexity: str) -> float:
+        """历史平均耗时与复杂度先验的加权平均（先验相当于一次观测）"""
+        prior = COMPLEXITY_SECONDS.get(complexity, COMPLEXITY_SECONDS['medium'])
+        stats = self.history.get(strategy, {})
+        return (stats.get('seconds', 0.0) + prior) / (stats.get('attempts', 0) + 1)
+
+    def score(self, problem: Dict[str, Any]) -> ScheduledFix:
+        analysis = self.analyze(problem)
+        strategy = analysis.get('fix_strategy') or 'unknown'
+        rate = self.success_rate(strategy)
+        gain = self.priority_weights.get(problem.get('severity', 'P2'), 0.3) * POINTS_PER_ISSUE * rate
+        cost = self.estimate_cost(strategy, analysis.get('estimated_complexity', 'medium'))
+        return ScheduledFix(problem, strategy, gain, cost, rate)
+
+    def plan(self, problems: List[Dict[str, Any]], max_fixes: int,
+             time_budget: Optional[float] = AI_FIX_CYCLE_BUDGET) -> List[Dict[str, Any]]:
+        """
+        选出本轮要修复的问题
+
+        Returns:
+            按调度顺序排列的问题列表；未选中的问题留到后续轮次
+        """
+        queue = []
+        for index, problem in enumerate(problems):
+            item = self.score(problem)
+            heapq.heappush(queue, (-item.ratio, index, item))
+
+        selected: List[ScheduledFix] = []
+        lanes: Dict[str, float] = {}  # 文件 -> 串行累计耗时
+        total = 0.0
+        while queue and len(selected) < max_fixes:
+            _, _, item = heapq.heappop(queue)
+            path = item.problem.get('file_path', '')
+            lane = lanes.get(path, 0.0) + item.cost
+            wall = max(max(lanes.values(), default=0.0), lane, (total + item.cost) / self.concurrency)
+            if time_budget is not None and wall > time_budget:
+                continue  # 超出预算：留到后续轮次，继续尝试更便宜的问题
+            lanes[path] = lane
+            total += item.cost
+            selected.append(item)
+
+        self.last_plan = {
+            'candidates': len(problems),
+            'selected': len(selected),
+            'deferred': len(problems) - len(selected),
+            'expected_gain': sum(item.gain for item in selected),
+            'estimated_seconds': max(max(lanes.values(), default=0.0), total / self.concurrency),
+        }
+        return [item.problem for item in selected]
+
+    def record(self, fix_results: List[Dict[str, Any]]):
+        """记录一轮修复结果：按验证是否通过计成功，耗时取修复过程的实际耗时"""
+        for result in fix_results:
+            strategy = result.get('analysis', {}).get('fix_strategy') or 'unknown'
+            stats = self.history.setdefault(strategy, {'attempts': 0, 'successes': 0, 'seconds': 0.0})
+            stats['attempts'] += 1
+            stats['successes'] += 1 if result.get('validation', {}).get('is_fixed') else 0
+            stats['seconds'] += result.get('duration', 0.0)
+        write_text_atomic(self.stats_file, json.dumps(self.history, ensure_ascii=False, indent=2))
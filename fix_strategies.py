@@ -18,6 +18,8 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+from atomic_io import write_text_atomic
+
 # 导入公共配置
 try:
     from audit_config import (
@@ -54,7 +56,7 @@ class BusinessLogicFixer:
         # 对于组件页面（HTML片段），直接在开头添加面包屑
         if page_path.name.startswith('_') and not content.strip().startswith('<html'):
             new_content = f'{breadcrumb_html}\n{content}'
-            page_path.write_text(new_content, encoding='utf-8')
+            write_text_atomic(page_path, new_content)
             changes.append(f"添加面包屑导航到组件 {page_path.name}")
             return changes
         
@@ -69,13 +71,13 @@ class BusinessLogicFixer:
             if re.search(pattern, content, re.IGNORECASE):
                 new_content = re.sub(
                     pattern,
-                    f'{breadcrumb_html}\n\1',
+                    f'{breadcrumb_html}\n\\1',
                     content,
                     count=1,
                     flags=re.IGNORECASE
                 )
                 if new_content != content:
-                    page_path.write_text(new_content, encoding='utf-8')
+                    write_text_atomic(page_path, new_content)
                     changes.append(f"添加面包屑导航到 {page_path.name}")
                     break
         
@@ -95,7 +97,7 @@ class BusinessLogicFixer:
             page_title = self._generate_page_title(page_path)
             title_html = f'<h1 class="page-title">{page_title}</h1>'
             new_content = f'{title_html}\n{content}'
-            page_path.write_text(new_content, encoding='utf-8')
+            write_text_atomic(page_path, new_content)
             changes.append(f"添加页面标题到组件 {page_path.name}")
             return changes
         
@@ -115,7 +117,7 @@ class BusinessLogicFixer:
             if match:
                 insert_pos = match.end()
                 new_content = content[:insert_pos] + f'\n{title_html}\n' + content[insert_pos:]
-                page_path.write_text(new_content, encoding='utf-8')
+                write_text_atomic(page_path, new_content)
                 changes.append(f"添加页面标题到 {page_path.name}")
                 break
         
@@ -164,7 +166,7 @@ document.addEventListener('DOMContentLoaded', function() {
         # 在</body>前插入验证脚本
         if '</body>' in content and 'form' in content.lower():
             new_content = content.replace('</body>', f'{validation_script}\n</body>')
-            page_path.write_text(new_content, encoding='utf-8')
+            write_text_atomic(page_path, new_content)
             changes.append(f"添加表单验证脚本到 {page_path.name}")
         
         return changes
@@ -297,7 +299,7 @@ window.fetch = function(...args) {
                 new_content = new_content.replace('</body>', f'{loading_script}\n</body>')
             
             if new_content != content:
-                page_path.write_text(new_content, encoding='utf-8')
+                write_text_atomic(page_path, new_content)
                 changes.append(f"添加加载状态组件到 {page_path.name}")
         
         return changes
@@ -350,7 +352,7 @@ function showErrorMessage(message) {
             
             if '</body>' in content:
                 new_content = content.replace('</body>', f'{error_handling_script}\n</body>')
-                page_path.write_text(new_content, encoding='utf-8')
+                write_text_atomic(page_path, new_content)
                 changes.append(f"添加错误处理机制到 {page_path.name}")
         
         return changes
@@ -408,7 +410,7 @@ document.addEventListener('DOMContentLoaded', function() {
             
             if '</body>' in content:
                 new_content = content.replace('</body>', f'{accessibility_script}\n</body>')
-                page_path.write_text(new_content, encoding='utf-8')
+                write_text_atomic(page_path, new_content)
                 changes.append(f"添加无障碍访问支持到 {page_path.name}")
         
         return changes
@@ -453,7 +455,7 @@ class UIVisualFixer:
             scripts_html = '\n'.join([f'<script>\n{script}\n</script>' for script in unique_scripts])
             new_content = new_content.replace('</body>', f'{scripts_html}\n</body>')
             
-            page_path.write_text(new_content, encoding='utf-8')
+            write_text_atomic(page_path, new_content)
             changes.append(f"移除了{len(script_contents) - len(unique_scripts)}个重复脚本块")
         
         return changes
@@ -473,7 +475,7 @@ class UIVisualFixer:
                 missing_closes = div_open - div_close
                 close_tags = '</div>\n' * missing_closes
                 new_content = content.replace('</body>', f'{close_tags}</body>')
-                page_path.write_text(new_content, encoding='utf-8')
+                write_text_atomic(page_path, new_content)
                 changes.append(f"添加了{missing_closes}个缺失的div闭合标签")
             else:
                 # 如果闭合标签过多，记录但不自动修复（需要人工检查）
@@ -516,7 +518,7 @@ class UIVisualFixer:
                 
                 # 替换原有面包屑
                 new_content = re.sub(breadcrumb_pattern, new_breadcrumb, content, flags=re.IGNORECASE)
-                page_path.write_text(new_content, encoding='utf-8')
+                write_text_atomic(page_path, new_content)
                 changes.append(f"修复了面包屑重复项，保留{len(unique_items)}个唯一项")
         
         return changes
@@ -545,7 +547,7 @@ class UIVisualFixer:
                 # 如果没有head标签，在开头添加
                 new_content = f'{combined_style_block}\n{new_content}'
             
-            page_path.write_text(new_content, encoding='utf-8')
+            write_text_atomic(page_path, new_content)
             changes.append(f"合并了{len(styles)}个分散的样式块")
         
         return changes
@@ -579,7 +581,7 @@ class UIVisualFixer:
                     new_content = new_content.replace(match, new_match)
         
         if new_content != content:
-            page_path.write_text(new_content, encoding='utf-8')
+            write_text_atomic(page_path, new_content)
             changes.append(f"应用统一间距样式到 {page_path.name}")
         
         return changes
@@ -612,7 +614,7 @@ class UIVisualFixer:
             
             if '<head>' in content:
                 new_content = content.replace('<head>', f'<head>\n{viewport_meta}')
-                page_path.write_text(new_content, encoding='utf-8')
+                write_text_atomic(page_path, new_content)
                 changes.append(f"添加viewport meta标签到 {page_path.name}")
         
         # 添加基础响应式样式
@@ -666,7 +668,7 @@ class UIVisualFixer:
 '''
         
         new_content = content + spacing_css
-        self.common_css.write_text(new_content, encoding='utf-8')
+        write_text_atomic(self.common_css, new_content)
         return True
     
     def _ensure_color_variables(self) -> bool:
@@ -717,7 +719,7 @@ class UIVisualFixer:
 '''
         
         new_content = content + color_css
-        self.common_css.write_text(new_content, encoding='utf-8')
+        write_text_atomic(self.common_css, new_content)
         return True
     
     def _ensure_responsive_styles(self) -> bool:
@@ -769,7 +771,7 @@ class UIVisualFixer:
 '''
         
         new_content = content + responsive_css
-        self.common_css.write_text(new_content, encoding='utf-8')
+        write_text_atomic(self.common_css, new_content)
         return True
 
 
@@ -809,7 +811,7 @@ document.addEventListener('DOMContentLoaded', function() {
         
         if '</body>' in content and 'menu' in content.lower():
             new_content = content.replace('</body>', f'{highlight_script}\n</body>')
-            page_path.write_text(new_content, encoding='utf-8')
+            write_text_atomic(page_path, new_content)
             changes.append(f"添加菜单高亮脚本到 {page_path.name}")
         
         return changes
@@ -8,11 +8,14 @@
 3. 导航一致性评分
 4. 综合页面质量评估
 5. 生成结构化审查报告
+6. 静态导航审查：不启动浏览器，模拟侧边栏注入后的菜单状态计算导航评分
 """
 
 import os
+import re
 import json
 import time
+from html import unescape
 from pathlib import Path
 from datetime import datetime
 from selenium import webdriver
@@ -22,6 +25,11 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
+from perf_log_parser import PerformanceLogParser
+from resource_paths import group_page_variants
+from page_inventory import get_inventory
+from audit_profiler import PROFILER, profiled
+from sidebar_include import load_fragment, needs_browser, static_menu_data
 # 共享配置（若存在audit_config则优先使用）
 try:
     from audit_config import (
@@ -31,7 +39,6 @@ try:
         LOG_DIR as CFG_LOG_DIR,
         AUDIT_DIR as CFG_AUDIT_DIR,
         BASE_URL as CFG_BASE_URL,
-        AUDIT_PAGES as CFG_AUDIT_PAGES,
         STANDARD_MENU_STRUCTURE as CFG_STANDARD_MENU_STRUCTURE,
     )
     HAS_CFG = True
@@ -45,54 +52,6 @@ LOG_DIR = IMG_DIR / 'logs'
 AUDIT_DIR = Path('/Users/baiyumi/Mai/代码/chenyrweb/ybsh/audit_reports')
 BASE_URL = 'http://localhost:8000/1.0/超级管理员'
 
-# 需要审查的页面列表 - 按模块分组
-AUDIT_PAGES = {
-    '工作台': [
-        '工作台/平台运营看板.html', 
-        '工作台/报告规则分析.html',
-    ],
-    '审核管理': [
-        '审核管理/审核流程/事中审核检查.html',
-        '审核管理/审核流程/事前审核记录.html',
-        '审核管理/审核流程/事后审核任务列表.html',
-        '审核管理/审核结果/审核结果.html',
-    ],
-    '规则管理': [
-        '规则管理/规则操作/规则参数配置.html',
-        '规则管理/规则操作/创建规则.html',
-        '规则管理/规则操作/编辑规则.html',
-        '规则管理/规则操作/规则管理完整版.html',
-        '规则管理/规则列表/规则管理主页.html',
-        '规则管理/规则列表/门诊规则管理.html',
-        '规则管理/规则列表/医保规则管理系统v2.html',
-        '规则管理/规则详情/规则详情.html',
-        '规则管理/规则详情/门诊规则详情.html',
-        '规则管理/规则详情/临床规则详情.html',
-        '规则管理/规则详情/慢病规则详情.html',
-        '规则管理/规则详情/政策规则详情.html',
-    ],
-    '用户权限管理': [
-        '用户权限管理/用户管理/用户列表.html',
-        '用户权限管理/权限管理/权限管理.html',
-        '用户权限管理/组织管理/科室管理.html',
-        '用户权限管理/组织管理/企业详情.html',
-        '用户权限管理/组织管理/租户管理.html',
-        '用户权限管理/组织管理/租户表单.html',
-    ],
-    '系统管理': [
-        '系统管理/全局设置.html',
-        '系统管理/系统监控.html',
-    ],
-    '知识库': [
-        '系统管理/知识库目录.html?catalog=drug',
-        '系统管理/知识库目录.html?catalog=treatment',
-        '系统管理/知识库目录.html?catalog=material',
-    ],
-    '登录': [
-        '登录.html'
-    ]
-}
-
 # 标准菜单结构（从_unified-sidebar.html提取）
 STANDARD_MENU_STRUCTURE = {
     "工作台": {
@@ -171,6 +130,7 @@ STANDARD_MENU_STRUCTURE = {
     }
 }
 
+@profiled('driver.setup')
 def setup_driver():
     """设置Chrome WebDriver，启用日志采集（离线优先，多重回退）"""
     chrome_options = Options()
@@ -412,27 +372,79 @@ def calculate_navigation_score(menu_data, page_path):
     score["total"] = sum(score["details"].values())
     return score
 
-def parse_performance_logs(raw_logs):
-    """解析performance日志，统计网络错误"""
-    import json
-    net_errors = []
-    for entry in raw_logs:
-        try:
-            msg = json.loads(entry.get('message', '{}'))
-            message = msg.get('message', {})
-            method = message.get('method')
-            params = message.get('params', {})
-
-            if method == 'Network.loadingFailed':
-                url = params.get('url', '')
-                error_text = params.get('errorText', '')
-                net_errors.append(f"NetworkFailed: {url} | {error_text}")
-        except Exception:
-            continue
-    return net_errors
+# 导航前注入的性能观察脚本：记录 LCP、CLS 与长任务，供 collect_performance_metrics 读取
+PERF_OBSERVER_SCRIPT = """
+(function () {
+    var perf = window.__auditPerf = {lcp: 0, cls: 0, longTasks: 0, longTaskMs: 0, blockingMs: 0};
+    if (!window.PerformanceObserver) return;
+    function observe(type, callback) {
+        try {
+            new PerformanceObserver(function (list) { list.getEntries().forEach(callback); })
+                .observe({type: type, buffered: true});
+        } catch (e) {}
+    }
+    observe('largest-contentful-paint', function (entry) {
+        perf.lcp = Math.round(entry.renderTime || entry.loadTime || entry.startTime);
+    });
+    observe('layout-shift', function (entry) {
+        if (!entry.hadRecentInput) perf.cls += entry.value;
+    });
+    observe('longtask', function (entry) {
+        perf.longTasks += 1;
+        perf.longTaskMs += entry.duration;
+        perf.blockingMs += Math.max(0, entry.duration - 50);
+    });
+})();
+"""
+
+def install_performance_observer(driver):
+    """通过CDP在每个新文档加载前注入性能观察脚本（每个driver只注入一次）"""
+    if getattr(driver, '_audit_perf_observer', False):
+        return True
+    try:
+        driver.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': PERF_OBSERVER_SCRIPT})
+        driver._audit_perf_observer = True
+        return True
+    except Exception as e:
+        print(f"⚠️  性能观察脚本注入失败（LCP/CLS/长任务将缺失）: {e}")
+        return False
+
+def collect_performance_metrics(driver):
+    """采集页面性能指标：Navigation Timing、LCP/CLS/长任务、资源瀑布汇总、DOM节点数"""
+    try:
+        metrics = driver.execute_script("""
+            var nav = performance.getEntriesByType('navigation')[0] || {};
+            var resources = performance.getEntriesByType('resource');
+            var observed = window.__auditPerf || {};
+            var transfer = nav.transferSize || 0, encoded = nav.encodedBodySize || 0;
+            resources.forEach(function (r) {
+                transfer += r.transferSize || 0;
+                encoded += r.encodedBodySize || 0;
+            });
+            return {
+                ttfb_ms: Math.round(nav.responseStart || 0),
+                dcl_ms: Math.round(nav.domContentLoadedEventEnd || 0),
+                load_time_ms: Math.round(nav.loadEventEnd || 0),
+                lcp_ms: observed.lcp || null,
+                cls: observed.cls !== undefined ? Math.round(observed.cls * 1000) / 1000 : null,
+                long_tasks: observed.longTasks || 0,
+                long_task_ms: Math.round(observed.longTaskMs || 0),
+                total_blocking_ms: Math.round(observed.blockingMs || 0),
+                resource_count: resources.length,
+                resource_transfer_bytes: transfer,
+                resource_encoded_bytes: encoded,
+                dom_nodes: document.getElementsByTagName('*').length
+            };
+        """)
+        return metrics or {}
+    except Exception as e:
+        print(f"⚠️  性能指标采集失败: {e}")
+        return {}
 
-def collect_logs_and_errors(driver, page_name):
-    """采集控制台与网络错误日志"""
+@profiled('browser.collect_logs')
+def collect_logs_and_errors(driver, page_name, waterfall=None, log_parser=None):
+    """采集控制台与网络错误日志
+    传入 log_parser 时复用页面加载期间已增量解析的结果，只需取走剩余日志"""
     logs = []
     
     # 浏览器控制台日志
@@ -447,12 +459,12 @@ def collect_logs_and_errors(driver, page_name):
         pass
 
     # 网络错误日志
-    try:
-        perf_logs = driver.get_log('performance')
-        net_errors = parse_performance_logs(perf_logs)
-        logs.extend(net_errors)
-    except Exception:
-        pass
+    if log_parser is None:
+        log_parser = PerformanceLogParser()
+    log_parser.drain(driver)
+    logs.extend(log_parser.error_messages())
+    if waterfall is not None:
+        waterfall.update(log_parser.summary())
 
     # 保存到文件
     LOG_DIR.mkdir(parents=True, exist_ok=True)
@@ -466,24 +478,100 @@ def collect_logs_and_errors(driver, page_name):
     
     return logs
 
-def audit_single_page(driver, page_path, module_name):
-    """审查单个页面"""
+@profiled('browser.sidebar_ready')
+def measure_sidebar_ready(driver):
+    """测量侧边栏就绪耗时（相对导航开始，毫秒）
+    优先使用 initSidebar 打下的 sidebar-ready 标记；旧版加载脚本没有该标记时，
+    退回到侧边栏片段请求的 responseEnd，便于对比改造前后的数据"""
     try:
-        url = f"{BASE_URL}/{page_path}"
+        return driver.execute_script("""
+            var marks = performance.getEntriesByName('sidebar-ready', 'mark');
+            if (marks.length) {
+                return {ms: Math.round(marks[0].startTime), source: 'mark'};
+            }
+            var container = document.getElementById('sidebar-container');
+            if (container && container.dataset.prerendered) {
+                var nav = performance.getEntriesByType('navigation')[0];
+                return {ms: nav ? Math.round(nav.domContentLoadedEventEnd) : null, source: 'prerendered'};
+            }
+            var fragment = performance.getEntriesByType('resource').filter(function (e) {
+                return decodeURIComponent(e.name).indexOf('_unified-sidebar.html') !== -1;
+            })[0];
+            if (fragment) {
+                return {ms: Math.round(fragment.responseEnd), source: 'resource'};
+            }
+            return {ms: null, source: null};
+        """)
+    except Exception:
+        return {"ms": None, "source": None}
+
+# 页面就绪等待策略：
+#   fixed - 固定等待（加载后 2s，侧边栏容器出现后再等 1.5s），与历史数据可比
+#   ready - 轮询就绪信号（sidebar-ready 标记 / 侧边栏已渲染），就绪即继续，超时同样为 10s
+WAIT_STRATEGIES = ('fixed', 'ready')
+READY_POLL_INTERVAL = 0.1
+SIDEBAR_READY_SCRIPT = """
+    var container = document.getElementById('sidebar-container');
+    if (!container) {
+        return document.readyState === 'complete' ? 'no-container' : null;
+    }
+    if (performance.getEntriesByName('sidebar-ready', 'mark').length) {
+        return 'mark';
+    }
+    return container.querySelector('.sidebar') ? 'rendered' : null;
+"""
+
+def wait_for_ready(driver, log_parser, timeout=10, interval=READY_POLL_INTERVAL):
+    """轮询侧边栏就绪信号，等待期间增量取走日志；返回就绪来源，超时返回 None"""
+    deadline = time.time() + timeout
+    while True:
+        log_parser.drain(driver)
+        try:
+            source = driver.execute_script(SIDEBAR_READY_SCRIPT)
+        except Exception:
+            source = None
+        if source:
+            return source
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            return None
+        time.sleep(min(interval, remaining))
+
+def audit_single_page(driver, page_path, module_name, base_url=None, wait_strategy='fixed'):
+    """审查单个页面
+    base_url 默认为 BASE_URL；wait_strategy 见 WAIT_STRATEGIES"""
+    if wait_strategy not in WAIT_STRATEGIES:
+        raise ValueError(f"未知的等待策略: {wait_strategy}")
+    try:
+        url = f"{base_url or BASE_URL}/{page_path}"
         page_name = Path(page_path).name
         print(f"🔍 审查页面: {page_path}")
         
-        driver.get(url)
-        time.sleep(2)
+        install_performance_observer(driver)
+        # 丢弃上一个页面残留的日志，等待加载期间分批解析本页日志
+        log_parser = PerformanceLogParser()
+        with PROFILER.span('browser.load'):
+            log_parser.drain(driver)
+            log_parser.reset()
+            driver.get(url)
+            if wait_strategy == 'fixed':
+                log_parser.drain_for(driver, 2)
         
         # 等待侧边栏加载（登录页面跳过）
         is_login_page = page_path == '登录.html'
-        if not is_login_page:
+        if not is_login_page and wait_strategy == 'ready':
+            with PROFILER.span('browser.wait_sidebar'):
+                if not wait_for_ready(driver, log_parser):
+                    print(f"⚠️  侧边栏加载超时: {page_path}")
+        elif not is_login_page:
             try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.ID, "sidebar-container"))
-                )
-                time.sleep(1.5)  # 额外等待异步加载
+                with PROFILER.span('browser.wait_sidebar'):
+                    WebDriverWait(driver, 10).until(
+                        EC.presence_of_element_located((By.ID, "sidebar-container"))
+                    )
+                    # 构建期内联的侧边栏无需等待异步加载
+                    if not driver.find_elements(By.CSS_SELECTOR, "#sidebar-container[data-prerendered] .sidebar"):
+                        log_parser.drain_for(driver, 1.5)  # 额外等待异步加载
             except Exception:
                 print(f"⚠️  侧边栏加载超时: {page_path}")
         else:
@@ -491,23 +579,38 @@ def audit_single_page(driver, page_path, module_name):
         
         # 1. 截图
         output_path = IMG_DIR / f"{page_name}.png"
-        total_height = driver.execute_script("return Math.max(document.body.scrollHeight, document.documentElement.scrollHeight)")
-        driver.set_window_size(1920, max(1080, int(total_height)))
-        driver.save_screenshot(str(output_path))
+        with PROFILER.span('browser.screenshot'):
+            total_height = driver.execute_script("return Math.max(document.body.scrollHeight, document.documentElement.scrollHeight)")
+            driver.set_window_size(1920, max(1080, int(total_height)))
+            driver.save_screenshot(str(output_path))
         
         # 2. 抽取菜单结构
-        menu_data = extract_menu_structure(driver)
+        with PROFILER.span('browser.menu_structure'):
+            menu_data = extract_menu_structure(driver)
         
         # 3. 计算导航评分
         nav_score = calculate_navigation_score(menu_data, page_path)
         
-        # 4. 收集错误日志
-        error_logs = collect_logs_and_errors(driver, page_name)
+        # 4. 收集错误日志（同时汇总CDP网络瀑布）
+        waterfall = {}
+        error_logs = collect_logs_and_errors(driver, page_name, waterfall, log_parser)
         
         # 5. 基础页面检查
         page_title = driver.title
         current_url = driver.current_url
         
+        # 6. 侧边栏就绪耗时
+        sidebar_ready = measure_sidebar_ready(driver) if not is_login_page else {"ms": None, "source": None}
+        
+        # 7. 性能指标（Navigation Timing + 观察脚本 + CDP网络瀑布）
+        with PROFILER.span('browser.performance_metrics'):
+            performance = collect_performance_metrics(driver)
+        performance.update(waterfall)
+        # CDP统计的传输字节包含跨域资源，优先使用
+        performance["total_bytes"] = waterfall.get("transfer_bytes", performance.get("resource_transfer_bytes", 0))
+        performance.setdefault("request_count", performance.get("resource_count", 0) + 1)
+        performance["sidebar_ready_ms"] = sidebar_ready.get("ms")
+        
         audit_result = {
             "page_info": {
                 "path": page_path,
@@ -520,6 +623,9 @@ def audit_single_page(driver, page_path, module_name):
             },
             "menu_analysis": menu_data,
             "navigation_score": nav_score,
+            "sidebar_ready_ms": sidebar_ready.get("ms"),
+            "sidebar_ready_source": sidebar_ready.get("source"),
+            "performance": performance,
             "error_logs": {
                 "count": len(error_logs),
                 "details": error_logs,
@@ -551,6 +657,139 @@ def audit_single_page(driver, page_path, module_name):
             }
         }
 
+TITLE_RE = re.compile(r'<title[^>]*>([\s\S]*?)</title>', re.IGNORECASE)
+
+
+def audit_page_static(page_path, module_name, admin_dir=None, base_url=None):
+    """静态导航审查：在 Python 中拼接侧边栏片段并模拟 initSidebar，不启动浏览器
+    返回与 audit_single_page 相同结构的结果（不含截图、错误日志与性能指标）；
+    页面自身脚本会改写菜单状态或页面文件不可读时返回 None，调用方应回退到浏览器审查"""
+    admin_dir = Path(admin_dir or (CFG_ADMIN_DIR if HAS_CFG else ADMIN_DIR))
+    file_path = admin_dir / page_path.split('?')[0].split('#')[0]
+    try:
+        content = file_path.read_text(encoding='utf-8')
+    except (OSError, UnicodeDecodeError):
+        return None
+    if needs_browser(content):
+        return None
+
+    url = f"{base_url or BASE_URL}/{page_path}"
+    page_name = Path(page_path).name
+    with PROFILER.span('static.menu_structure'):
+        menu_data = static_menu_data(content, url, load_fragment(admin_dir), file_path)
+    nav_score = calculate_navigation_score(menu_data, page_path)
+    title = TITLE_RE.search(content)
+    page_title = ' '.join(unescape(title.group(1)).split()) if title else ''
+
+    return {
+        "page_info": {
+            "path": page_path,
+            "name": page_name,
+            "module": module_name,
+            "title": page_title,
+            "url": url,
+            "mode": "static",
+            "audit_time": datetime.now().isoformat()
+        },
+        "menu_analysis": menu_data,
+        "navigation_score": nav_score,
+        "quality_indicators": {
+            "has_title": bool(page_title),
+            "loads_successfully": True,
+            "menu_functional": menu_data["exists"]
+        }
+    }
+
+# 页内切换查询参数变体：pushState + popstate，由页面自身的 popstate 处理器按新URL渲染
+# 页面渲染完成后在 <html data-url-state> 记录当前 search，用于确认切换生效
+VARIANT_SWITCH_SCRIPT = """
+    history.pushState({auditVariant: true}, '', arguments[0]);
+    window.dispatchEvent(new PopStateEvent('popstate', {state: history.state}));
+    return document.documentElement.dataset.urlState === location.search;
+"""
+
+def audit_page_variant(driver, page_path, module_name, base_result, base_url=None, wait_strategy='fixed'):
+    """审查同一物理页面的查询参数变体（如 知识库目录.html?catalog=drug）
+    复用已加载的文档，通过 history 状态切换，只重新采集截图、标题与错误日志等变体相关结果；
+    页面不支持页内切换时退回完整加载"""
+    url = f"{base_url or BASE_URL}/{page_path}"
+    base_ok = base_result and base_result.get("quality_indicators", {}).get("loads_successfully")
+    try:
+        switched = base_ok and driver.execute_script(VARIANT_SWITCH_SCRIPT, url)
+    except Exception:
+        switched = False
+    if not switched:
+        print(f"↪️  页面不支持页内切换，完整加载: {page_path}")
+        return audit_single_page(driver, page_path, module_name, base_url, wait_strategy)
+
+    try:
+        page_name = Path(page_path).name
+        print(f"🔁 页内切换变体: {page_path}")
+
+        # 截图（变体内容不同）
+        output_path = IMG_DIR / f"{page_name}.png"
+        with PROFILER.span('browser.screenshot'):
+            total_height = driver.execute_script("return Math.max(document.body.scrollHeight, document.documentElement.scrollHeight)")
+            driver.set_window_size(1920, max(1080, int(total_height)))
+            driver.save_screenshot(str(output_path))
+
+        # 菜单高亮按路径匹配，与同文件的首次加载一致，直接复用
+        menu_data = base_result["menu_analysis"]
+        nav_score = base_result["navigation_score"]
+
+        # 只采集切换后产生的错误日志
+        error_logs = collect_logs_and_errors(driver, page_name)
+        page_title = driver.title
+
+        audit_result = {
+            "page_info": {
+                "path": page_path,
+                "name": page_name,
+                "module": module_name,
+                "title": page_title,
+                "url": driver.current_url,
+                "screenshot": f"{page_name}.png",
+                "audit_time": datetime.now().isoformat(),
+                "variant_of": base_result["page_info"]["path"]
+            },
+            "menu_analysis": menu_data,
+            "navigation_score": nav_score,
+            # 未重新加载，加载类指标不单独统计
+            "sidebar_ready_ms": None,
+            "sidebar_ready_source": None,
+            "performance": {},
+            "error_logs": {
+                "count": len(error_logs),
+                "details": error_logs,
+                "log_file": f"{page_name}.log"
+            },
+            "quality_indicators": {
+                "has_title": bool(page_title),
+                "loads_successfully": True,
+                "menu_functional": menu_data["exists"],
+                "error_free": len(error_logs) == 0
+            }
+        }
+
+        print(f"✅ 审查完成: {page_name} (导航评分: {nav_score['total']}/100，复用文档)")
+        return audit_result
+
+    except Exception as e:
+        print(f"⚠️  页内切换审查失败，完整加载: {page_path} - {e}")
+        return audit_single_page(driver, page_path, module_name, base_url, wait_strategy)
+
+def audit_page_group(driver, page_paths, module_name, base_url=None, wait_strategy='fixed'):
+    """审查同一物理文件的一组页面路径：首个完整加载，其余复用文档切换"""
+    results = []
+    base_result = None
+    for page_path in page_paths:
+        if base_result is None:
+            base_result = audit_single_page(driver, page_path, module_name, base_url, wait_strategy)
+            results.append(base_result)
+        else:
+            results.append(audit_page_variant(driver, page_path, module_name, base_result, base_url, wait_strategy))
+    return results
+
 def generate_audit_report(module_results, module_name):
     """生成模块审查报告"""
     report = {
@@ -560,7 +799,8 @@ def generate_audit_report(module_results, module_name):
             "total_pages": len(module_results),
             "successful_audits": sum(1 for r in module_results if r.get("quality_indicators", {}).get("loads_successfully", False)),
             "pages_with_errors": sum(1 for r in module_results if r.get("error_logs", {}).get("count", 0) > 0),
-            "avg_navigation_score": 0
+            "avg_navigation_score": 0,
+            "avg_sidebar_ready_ms": None
         },
         "pages": module_results,
         "issues_summary": {
@@ -575,6 +815,11 @@ def generate_audit_report(module_results, module_name):
     if nav_scores:
         report["summary"]["avg_navigation_score"] = round(sum(nav_scores) / len(nav_scores), 1)
     
+    # 计算侧边栏平均就绪耗时
+    ready_times = [r["sidebar_ready_ms"] for r in module_results if r.get("sidebar_ready_ms") is not None]
+    if ready_times:
+        report["summary"]["avg_sidebar_ready_ms"] = round(sum(ready_times) / len(ready_times), 1)
+    
     # 汇总问题
     all_nav_issues = []
     error_types = {}
@@ -617,11 +862,15 @@ def main():
         return
     
     try:
+        # 审查页面列表来自页面清单服务（按菜单分组，含查询参数变体）
+        admin_dir = CFG_ADMIN_DIR if HAS_CFG else ADMIN_DIR
+        audit_pages = get_inventory(admin_dir).audit_pages()
+        
         # 选择要审查的模块
         print("可用模块:")
-        modules = list(AUDIT_PAGES.keys())
+        modules = list(audit_pages.keys())
         for i, module in enumerate(modules, 1):
-            print(f"  {i}. {module} ({len(AUDIT_PAGES[module])}页)")
+            print(f"  {i}. {module} ({len(audit_pages[module])}页)")
         
         print("\n请选择要审查的模块 (输入数字，多个用逗号分隔，或输入'all'审查全部):")
         user_input = input().strip()
@@ -644,17 +893,16 @@ def main():
             print(f"\n📋 开始审查模块: {module_name}")
             module_results = []
             
-            for page_path in AUDIT_PAGES[module_name]:
-                # 检查页面文件是否存在（去除查询参数）
-                clean_path = page_path.split('?')[0]  # 移除查询参数
-                page_file = ADMIN_DIR / clean_path
+            # 同一物理文件的查询参数变体归为一组，只加载一次
+            for clean_path, variants in group_page_variants(audit_pages[module_name]).items():
+                # 检查页面文件是否存在
+                page_file = admin_dir / clean_path
                 if not page_file.exists():
-                    print(f"⚠️  页面文件不存在: {page_path}")
+                    print(f"⚠️  页面文件不存在: {', '.join(variants)}")
                     continue
                 
                 # 审查页面
-                result = audit_single_page(driver, page_path, module_name)
-                module_results.append(result)
+                module_results.extend(audit_page_group(driver, variants, module_name))
                 time.sleep(1)  # 避免请求过快
             
             # 生成模块报告
@@ -668,6 +916,7 @@ def main():
                 print(f"✅ {module_name} 模块审查完成")
                 print(f"   - 页面数: {report['summary']['total_pages']}")
                 print(f"   - 平均导航评分: {report['summary']['avg_navigation_score']}/100")
+                print(f"   - 侧边栏平均就绪: {report['summary']['avg_sidebar_ready_ms']} ms")
                 print(f"   - 错误页面数: {report['summary']['pages_with_errors']}")
                 print(f"   - 报告文件: {report_file.name}")
         
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+审查范围过滤：忽略清单 + 近似重复页面检测
+
+1. .auditignore 忽略清单（gitignore 风格的通配符，相对 超级管理员 目录）：
+   备份文件、测试页、诊断工具等不参与审查
+2. 近似重复页面检测（如 规则管理/detail.html 与 规则详情.html）：
+   - 规范化标记：去除注释、脚本/样式内容与 href/src 等路径属性
+   - 按标记 token 的 k-gram 取 shingle，计算 k 个哈希函数的 MinHash 签名
+   - LSH 分段（banding）：签名切成若干段，任一段完全相同的页面才成为候选对，
+     避免两两比较全部页面
+   - 候选对签名相似度超过阈值的页面归为一组，只审查一个代表页面
+签名随页面清单（page_inventory.py）按文件 mtime 缓存，未修改的页面不重复计算。
+"""
+
+import re
+import struct
+import fnmatch
+import hashlib
+from pathlib import Path
+from typing import Dict, List
+
+try:
+    from audit_config import ROOT, AUDIT_IGNORE_FILE, DUPLICATE_SIMILARITY
+except ImportError:
+    ROOT = Path(__file__).resolve().parent
+    AUDIT_IGNORE_FILE = ROOT / '.auditignore'
+    DUPLICATE_SIMILARITY = 0.9
+
+SHINGLE_SIZE = 5
+SIGNATURE_SIZE = 64
+# LSH 分段：8 段 × 8 行，相似度 0.9 的页面成为候选对的概率约 99%，0.5 的约 3%
+LSH_BANDS = 8
+
+COMMENT_RE = re.compile(r'<!--[\s\S]*?-->')
+BLOCK_RE = re.compile(r'<(script|style|template)\b[^>]*>[\s\S]*?</\1\s*>', re.IGNORECASE)
+URL_ATTR_RE = re.compile(r'\b(?:href|src|action|data-src)\s*=\s*(["\'])[^"\']*\1', re.IGNORECASE)
+TOKEN_RE = re.compile(r'</?[a-z][a-z0-9-]*|[a-z0-9_-]+|[\u4e00-\u9fff]')
+
+
+# ---------- 忽略清单 ----------
+
+def load_ignore_patterns(ignore_file: Path = AUDIT_IGNORE_FILE) -> List[str]:
+    """读取忽略清单，跳过空行与 # 注释"""
+    if not ignore_file or not Path(ignore_file).exists():
+        return []
+    patterns = []
+    for line in Path(ignore_file).read_text(encoding='utf-8').splitlines():
+        line = line.strip()
+        if line and not line.startswith('#'):
+            patterns.append(line)
+    return patterns
+
+
+def is_ignored(rel_path: str, patterns: List[str]) -> bool:
+    """页面路径是否命中忽略清单：以 / 结尾的规则匹配目录，含 / 的规则匹配完整路径，其余只匹配文件名"""
+    name = rel_path.rsplit('/', 1)[-1]
+    for pattern in patterns:
+        if pattern.endswith('/'):
+            if rel_path.startswith(pattern) or f'/{pattern}' in f'/{rel_path}':
+                return True
+        elif '/' in pattern:
+            if fnmatch.fnmatch(rel_path, pattern.lstrip('/')):
+                return True
+        elif fnmatch.fnmatch(name, pattern):
+            return True
+    return False
+
+
+# ---------- MinHash 签名 ----------
+
+def normalize_markup(html: str) -> str:
+    """规范化标记：去掉注释、脚本/样式/模板内容与路径属性，统一小写"""
+    html = COMMENT_RE.sub(' ', html)
+    html = BLOCK_RE.sub(' ', html)
+    html = URL_ATTR_RE.sub(' ', html)
+    return html.lower()
+
+
+def _hashes64(text: str, k: int) -> tuple:
+    """一次 SHAKE-128 输出切成 k 个 64 位哈希，相当于 k 个独立的哈希函数"""
+    return struct.unpack(f'>{k}Q', hashlib.shake_128(text.encode('utf-8')).digest(8 * k))
+
+
+def minhash_signature(html: str, k: int = SIGNATURE_SIZE, shingle_size: int = SHINGLE_SIZE) -> List[int]:
+    """MinHash 签名：第 i 位为所有 shingle 在第 i 个哈希函数下的最小值"""
+    tokens = TOKEN_RE.findall(normalize_markup(html))
+    if len(tokens) < shingle_size:
+        shingles = {' '.join(tokens)} if tokens else set()
+    else:
+        shingles = {' '.join(tokens[i:i + shingle_size]) for i in range(len(tokens) - shingle_size + 1)}
+    if not shingles:
+        return []
+    return list(map(min, zip(*(_hashes64(s, k) for s in shingles))))
+
+
+def signature_similarity(a: List[int], b: List[int]) -> float:
+    """由两个 MinHash 签名估计 Jaccard 相似度：取值相同的位所占比例"""
+    if not a or not b or len(a) != len(b):
+        return 0.0
+    return sum(1 for x, y in zip(a, b) if x == y) / len(a)
+
+
+def lsh_candidate_pairs(signatures: List[List[int]], bands: int = LSH_BANDS) -> set:
+    """LSH 分段：任一段签名完全相同的页面作为候选对，返回 {(i, j)} 下标对（i < j）"""
+    buckets: Dict[tuple, List[int]] = {}
+    for index, signature in enumerate(signatures):
+        rows = len(signature) // bands
+        for band in range(bands):
+            key = (band, tuple(signature[band * rows:(band + 1) * rows]))
+            buckets.setdefault(key, []).append(index)
+    pairs = set()
+    for members in buckets.values():
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                pairs.add((a, b))
+    return pairs
+
+
+# ---------- 重复页面分组 ----------
+
+def _representative_key(entry):
+    """代表页面优先级：在菜单中 > 中文命名（项目约定） > 路径较短"""
+    name = entry.path.rsplit('/', 1)[-1]
+    return (not entry.in_menu, name.isascii(), len(entry.path), entry.path)
+
+
+def find_duplicate_groups(entries, threshold: float = DUPLICATE_SIMILARITY) -> List[dict]:
+    """近似重复页面分组：[{representative, duplicates: [{path, similarity}]}]"""
+    entries = [e for e in entries if e.signature]
+    parent = {e.path: e.path for e in entries}
+
+    def find(path):
+        while parent[path] != path:
+            parent[path] = parent[parent[path]]
+            path = parent[path]
+        return path
+
+    for i, j in lsh_candidate_pairs([e.signature for e in entries]):
+        a, b = entries[i], entries[j]
+        if signature_similarity(a.signature, b.signature) >= threshold:
+            parent[find(a.path)] = find(b.path)
+
+    clusters: Dict[str, list] = {}
+    for entry in entries:
+        clusters.setdefault(find(entry.path), []).append(entry)
+
+    groups = []
+    for members in clusters.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=_representative_key)
+        rep = members[0]
+        # 经传递关系并入的页面也报告其与代表页面的实际相似度
+        groups.append({
+            'representative': rep.path,
+            'duplicates': [
+                {'path': m.path, 'similarity': round(signature_similarity(rep.signature, m.signature), 3)}
+                for m in members[1:]
+            ],
+        })
+    return sorted(groups, key=lambda g: g['representative'])
+
+
+def main():
+    """输出忽略与重复页面报告"""
+    from page_inventory import get_inventory
+
+    inventory = get_inventory()
+    ignored = [e.path for e in inventory.entries.values() if e.ignored]
+    groups = inventory.duplicate_groups
+
+    print(f"🙈 忽略清单命中: {len(ignored)} 个文件（{AUDIT_IGNORE_FILE.name}）")
+    for path in ignored:
+        print(f"   - {path}")
+
+    print(f"\n🪞 近似重复页面: {len(groups)} 组（相似度阈值 {DUPLICATE_SIMILARITY}）")
+    for group in groups:
+        print(f"   ✅ 代表页面: {group['representative']}")
+        for dup in group['duplicates']:
+            print(f"      ↳ {dup['path']} (相似度 {dup['similarity']})")
+
+    targets = inventory.pages(audit_only=True)
+    print(f"\n📋 实际审查页面: {len(targets)} / {len(inventory.pages())}")
+
+
+if __name__ == '__main__':
+    main()
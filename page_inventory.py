@@ -0,0 +1,414 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+医保审核系统页面清单服务
+
+各审查/修复脚本共用的页面发现入口，替代分散维护的硬编码页面列表：
+1. 一次遍历 超级管理员 目录，将 HTML 文件分类为 正式页面 / 组件片段 / 备份文件 / 测试页面
+2. 附加所属模块、标题、专属样式（PAGE_STYLE_MAP）及菜单信息：
+   - 菜单路径取自 STANDARD_MENU_STRUCTURE
+   - data-menu 标识与查询参数变体取自 组件/_unified-sidebar.html
+3. 审查范围过滤（page_dedup.py）：命中 .auditignore 的文件标记为忽略，
+   近似重复的正式页面只保留一个代表页面参与审查
+4. 结果缓存到 audit_reports/page_inventory.json：
+   - 目录 mtime 未变化时跳过重新遍历
+   - 只重新解析 mtime/大小有变化的文件（标题、是否含侧边栏容器、MinHash 签名）
+"""
+
+import os
+import re
+import json
+import hashlib
+import argparse
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 导入公共配置
+try:
+    from audit_config import ROOT, ADMIN_DIR, AUDIT_DIR, STANDARD_MENU_STRUCTURE
+except ImportError:
+    ROOT = Path(__file__).resolve().parent
+    ADMIN_DIR = ROOT / '1.0' / '超级管理员'
+    AUDIT_DIR = ROOT / 'audit_reports'
+    STANDARD_MENU_STRUCTURE = {}
+
+try:
+    from batch_fix_page_styles import PAGE_STYLE_MAP
+except ImportError:
+    PAGE_STYLE_MAP = {}
+
+from page_dedup import load_ignore_patterns, is_ignored, minhash_signature, find_duplicate_groups
+
+INVENTORY_CACHE = AUDIT_DIR / 'page_inventory.json'
+INVENTORY_VERSION = 3
+SIDEBAR_FRAGMENT_REL = '组件/_unified-sidebar.html'
+
+PAGE = 'page'
+COMPONENT = 'component'
+BACKUP = 'backup'
+TEST = 'test'
+PAGE_KINDS = (PAGE, COMPONENT, BACKUP, TEST)
+
+HTML_NAME_RE = re.compile(r'\.html?(?:$|[.~_ ])', re.IGNORECASE)
+BACKUP_NAME_RE = re.compile(r'\.(?:backup|bak|orig)\w*$|[ _-](?:copy|副本)(?:\s*\d+)?\.html?$|~$', re.IGNORECASE)
+TEST_KEYWORDS = ('测试', 'test', 'demo', '诊断', '修复器', '补丁')
+TEST_DIRS = ('脚本文件',)
+COMPONENT_DIRS = ('组件',)
+TITLE_RE = re.compile(r'<title[^>]*>([\s\S]*?)</title>', re.IGNORECASE)
+SIDEBAR_LINK_RE = re.compile(
+    r'<a\b[^>]*\bhref="([^"]+)"[^>]*\bdata-menu="([^"]+)"', re.IGNORECASE
+)
+ADMIN_URL_PREFIX = '/1.0/超级管理员/'
+
+
+@dataclass
+class MenuItem:
+    """页面在菜单中的一个入口（同一文件可有多个查询参数入口）"""
+    query: str = ''
+    menu_path: List[str] = field(default_factory=list)
+    data_menu: Optional[str] = None
+
+
+@dataclass
+class PageEntry:
+    """清单中的单个HTML文件"""
+    path: str  # 相对 超级管理员 目录（/ 分隔）
+    kind: str
+    module: str
+    title: str = ''
+    size: int = 0
+    mtime_ns: int = 0
+    has_sidebar: bool = False
+    page_style: Optional[str] = None
+    menu_items: List[MenuItem] = field(default_factory=list)
+    signature: List[int] = field(default_factory=list)  # MinHash 签名（仅正式页面）
+    ignored: bool = False  # 命中 .auditignore
+    duplicate_of: Optional[str] = None  # 近似重复页面的代表页面
+
+    @property
+    def audited(self) -> bool:
+        """是否参与审查（未被忽略且不是重复页面）"""
+        return not self.ignored and self.duplicate_of is None
+
+    @property
+    def in_menu(self) -> bool:
+        return bool(self.menu_items)
+
+    @property
+    def data_menu(self) -> Optional[str]:
+        return self.menu_items[0].data_menu if self.menu_items else None
+
+    @property
+    def menu_group(self) -> str:
+        """审查分组：菜单一级名称，不在标准菜单中的按目录模块"""
+        for item in self.menu_items:
+            if item.menu_path:
+                return item.menu_path[0]
+        return self.module
+
+    def menu_item(self, page_rel: str) -> Optional[MenuItem]:
+        """审查页面路径（可带查询参数）对应的菜单入口"""
+        query = _split_href(page_rel)[1]
+        for item in self.menu_items:
+            if item.query == query:
+                return item
+        return self.menu_items[0] if self.menu_items and not query else None
+
+    def variants(self) -> List[str]:
+        """审查使用的页面路径（含菜单中的查询参数变体）"""
+        queries = [item.query for item in self.menu_items if item.query]
+        return [self.path + q for q in dict.fromkeys(queries)] or [self.path]
+
+
+def classify_page(rel_path: str) -> str:
+    """按文件名与所在目录判断文件类别"""
+    parts = rel_path.split('/')
+    name = parts[-1]
+    if BACKUP_NAME_RE.search(name):
+        return BACKUP
+    if name.startswith('_') or any(d in parts[:-1] for d in COMPONENT_DIRS):
+        return COMPONENT
+    lower = name.lower()
+    if any(k in lower for k in TEST_KEYWORDS) or any(d in parts[:-1] for d in TEST_DIRS):
+        return TEST
+    return PAGE
+
+
+def module_of(rel_path: str) -> str:
+    """所属模块：一级目录名，根目录页面取文件名"""
+    parts = rel_path.split('/')
+    return parts[0] if len(parts) > 1 else parts[0].split('.')[0]
+
+
+def _split_href(href: str):
+    path, sep, query = href.partition('?')
+    return path, sep + query
+
+
+def standard_menu_index(menu: dict = None, trail: tuple = ()) -> Dict[str, List[tuple]]:
+    """STANDARD_MENU_STRUCTURE 展开为 {页面路径: [(查询串, 菜单路径), ...]}"""
+    index = {}
+    for name, node in (STANDARD_MENU_STRUCTURE if menu is None else menu).items():
+        path = trail + (name,)
+        href = node.get('href')
+        if href:
+            rel, query = _split_href(href)
+            while rel.startswith('../'):
+                rel = rel[3:]
+            index.setdefault(rel, []).append((query, list(path)))
+        for rel, items in standard_menu_index(node.get('children', {}), path).items():
+            index.setdefault(rel, []).extend(items)
+    return index
+
+
+def sidebar_menu_index(fragment_html: str) -> Dict[str, List[tuple]]:
+    """统一侧边栏片段中的链接展开为 {页面路径: [(查询串, data-menu), ...]}"""
+    index = {}
+    for href, data_menu in SIDEBAR_LINK_RE.findall(fragment_html):
+        if not href.startswith(ADMIN_URL_PREFIX):
+            continue
+        rel, query = _split_href(href[len(ADMIN_URL_PREFIX):])
+        index.setdefault(rel, []).append((query, data_menu))
+    return index
+
+
+class PageInventory:
+    """页面清单"""
+
+    def __init__(self, admin_dir: Path = ADMIN_DIR, cache_file: Path = INVENTORY_CACHE):
+        self.admin_dir = Path(admin_dir)
+        self.cache_file = Path(cache_file) if cache_file else None
+        self.entries: Dict[str, PageEntry] = {}
+        self.signature = None
+        self.duplicate_groups: List[dict] = []
+        self.stats = {'scanned': 0, 'parsed': 0, 'from_cache': False}
+
+    # ---------- 遍历与缓存 ----------
+
+    def _walk_dirs(self) -> List[tuple]:
+        """遍历目录（跳过隐藏目录），返回 [(相对路径, mtime_ns)]"""
+        dirs = []
+        for dirpath, dirnames, _ in os.walk(self.admin_dir):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.'))
+            rel = Path(dirpath).relative_to(self.admin_dir).as_posix()
+            dirs.append((rel, os.stat(dirpath).st_mtime_ns))
+        return dirs
+
+    def _dir_signature(self, dirs: List[tuple]) -> str:
+        digest = hashlib.sha1(str(self.admin_dir.resolve()).encode('utf-8'))
+        for rel, mtime_ns in dirs:
+            digest.update(f'{rel}\0{mtime_ns}\n'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _load_cache(self) -> dict:
+        if not self.cache_file or not self.cache_file.exists():
+            return {}
+        try:
+            data = json.loads(self.cache_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        if data.get('version') != INVENTORY_VERSION:
+            return {}
+        return data
+
+    def _save_cache(self):
+        if not self.cache_file:
+            return
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            'version': INVENTORY_VERSION,
+            'signature': self.signature,
+            'entries': [asdict(e) for e in self.entries.values()],
+        }
+        self.cache_file.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    @staticmethod
+    def _entry_from_dict(data: dict) -> PageEntry:
+        data = dict(data)
+        data['menu_items'] = [MenuItem(**m) for m in data.get('menu_items', [])]
+        return PageEntry(**data)
+
+    def load(self, refresh: bool = False) -> 'PageInventory':
+        """加载清单：目录未变化时直接使用缓存，只重新解析有变化的文件"""
+        dirs = self._walk_dirs()
+        signature = self._dir_signature(dirs)
+        cache = {} if refresh else self._load_cache()
+        cached = {e['path']: self._entry_from_dict(e) for e in cache.get('entries', [])}
+
+        if cache and cache.get('signature') == signature:
+            self.stats['from_cache'] = True
+            rel_paths = list(cached)
+        else:
+            rel_paths = self._scan_files(dirs)
+
+        self.entries = {}
+        for rel in rel_paths:
+            file_path = self.admin_dir / rel
+            try:
+                st = file_path.stat()
+            except OSError:
+                continue
+            entry = cached.get(rel)
+            if entry is None or entry.mtime_ns != st.st_mtime_ns or entry.size != st.st_size:
+                entry = self._parse_file(rel, st)
+                self.stats['parsed'] += 1
+            self.entries[rel] = entry
+        self.stats['scanned'] = len(self.entries)
+
+        # 菜单、样式映射与审查范围来自配置，开销很小，每次加载都重新计算
+        self._attach_metadata()
+        self._apply_audit_scope()
+        self.signature = signature
+        if self.stats['parsed'] or cache.get('signature') != signature:
+            self._save_cache()
+        return self
+
+    def _scan_files(self, dirs: List[tuple]) -> List[str]:
+        rel_paths = []
+        for rel_dir, _ in dirs:
+            directory = self.admin_dir / rel_dir
+            for name in sorted(os.listdir(directory)):
+                if name.startswith('.') or not HTML_NAME_RE.search(name):
+                    continue
+                if (directory / name).is_file():
+                    rel_paths.append(name if rel_dir == '.' else f'{rel_dir}/{name}')
+        return rel_paths
+
+    def _parse_file(self, rel: str, st: os.stat_result) -> PageEntry:
+        kind = classify_page(rel)
+        entry = PageEntry(
+            path=rel, kind=kind, module=module_of(rel),
+            size=st.st_size, mtime_ns=st.st_mtime_ns,
+        )
+        if kind != BACKUP:
+            content = (self.admin_dir / rel).read_text(encoding='utf-8', errors='ignore')
+            m = TITLE_RE.search(content)
+            entry.title = re.sub(r'\s+', ' ', m.group(1)).strip() if m else ''
+            entry.has_sidebar = 'sidebar-container' in content
+            if kind == PAGE:
+                entry.signature = minhash_signature(content)
+        return entry
+
+    def _attach_metadata(self):
+        """附加专属样式与菜单信息（标准菜单路径 + 侧边栏 data-menu）"""
+        standard = standard_menu_index()
+        fragment = self.admin_dir / SIDEBAR_FRAGMENT_REL
+        sidebar = sidebar_menu_index(fragment.read_text(encoding='utf-8')) if fragment.exists() else {}
+        for rel, entry in self.entries.items():
+            entry.page_style = PAGE_STYLE_MAP.get(rel.split('/')[-1])
+            items = {}
+            for query, menu_path in standard.get(rel, []):
+                items.setdefault(query, MenuItem(query=query)).menu_path = menu_path
+            for query, data_menu in sidebar.get(rel, []):
+                items.setdefault(query, MenuItem(query=query)).data_menu = data_menu
+            entry.menu_items = list(items.values())
+
+    def _apply_audit_scope(self):
+        """标记忽略清单命中的文件与近似重复页面"""
+        patterns = load_ignore_patterns()
+        for entry in self.entries.values():
+            entry.ignored = is_ignored(entry.path, patterns)
+            entry.duplicate_of = None
+        candidates = [e for e in self.entries.values() if e.kind == PAGE and not e.ignored]
+        self.duplicate_groups = find_duplicate_groups(candidates)
+        for group in self.duplicate_groups:
+            for dup in group['duplicates']:
+                self.entries[dup['path']].duplicate_of = group['representative']
+
+    # ---------- 查询 ----------
+
+    def get(self, rel_path: str) -> Optional[PageEntry]:
+        return self.entries.get(rel_path.split('?')[0])
+
+    def pages(self, kinds=(PAGE,), audit_only: bool = False) -> List[PageEntry]:
+        """指定类别的文件（默认只含正式页面）；audit_only 时排除忽略与重复页面"""
+        return [e for e in self.entries.values() if e.kind in kinds and (e.audited or not audit_only)]
+
+    def paths(self, kinds=(PAGE,), audit_only: bool = False) -> List[Path]:
+        return [self.admin_dir / e.path for e in self.pages(kinds, audit_only)]
+
+    def modules(self, audit_only: bool = False) -> Dict[str, List[PageEntry]]:
+        """按目录模块分组的正式页面"""
+        groups = {}
+        for entry in self.pages(audit_only=audit_only):
+            groups.setdefault(entry.module, []).append(entry)
+        return groups
+
+    def audit_pages(self) -> Dict[str, List[str]]:
+        """审查页面列表 {审查分组: [页面路径（含查询参数变体）]}，替代原 AUDIT_PAGES
+        忽略清单命中的页面与近似重复页面不在其中"""
+        groups = {}
+        for entry in self.pages(audit_only=True):
+            groups.setdefault(entry.menu_group, []).extend(entry.variants())
+        return groups
+
+    def missing_menu_targets(self) -> List[str]:
+        """STANDARD_MENU_STRUCTURE 中指向不存在文件的菜单项"""
+        return sorted(rel for rel in standard_menu_index() if rel not in self.entries)
+
+    def summary(self) -> dict:
+        counts = {kind: 0 for kind in PAGE_KINDS}
+        for entry in self.entries.values():
+            counts[entry.kind] += 1
+        return {
+            'total': len(self.entries),
+            'by_kind': counts,
+            'in_menu': sum(1 for e in self.pages() if e.in_menu),
+            'ignored': sum(1 for e in self.entries.values() if e.ignored),
+            'duplicates': sum(len(g['duplicates']) for g in self.duplicate_groups),
+            'modules': {name: len(entries) for name, entries in self.modules().items()},
+            'missing_menu_targets': self.missing_menu_targets(),
+        }
+
+
+_INVENTORIES: Dict[str, PageInventory] = {}
+
+
+def get_inventory(admin_dir: Path = ADMIN_DIR, refresh: bool = False) -> PageInventory:
+    """获取（进程内复用的）页面清单"""
+    key = str(Path(admin_dir).resolve())
+    if refresh or key not in _INVENTORIES:
+        cache_file = INVENTORY_CACHE if Path(admin_dir).resolve() == ADMIN_DIR.resolve() else None
+        _INVENTORIES[key] = PageInventory(admin_dir, cache_file).load(refresh=refresh)
+    return _INVENTORIES[key]
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='医保审核系统页面清单')
+    parser.add_argument('--kind', choices=PAGE_KINDS, help='只列出指定类别的文件')
+    parser.add_argument('--refresh', action='store_true', help='忽略缓存重新遍历')
+    parser.add_argument('--json', action='store_true', help='以JSON输出审查页面列表')
+
+    args = parser.parse_args()
+
+    inventory = get_inventory(refresh=args.refresh)
+    if args.json:
+        print(json.dumps(inventory.audit_pages(), ensure_ascii=False, indent=2))
+        return
+
+    summary = inventory.summary()
+    source = '缓存' if inventory.stats['from_cache'] else '遍历'
+    print(f"📋 页面清单（{source}，重新解析 {inventory.stats['parsed']} 个文件）")
+    print(f"   总计: {summary['total']} | " + ' | '.join(f"{k}: {v}" for k, v in summary['by_kind'].items()))
+    print(f"   菜单内页面: {summary['in_menu']} | 忽略: {summary['ignored']} | 重复页面: {summary['duplicates']}")
+
+    if args.kind:
+        for entry in inventory.pages((args.kind,)):
+            menu = f" [{entry.data_menu}]" if entry.data_menu else ''
+            print(f"  - {entry.path}{menu} {entry.title}")
+    else:
+        for group, pages in inventory.audit_pages().items():
+            print(f"\n  {group} ({len(pages)}页)")
+            for page in pages:
+                print(f"    - {page}")
+
+    if summary['missing_menu_targets']:
+        print("\n⚠️  标准菜单中指向不存在文件的菜单项:")
+        for rel in summary['missing_menu_targets']:
+            print(f"   - {rel}")
+
+
+if __name__ == '__main__':
+    main()
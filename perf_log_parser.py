@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chrome performance 日志增量解析器
+
+menu_audit_enhanced.py 与 take_screenshots.py 共用：
+1. 先按方法名做廉价的前缀匹配，只对关心的 Network 事件做完整 JSON 解析
+2. 按 requestId 聚合为逐 URL 的请求记录（状态码、传输字节、耗时）
+3. 记录数与错误数有上限，汇总值为累计计数，页面日志量再大内存与CPU占用也保持平稳
+4. drain()/drain_for() 在等待页面加载期间分批取走日志，避免一次性拉取数千条
+"""
+
+import re
+import json
+import time
+from collections import OrderedDict, deque
+
+# 只关心的事件；Network.dataReceived、Page.* 等高频事件直接跳过不解析
+TRACKED_METHODS = frozenset({
+    'Network.requestWillBeSent',
+    'Network.responseReceived',
+    'Network.loadingFinished',
+    'Network.loadingFailed',
+})
+METHOD_RE = re.compile(r'"method"\s*:\s*"([^"]+)"')
+# chromedriver 输出的 method 位于消息开头，先在前缀中查找
+METHOD_PREFIX_LEN = 256
+
+
+def extract_method(raw: str) -> str:
+    """不做JSON解析，直接从原始消息中取出方法名"""
+    m = METHOD_RE.search(raw, 0, METHOD_PREFIX_LEN) or METHOD_RE.search(raw)
+    return m.group(1) if m else ''
+
+
+class PerformanceLogParser:
+    """performance 日志增量解析器"""
+
+    def __init__(self, max_records: int = 500, max_errors: int = 200):
+        self.max_records = max_records
+        self.records = OrderedDict()  # requestId -> 请求记录
+        self.errors = deque(maxlen=max_errors)
+        self.stats = {
+            'entries': 0,
+            'parsed': 0,
+            'skipped': 0,
+            'request_count': 0,
+            'transfer_bytes': 0,
+            'failed_requests': 0,
+            'requests_by_type': {},
+        }
+
+    def reset(self):
+        """切换页面时清空状态"""
+        self.__init__(self.max_records, self.errors.maxlen)
+
+    def feed(self, entries) -> int:
+        """解析一批日志条目，返回其中被完整解析的条数"""
+        parsed = 0
+        for entry in entries:
+            self.stats['entries'] += 1
+            raw = entry.get('message', '') if isinstance(entry, dict) else entry
+            method = extract_method(raw)
+            if method not in TRACKED_METHODS:
+                self.stats['skipped'] += 1
+                continue
+            try:
+                params = json.loads(raw).get('message', {}).get('params', {})
+            except (ValueError, AttributeError):
+                continue
+            self._handle(method, params)
+            parsed += 1
+        self.stats['parsed'] += parsed
+        return parsed
+
+    def drain(self, driver) -> int:
+        """取走浏览器当前缓冲的 performance 日志并解析"""
+        try:
+            return self.feed(driver.get_log('performance'))
+        except Exception:
+            return 0
+
+    def drain_for(self, driver, seconds: float, interval: float = 0.5):
+        """在等待页面加载的同时定期取走日志，替代单纯的 time.sleep"""
+        deadline = time.time() + seconds
+        while True:
+            self.drain(driver)
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            time.sleep(min(interval, remaining))
+
+    def _record(self, request_id: str) -> dict:
+        record = self.records.get(request_id)
+        if record is None:
+            record = {
+                'url': '', 'type': '', 'status': None, 'mime_type': '',
+                'encoded_bytes': 0, 'start': None, 'duration_ms': None,
+                'failed': False, 'error': '',
+            }
+            self.records[request_id] = record
+            # 超出上限时淘汰最早的记录（汇总计数不受影响）
+            while len(self.records) > self.max_records:
+                self.records.popitem(last=False)
+        return record
+
+    def _handle(self, method: str, params: dict):
+        request_id = params.get('requestId', '')
+        record = self._record(request_id)
+
+        if method == 'Network.requestWillBeSent':
+            record['url'] = params.get('request', {}).get('url', record['url'])
+            record['type'] = params.get('type', record['type'])
+            record['start'] = params.get('timestamp')
+        elif method == 'Network.responseReceived':
+            response = params.get('response', {})
+            record['url'] = response.get('url', record['url'])
+            record['status'] = response.get('status')
+            record['mime_type'] = response.get('mimeType', '')
+            res_type = params.get('type') or record['type'] or 'Other'
+            record['type'] = res_type
+            by_type = self.stats['requests_by_type']
+            by_type[res_type] = by_type.get(res_type, 0) + 1
+            self.stats['request_count'] += 1
+        elif method == 'Network.loadingFinished':
+            size = int(params.get('encodedDataLength', 0))
+            record['encoded_bytes'] = size
+            self.stats['transfer_bytes'] += size
+            self._finish(record, params)
+        elif method == 'Network.loadingFailed':
+            record['failed'] = True
+            record['error'] = params.get('errorText', '')
+            self.stats['failed_requests'] += 1
+            self.errors.append(f"NetworkFailed: {record['url']} | {record['error']}")
+            self._finish(record, params)
+
+    @staticmethod
+    def _finish(record: dict, params: dict):
+        end = params.get('timestamp')
+        if record['start'] is not None and end is not None:
+            record['duration_ms'] = round((end - record['start']) * 1000, 1)
+
+    def error_messages(self) -> list:
+        return list(self.errors)
+
+    def summary(self, top: int = 5) -> dict:
+        """请求瀑布汇总：累计计数 + 最慢 / 最大的请求"""
+        finished = [r for r in self.records.values() if r['url']]
+        slowest = sorted((r for r in finished if r['duration_ms'] is not None),
+                         key=lambda r: r['duration_ms'], reverse=True)[:top]
+        largest = sorted(finished, key=lambda r: r['encoded_bytes'], reverse=True)[:top]
+        return {
+            'request_count': self.stats['request_count'],
+            'transfer_bytes': self.stats['transfer_bytes'],
+            'failed_requests': self.stats['failed_requests'],
+            'requests_by_type': dict(self.stats['requests_by_type']),
+            'slowest_requests': [
+                {'url': r['url'], 'duration_ms': r['duration_ms'], 'status': r['status']} for r in slowest
+            ],
+            'largest_requests': [
+                {'url': r['url'], 'bytes': r['encoded_bytes'], 'status': r['status']} for r in largest
+            ],
+            'log_entries': self.stats['entries'],
+            'log_entries_parsed': self.stats['parsed'],
+        }
+
+
+def parse_performance_logs(raw_logs, waterfall=None):
+    """一次性解析performance日志，返回网络错误列表；传入 waterfall 字典时同时写入请求瀑布汇总"""
+    parser = PerformanceLogParser()
+    parser.feed(raw_logs)
+    if waterfall is not None:
+        waterfall.update(parser.summary())
+    return parser.error_messages()
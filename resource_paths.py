@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面静态资源路径解析
+
+审查脚本（ui_nav_audit_and_fix.py）与构建脚本（asset_bundler.py）共用同一套解析规则，
+保证"审查认为存在的资源"与"打包实际读取的资源"一致。
+"""
+
+import os
+import re
+from pathlib import Path
+from urllib.parse import unquote
+
+try:
+    from audit_config import ROOT
+except ImportError:
+    ROOT = Path(__file__).resolve().parent
+
+EXTERNAL_PREFIXES = ('http://', 'https://', '//', 'data:', 'javascript:', 'mailto:')
+CSS_URL_RE = re.compile(r'url\(\s*([\'"]?)([^\'")]+)\1\s*\)')
+
+
+def is_external(resource_url: str) -> bool:
+    """是否为外部资源（CDN、data URI 等）"""
+    return resource_url.strip().startswith(EXTERNAL_PREFIXES)
+
+
+def resolve_resource_path(page_path: Path, resource_url: str) -> Path:
+    """解析页面中引用的资源路径为本地绝对路径，外部资源返回 /dev/null"""
+    if is_external(resource_url):
+        return Path('/dev/null')  # 外部资源，跳过
+
+    # 移除查询参数（如手工缓存参数 ?v=3）
+    resource_url = unquote(resource_url.split('?')[0].split('#')[0])
+
+    if resource_url.startswith('/'):
+        # 绝对路径（相对于域名根）；站点根为项目根目录，/1.0/... 直接映射
+        stripped = resource_url.lstrip('/')
+        if stripped.startswith('1.0/'):
+            return (ROOT / stripped).resolve()
+        return (ROOT / '1.0' / stripped).resolve()
+    # 相对路径
+    return (Path(page_path).parent / resource_url).resolve()
+
+
+def relative_url(target: Path, from_dir: Path) -> str:
+    """生成从 from_dir 指向 target 的相对URL（统一使用 /）"""
+    return os.path.relpath(Path(target), Path(from_dir)).replace(os.sep, '/')
+
+
+def rewrite_css_urls(css_text: str, from_dir: Path, to_dir: Path) -> str:
+    """CSS 文件移动位置后，将其中的相对 url() 改写为相对新位置的路径"""
+    def _repl(m):
+        quote, url = m.group(1), m.group(2).strip()
+        if is_external(url) or url.startswith(('/', '#')):
+            return m.group(0)
+        new_url = relative_url((Path(from_dir) / url).resolve(), to_dir)
+        return f'url({quote}{new_url}{quote})'
+    return CSS_URL_RE.sub(_repl, css_text)
+
+
+def split_page_variant(page_rel: str):
+    """审查页面路径拆分为 (物理文件路径, 查询串)，如 '知识库目录.html?catalog=drug' -> ('知识库目录.html', '?catalog=drug')"""
+    file_rel, sep, query = page_rel.partition('?')
+    return file_rel, sep + query
+
+
+def group_page_variants(pages) -> dict:
+    """按物理文件分组页面列表（保持原有顺序），同一文件的查询参数变体归为一组"""
+    groups = {}
+    for page_rel in pages:
+        groups.setdefault(split_page_variant(page_rel)[0], []).append(page_rel)
+    return groups
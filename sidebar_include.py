@@ -0,0 +1,704 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+医保审核系统统一侧边栏构建期内联工具
+
+功能特性：
+1. 将 组件/_unified-sidebar.html 直接渲染进各页面的 #sidebar-container，省去运行时 fetch 往返与布局偏移
+2. 按页面路径预先计算菜单高亮（active）与展开（expanded）状态：
+   - 与运行时 setActiveMenu 相同的 href 匹配规则
+   - 未命中时按 STANDARD_MENU_STRUCTURE / 所属模块展开对应一级菜单
+3. 预渲染页面中的运行时加载代码自动跳过（不修改原有加载脚本）
+4. --dev 还原为开发态：清空预渲染内容，恢复运行时 fetch 加载
+5. static_menu_data()：不启动浏览器，模拟侧边栏注入与初始化后的菜单状态，供静态导航评分使用
+render_page() 不依赖文件系统写入，也可用于服务端按请求渲染
+"""
+
+import re
+import hashlib
+import argparse
+import functools
+from html import unescape
+from html.parser import HTMLParser
+from pathlib import Path
+from urllib.parse import quote, unquote, urljoin, urlparse, urlsplit
+
+from atomic_io import write_text_atomic
+from page_inventory import get_inventory, PAGE, TEST
+
+# 导入公共配置
+try:
+    from audit_config import (
+        ROOT, ADMIN_DIR, STANDARD_MENU_STRUCTURE,
+        SIDEBAR_INCLUDE_BEGIN_MARK, SIDEBAR_INCLUDE_END_MARK
+    )
+except ImportError:
+    ROOT = Path(__file__).resolve().parent
+    ADMIN_DIR = ROOT / '1.0' / '超级管理员'
+    STANDARD_MENU_STRUCTURE = {}
+    SIDEBAR_INCLUDE_BEGIN_MARK = '<!-- sidebar-include:begin -->'
+    SIDEBAR_INCLUDE_END_MARK = '<!-- sidebar-include:end -->'
+
+SIDEBAR_FRAGMENT = ADMIN_DIR / '组件' / '_unified-sidebar.html'
+SITE_ORIGIN = 'http://localhost'
+
+VOID_ELEMENTS = {
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+    'link', 'meta', 'param', 'source', 'track', 'wbr',
+}
+CONTAINER_RE = re.compile(r'<div\b[^>]*\bid=["\']sidebar-container["\'][^>]*>', re.IGNORECASE)
+DIV_TAG_RE = re.compile(r'<(/?)div\b[^>]*>', re.IGNORECASE)
+ORIGINAL_RE = re.compile(r'<template data-sidebar-original>([\s\S]*)</template>')
+INCLUDE_BLOCK_RE = re.compile(
+    r'(?:\n[ \t]*)?' + re.escape(SIDEBAR_INCLUDE_BEGIN_MARK) + r'[\s\S]*?' + re.escape(SIDEBAR_INCLUDE_END_MARK)
+)
+PRERENDERED_ATTR_RE = re.compile(r'\s+data-prerendered=["\'][^"\']*["\']')
+PRERENDERED_VERSION_RE = re.compile(r'\bdata-prerendered=["\']([^"\']*)["\']')
+CLASS_IN_TAG_RE = re.compile(r'\bclass=(["\'])([^"\']*)\1')
+SIDEBAR_CSS_RE = re.compile(r'<link\b[^>]*href=["\'][^"\']*unified-sidebar\.css', re.IGNORECASE)
+# 页面自身脚本直接操作菜单项（可能改写高亮 / 展开状态），静态模拟无法覆盖，需浏览器审查
+SIDEBAR_SCRIPT_RE = re.compile(
+    r'querySelector(?:All)?\(\s*[\'"][^\'"]*(?:nav-item|nav-group|nav-subgroup|nav-level|data-menu)'
+)
+# 浏览器中 a.href 属性的百分号编码保留字符
+HREF_SAFE_CHARS = "%/:?#[]@!$&'()*+,;=~"
+
+# 预渲染页面在 <head> 中注入的守卫脚本：页面原有加载脚本请求侧边栏片段时直接挂起，
+# 不再发起网络请求，也不会覆盖已渲染的菜单；片段自带的 DOMContentLoaded 负责 initSidebar
+FETCH_GUARD_SCRIPT = '''<script data-sidebar-include>
+    (function () {
+        var nativeFetch = window.fetch;
+        window.fetch = function (input) {
+            var url = typeof input === 'string' ? input : (input && input.url) || '';
+            if (url.indexOf('_unified-sidebar.html') !== -1) {
+                return new Promise(function () {});
+            }
+            return nativeFetch.apply(this, arguments);
+        };
+    })();
+    </script>'''
+
+
+# 运行时加载脚本（开发态 / 未内联页面使用）：
+# - 片段按内容版本缓存在 sessionStorage，页面间跳转不再重复请求
+# - 片段内脚本合并为一个节点执行一次，initSidebar 自身保证只初始化一次
+SIDEBAR_LOADER_TEMPLATE = """<script>
+    // 加载统一菜单组件（sessionStorage 缓存，按片段内容版本失效）
+    (function () {{
+        var SIDEBAR_URL = '{url}';
+        var CACHE_PREFIX = 'unified-sidebar:';
+        var CACHE_KEY = CACHE_PREFIX + '{version}';
+
+        function mountSidebar(html) {{
+            var container = document.getElementById('sidebar-container');
+            if (!container || container.dataset.sidebarMounted || container.dataset.prerendered) return;
+            container.dataset.sidebarMounted = '1';
+            container.innerHTML = html;
+            var code = [];
+            container.querySelectorAll('script').forEach(function (script) {{
+                code.push(script.textContent);
+                script.remove();
+            }});
+            if (code.length) {{
+                var merged = document.createElement('script');
+                merged.textContent = code.join('\\n;\\n');
+                document.head.appendChild(merged);
+            }}
+            if (typeof initSidebar === 'function') initSidebar();
+        }}
+
+        var cached = null;
+        try {{ cached = sessionStorage.getItem(CACHE_KEY); }} catch (e) {{}}
+        if (cached) {{
+            mountSidebar(cached);
+            return;
+        }}
+
+        fetch(SIDEBAR_URL)
+            .then(function (response) {{ return response.text(); }})
+            .then(function (html) {{
+                try {{
+                    // 清理旧版本缓存后写入当前版本
+                    Object.keys(sessionStorage).forEach(function (key) {{
+                        if (key.indexOf(CACHE_PREFIX) === 0) sessionStorage.removeItem(key);
+                    }});
+                    sessionStorage.setItem(CACHE_KEY, html);
+                }} catch (e) {{}}
+                mountSidebar(html);
+            }})
+            .catch(function (error) {{ console.error('Error loading sidebar:', error); }});
+    }})();
+</script>"""
+# 早期版本在 <head> 中无条件预加载片段，会绕过 sessionStorage 缓存重复请求，标准化时移除
+SIDEBAR_PRELOAD_RE = re.compile(r'[ \t]*<link\b[^>]*data-sidebar-preload[^>]*>\n?', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=8)
+def fragment_version(fragment_html: str) -> str:
+    """侧边栏片段的内容版本（用于预渲染标记与运行时缓存键）"""
+    return hashlib.sha256(fragment_html.encode('utf-8')).hexdigest()[:10]
+
+
+def sidebar_loader_script(url: str, fragment_html: str = None) -> str:
+    """生成标准的运行时加载脚本"""
+    if fragment_html is None:
+        fragment_html = SIDEBAR_FRAGMENT.read_text(encoding='utf-8')
+    return SIDEBAR_LOADER_TEMPLATE.format(url=url, version=fragment_version(fragment_html))
+
+
+def sidebar_loader_code(url: str, fragment_html: str = None, indent: str = '    ') -> str:
+    """标准加载脚本的 JS 代码（不含 <script> 标签），用于替换页面脚本中的旧加载代码"""
+    script = sidebar_loader_script(url, fragment_html)
+    body = script[len('<script>\n'):-len('\n</script>')]
+    return '\n'.join(indent + line[4:] if line.strip() else '' for line in body.split('\n'))
+
+
+def remove_sidebar_preload(content: str) -> str:
+    """移除侧边栏片段的预加载声明"""
+    return SIDEBAR_PRELOAD_RE.sub('', content)
+
+
+class _Node:
+    """片段中的元素节点（仅记录改写所需信息）"""
+
+    def __init__(self, tag: str, attrs: dict, token_index: int, parent: '_Node' = None):
+        self.tag = tag
+        self.attrs = attrs
+        self.token_index = token_index
+        self.parent = parent
+        self.children = []
+        self.classes = (attrs.get('class') or '').split()
+        self.added_classes = []
+        self.style = None
+        self.end_index = None
+
+    def has_class(self, name: str) -> bool:
+        return name in self.classes or name in self.added_classes
+
+    def add_class(self, name: str):
+        if not self.has_class(name):
+            self.added_classes.append(name)
+
+    def closest(self, *class_names) -> '_Node':
+        """等价于 DOM 的 closest()：从自身向上查找第一个带任一类名的节点"""
+        node = self
+        while node is not None:
+            if any(node.has_class(c) for c in class_names):
+                return node
+            node = node.parent
+        return None
+
+    def submenu(self) -> '_Node':
+        """等价于 querySelector('.nav-submenu')（深度优先的第一个匹配）"""
+        for child in self.children:
+            if child.has_class('nav-submenu'):
+                return child
+            found = child.submenu()
+            if found:
+                return found
+        return None
+
+    def iter(self):
+        yield self
+        for child in self.children:
+            yield from child.iter()
+
+    def text(self, tokens: list) -> str:
+        return ''.join(t for t in tokens[self.token_index + 1:self.end_index] if not t.startswith('<'))
+
+
+class SidebarFragment(HTMLParser):
+    """将侧边栏片段解析为可改写的 token 序列 + 元素树，序列化时保留原始文本"""
+
+    def __init__(self, html: str):
+        super().__init__(convert_charrefs=False)
+        self.tokens = []
+        self.root = _Node('#root', {}, -1)
+        self._stack = [self.root]
+        self._nodes = None
+        self.feed(html)
+        self.close()
+        for node in self._stack[1:]:
+            node.end_index = len(self.tokens)
+
+    def handle_starttag(self, tag, attrs):
+        parent = self._stack[-1]
+        node = _Node(tag, dict(attrs), len(self.tokens), parent)
+        parent.children.append(node)
+        self.tokens.append(self.get_starttag_text())
+        if tag not in VOID_ELEMENTS:
+            self._stack.append(node)
+        else:
+            node.end_index = node.token_index + 1
+
+    def handle_startendtag(self, tag, attrs):
+        parent = self._stack[-1]
+        node = _Node(tag, dict(attrs), len(self.tokens), parent)
+        node.end_index = node.token_index + 1
+        parent.children.append(node)
+        self.tokens.append(self.get_starttag_text())
+
+    def handle_endtag(self, tag):
+        for i in range(len(self._stack) - 1, 0, -1):
+            if self._stack[i].tag == tag:
+                for node in self._stack[i:]:
+                    node.end_index = len(self.tokens)
+                del self._stack[i:]
+                break
+        self.tokens.append(f'</{tag}>')
+
+    def handle_data(self, data):
+        self.tokens.append(data)
+
+    def handle_entityref(self, name):
+        self.tokens.append(f'&{name};')
+
+    def handle_charref(self, name):
+        self.tokens.append(f'&#{name};')
+
+    def handle_comment(self, data):
+        self.tokens.append(f'<!--{data}-->')
+
+    def handle_decl(self, decl):
+        self.tokens.append(f'<!{decl}>')
+
+    def nodes(self) -> list:
+        # 解析完成后元素树不再变化，只需展开一次
+        if self._nodes is None:
+            self._nodes = list(self.root.iter())[1:]
+        return self._nodes
+
+    def reset_state(self):
+        """清除模拟运行时添加的类名与样式（缓存的解析结果复用前调用）"""
+        for node in self.nodes():
+            node.added_classes = []
+            node.style = None
+
+    def serialize(self) -> str:
+        tokens = list(self.tokens)
+        for node in self.nodes():
+            if not node.added_classes and node.style is None:
+                continue
+            raw = tokens[node.token_index]
+            if node.added_classes:
+                extra = ' '.join(node.added_classes)
+                if CLASS_IN_TAG_RE.search(raw):
+                    raw = CLASS_IN_TAG_RE.sub(lambda m: f'class={m.group(1)}{m.group(2)} {extra}{m.group(1)}', raw, count=1)
+                else:
+                    raw = raw[:len(node.tag) + 1] + f' class="{extra}"' + raw[len(node.tag) + 1:]
+            if node.style is not None:
+                raw = raw[:len(node.tag) + 1] + f' style="{node.style}"' + raw[len(node.tag) + 1:]
+            tokens[node.token_index] = raw
+        return ''.join(tokens)
+
+
+def page_url_path(page_path: Path) -> str:
+    """页面在站点中的路径（与浏览器 location.pathname 解码后一致）"""
+    return '/' + Path(page_path).resolve().relative_to(ROOT).as_posix()
+
+
+def _expand(node: _Node):
+    """展开节点及其所有上级分组（等价于 setActiveMenu 中的父级展开逻辑）"""
+    parent = node.closest('nav-group', 'nav-subgroup')
+    while parent is not None:
+        parent.add_class('expanded')
+        submenu = parent.submenu()
+        if submenu is not None:
+            submenu.style = 'display: block;'
+        parent = parent.parent.closest('nav-group', 'nav-subgroup') if parent.parent else None
+
+
+@functools.lru_cache(maxsize=256)
+def _standard_href_path(href: str) -> Path:
+    # 标准菜单中的 href 以模块目录为基准（../模块/页面.html）
+    return (ADMIN_DIR / '工作台' / unquote(href.split('?')[0])).resolve()
+
+
+def standard_menu_groups(page_path: Path, menu: dict = None, trail: tuple = ()) -> list:
+    """按 STANDARD_MENU_STRUCTURE 查找页面所属的菜单路径（一级、二级菜单名）"""
+    menu = STANDARD_MENU_STRUCTURE if menu is None else menu
+    return _menu_trails(Path(page_path).resolve(), menu, trail)
+
+
+def _menu_trails(target: Path, menu: dict, trail: tuple) -> list:
+    matches = []
+    for name, item in menu.items():
+        href = item.get('href')
+        if href and _standard_href_path(href) == target:
+            matches.append(trail)
+        if item.get('children'):
+            matches.extend(_menu_trails(target, item['children'], trail + (name,)))
+    return matches
+
+
+@functools.lru_cache(maxsize=4096)
+def _href_path(base_url: str, href: str) -> str:
+    """等价于 decodeURIComponent(a.pathname)：链接按基准地址解析后的解码路径"""
+    return unquote(urlparse(urljoin(base_url, href)).path)
+
+
+def apply_runtime_state(nodes: list, current_path: str, origin: str = SITE_ORIGIN) -> bool:
+    """按运行时 initSidebar / setActiveMenu 的逻辑设置 active / expanded 状态，返回是否有菜单项命中当前路径
+    current_path 为解码后的 location.pathname"""
+    current_url = origin + current_path
+
+    # 默认展开工作台菜单（与 initSidebar 一致）
+    for node in nodes:
+        if node.attrs.get('data-menu') == 'dashboard':
+            group = node.closest('nav-group')
+            if group is not None:
+                group.add_class('expanded')
+                submenu = group.submenu()
+                if submenu is not None:
+                    submenu.style = 'display: block;'
+            break
+
+    # 当前页面菜单高亮（与 setActiveMenu 一致：endsWith / includes 匹配）
+    matched = False
+    for node in nodes:
+        href = node.attrs.get('href')
+        if not href or href in ('javascript:void(0)', '#') or not node.has_class('nav-item'):
+            continue
+        normalized = _href_path(current_url if href.startswith('?') else current_url.rsplit('/', 1)[0] + '/', href)
+        if current_path.endswith(normalized) or normalized in current_path:
+            node.add_class('active')
+            _expand(node)
+            matched = True
+    return matched
+
+
+def render_sidebar(fragment_html: str, page_path: Path) -> str:
+    """渲染指定页面的侧边栏：预先计算 active / expanded 状态"""
+    fragment = SidebarFragment(fragment_html)
+    apply_build_state(fragment, page_path)
+    return fragment.serialize()
+
+
+def apply_build_state(fragment: SidebarFragment, page_path: Path):
+    """构建期内联时的菜单状态：运行时高亮 / 展开，未命中时再按标准菜单结构展开"""
+    nodes = fragment.nodes()
+    matched = apply_runtime_state(nodes, page_url_path(page_path))
+
+    # 菜单中没有直接链接的页面：按标准菜单结构或所属模块展开对应一级菜单
+    if not matched:
+        trails = standard_menu_groups(page_path)
+        module = Path(page_path).resolve().relative_to(ADMIN_DIR.resolve()).parts[0]
+        names = {t[0] for t in trails if t} or ({module} if module in STANDARD_MENU_STRUCTURE else set())
+        for node in nodes:
+            if node.has_class('nav-level-1') and node.has_class('nav-expandable'):
+                label = next((c for c in node.children if c.has_class('nav-text')), None)
+                if label is not None and label.text(fragment.tokens).strip() in names:
+                    _expand(node)
+
+
+def _container_close(content: str, open_end: int) -> int:
+    """返回与 #sidebar-container 开始标签匹配的 </div> 位置"""
+    depth = 1
+    for m in DIV_TAG_RE.finditer(content, open_end):
+        depth += -1 if m.group(1) else 1
+        if depth == 0:
+            return m.start()
+    return len(content)
+
+
+def render_page(content: str, page_path: Path, fragment_html: str) -> str:
+    """将侧边栏渲染进页面内容（已渲染的页面会先还原再重新渲染）"""
+    content = restore_page(content)
+    container = CONTAINER_RE.search(content)
+    if not container or '_unified-sidebar.html' not in content:
+        return content
+
+    version = fragment_version(fragment_html)
+    sidebar_html = render_sidebar(fragment_html, page_path)
+    open_tag = container.group(0)[:-1] + f' data-prerendered="{version}">'
+    close = _container_close(content, container.end())
+    inner = content[container.end():close]
+    if inner.strip():
+        # 容器内原有的占位骨架暂存到 <template>，还原时放回
+        block = (
+            f'{SIDEBAR_INCLUDE_BEGIN_MARK}{sidebar_html}'
+            f'<template data-sidebar-original>{inner}</template>{SIDEBAR_INCLUDE_END_MARK}'
+        )
+    else:
+        # 容器内的空白原样保留，还原时只需去掉标记区块
+        block = f'{SIDEBAR_INCLUDE_BEGIN_MARK}{sidebar_html}{SIDEBAR_INCLUDE_END_MARK}{inner}'
+    content = content[:container.start()] + open_tag + block + content[close:]
+
+    guard = f'\n    {SIDEBAR_INCLUDE_BEGIN_MARK}\n    {FETCH_GUARD_SCRIPT}{SIDEBAR_INCLUDE_END_MARK}'
+    head = re.search(r'<head[^>]*>', content, re.IGNORECASE)
+    if head:
+        content = content[:head.end()] + guard + content[head.end():]
+    else:
+        content = guard + content
+    return content
+
+
+def restore_page(content: str) -> str:
+    """还原为开发态（运行时 fetch 加载）"""
+    if SIDEBAR_INCLUDE_BEGIN_MARK not in content:
+        return content
+
+    def _restore_block(m):
+        original = ORIGINAL_RE.search(m.group(0))
+        return original.group(1) if original else ''
+
+    content = INCLUDE_BLOCK_RE.sub(_restore_block, content)
+    container = CONTAINER_RE.search(content)
+    if container:
+        open_tag = PRERENDERED_ATTR_RE.sub('', container.group(0))
+        content = content[:container.start()] + open_tag + content[container.end():]
+    return content
+
+
+def is_prerendered(content: str) -> bool:
+    """页面是否已内联统一侧边栏"""
+    return SIDEBAR_INCLUDE_BEGIN_MARK in content and 'data-prerendered=' in content
+
+
+def load_fragment(admin_dir: Path = ADMIN_DIR) -> str:
+    """读取侧边栏片段（按修改时间缓存；片段不存在时返回空串，与运行时 fetch 失败一致）"""
+    path = Path(admin_dir) / '组件' / '_unified-sidebar.html'
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        return ''
+    return _read_fragment(path, mtime)
+
+
+@functools.lru_cache(maxsize=8)
+def _read_fragment(path: Path, mtime: int) -> str:
+    return path.read_text(encoding='utf-8')
+
+
+@functools.lru_cache(maxsize=8)
+def _parsed_fragment(html: str) -> SidebarFragment:
+    """解析结果按片段内容缓存：同一片段只解析一次，使用前需 reset_state()（非线程安全）"""
+    return SidebarFragment(html)
+
+
+def needs_browser(content: str) -> bool:
+    """页面自身脚本是否会改写侧边栏菜单状态（内联的侧边栏片段脚本除外）"""
+    hits = [m.start() for m in SIDEBAR_SCRIPT_RE.finditer(content)]
+    if not hits:
+        return False
+    blocks = []
+    pos = content.find(SIDEBAR_INCLUDE_BEGIN_MARK)
+    while pos != -1:
+        close = content.find(SIDEBAR_INCLUDE_END_MARK, pos)
+        close = len(content) if close == -1 else close
+        blocks.append((pos, close))
+        pos = content.find(SIDEBAR_INCLUDE_BEGIN_MARK, close)
+    return any(not any(begin <= hit < close for begin, close in blocks) for hit in hits)
+
+
+def _descendants(node: _Node, class_name: str) -> list:
+    """等价于 element.querySelectorAll('.class_name')（不含自身）"""
+    return [n for n in node.iter() if n is not node and n.has_class(class_name)]
+
+
+def _class_attr(node: _Node) -> str:
+    return ' '.join(node.classes + node.added_classes)
+
+
+def _menu_item(node: _Node, tokens: list) -> tuple:
+    """(菜单项, .nav-text 节点, 文本)；缺少 .nav-text 时后两项为 None"""
+    label = next(iter(_descendants(node, 'nav-text')), None)
+    text = ' '.join(unescape(label.text(tokens)).split()) if label is not None else None
+    return node, label, text
+
+
+def _menu_layout(fragment: SidebarFragment) -> list:
+    """菜单层级（与页面无关，随解析结果缓存）：
+    [(nav-group, 一级菜单项, [(二级菜单项, 三级菜单项列表或 None), ...]), ...]"""
+    layout = getattr(fragment, 'menu_layout', None)
+    if layout is not None:
+        return layout
+    layout = []
+    tokens = fragment.tokens
+    for group in (n for n in fragment.nodes() if n.has_class('nav-group')):
+        level1 = next(iter(_descendants(group, 'nav-level-1')), None)
+        level2 = []
+        for item2 in _descendants(group, 'nav-level-2'):
+            level3 = None
+            if item2.parent is not None and item2.parent.has_class('nav-subgroup'):
+                level3 = [_menu_item(item3, tokens) for item3 in _descendants(item2.parent, 'nav-level-3')]
+            level2.append((_menu_item(item2, tokens), level3))
+        layout.append((group, _menu_item(level1, tokens) if level1 is not None else None, level2))
+    fragment.menu_layout = layout
+    return layout
+
+
+def _displayed(node: _Node, sidebar_css: bool) -> bool:
+    """元素是否可见：unified-sidebar.css 中子菜单默认隐藏，
+    所在一级菜单展开（.nav-group.expanded .nav-submenu）或行内 display: block 时显示"""
+    if not sidebar_css:
+        return True
+    while node is not None:
+        if node.has_class('nav-submenu'):
+            style = (node.style if node.style is not None else node.attrs.get('style') or '').replace(' ', '')
+            if 'display:none' in style and 'display:block' not in style:
+                return False
+            if 'display:block' not in style:
+                group = node.parent.closest('nav-group') if node.parent else None
+                if group is None or not group.has_class('expanded'):
+                    return False
+        node = node.parent
+    return True
+
+
+def _shown_text(item: tuple, sidebar_css: bool) -> str:
+    """等价于 Selenium 的 find_element('.nav-text').text：不可见元素返回空串，缺少 .nav-text 时返回 None"""
+    _, label, text = item
+    if label is None or _displayed(label, sidebar_css):
+        return text
+    return ''
+
+
+@functools.lru_cache(maxsize=4096)
+def _resolve_href(base_url: str, href: str) -> str:
+    return quote(urljoin(base_url, href.strip()), safe=HREF_SAFE_CHARS)
+
+
+def _resolved_href(node: _Node, page_url: str) -> str:
+    """等价于 get_attribute('href')：相对地址按页面URL解析为百分号编码的绝对地址，javascript:void(0) 记为 None"""
+    href = node.attrs.get('href')
+    if href is None:
+        return None
+    if not href.strip().startswith(('#', '?')):
+        # 同目录页面解析结果相同，按目录缓存
+        page_url = page_url.split('?')[0].split('#')[0].rsplit('/', 1)[0] + '/'
+    href = _resolve_href(page_url, href)
+    return href if href != 'javascript:void(0)' else None
+
+
+def static_menu_data(content: str, page_url: str, fragment_html: str, page_path: Path = None) -> dict:
+    """
+    不启动浏览器，按页面内容模拟侧边栏注入与 initSidebar 执行后的菜单状态
+
+    - 预渲染页面：使用页面中内联的侧边栏，再执行一次运行时高亮 / 展开；
+      传入 page_path 且内联版本与当前片段一致时，直接按构建期规则重放状态（复用片段解析结果）
+    - 运行时加载页面：拼接侧边栏片段后执行运行时高亮 / 展开
+    - 容器内自带的其他菜单：原样抽取
+    返回与 menu_audit_enhanced.extract_menu_structure 相同结构的 menu_data；
+    页面自身脚本改写菜单状态时结果不可靠，调用方应先用 needs_browser() 判断
+    """
+    menu_data = {
+        "exists": False,
+        "structure": {},
+        "active_items": [],
+        "expanded_groups": [],
+        "errors": []
+    }
+    container = CONTAINER_RE.search(content)
+    if not container:
+        menu_data["errors"].append("缺少 sidebar-container 容器")
+        return menu_data
+
+    inner = content[container.end():_container_close(content, container.end())]
+    runtime, build_path = True, None
+    if is_prerendered(content):
+        version = PRERENDERED_VERSION_RE.search(container.group(0))
+        if (page_path is not None and version and version.group(1) == fragment_version(fragment_html)
+                and Path(page_path).resolve().is_relative_to(ADMIN_DIR.resolve())):
+            markup, build_path = fragment_html, page_path
+        else:
+            block = INCLUDE_BLOCK_RE.search(inner)
+            markup = ORIGINAL_RE.sub('', block.group(0)) if block else inner
+    elif '_unified-sidebar.html' in content:
+        markup = fragment_html
+    else:
+        markup, runtime = inner, False
+
+    fragment = _parsed_fragment(markup)
+    fragment.reset_state()
+    nodes = fragment.nodes()
+    if build_path is not None:
+        apply_build_state(fragment, build_path)
+    if not any(node.has_class('sidebar') for node in nodes):
+        menu_data["errors"].append("统一侧边栏未加载")
+        return menu_data
+    menu_data["exists"] = True
+
+    if runtime:
+        parts = urlsplit(page_url)
+        apply_runtime_state(nodes, unquote(parts.path), f'{parts.scheme}://{parts.netloc}')
+
+    sidebar_css = bool(SIDEBAR_CSS_RE.search(content))
+    for group, level1, level2 in _menu_layout(fragment):
+        level1_text = _shown_text(level1, sidebar_css) if level1 is not None else None
+        if level1_text is None:
+            menu_data["errors"].append("解析菜单组失败: 缺少 .nav-level-1 / .nav-text")
+            continue
+
+        group_data = {
+            "level": 1,
+            "expanded": "expanded" in _class_attr(group),
+            "children": {}
+        }
+        if group_data["expanded"]:
+            menu_data["expanded_groups"].append(level1_text)
+        if "active" in _class_attr(level1[0]):
+            menu_data["active_items"].append(level1_text)
+
+        for item2, level3 in level2:
+            text2 = _shown_text(item2, sidebar_css)
+            if text2 is None:
+                continue
+            item2_data = {"level": 2, "href": _resolved_href(item2[0], page_url)}
+            if "active" in _class_attr(item2[0]):
+                menu_data["active_items"].append(f"{level1_text} > {text2}")
+
+            if level3:
+                item2_data["children"] = {}
+                for item3 in level3:
+                    text3 = _shown_text(item3, sidebar_css)
+                    if text3 is None:
+                        continue
+                    if "active" in _class_attr(item3[0]):
+                        menu_data["active_items"].append(f"{level1_text} > {text2} > {text3}")
+                    item2_data["children"][text3] = {"level": 3, "href": _resolved_href(item3[0], page_url)}
+
+            group_data["children"][text2] = item2_data
+
+        menu_data["structure"][level1_text] = group_data
+
+    return menu_data
+
+
+def iter_pages(admin_dir: Path = ADMIN_DIR) -> list:
+    """含统一侧边栏容器的页面（正式页面与测试页，排除组件片段与备份文件）"""
+    return sorted(get_inventory(admin_dir).paths(kinds=(PAGE, TEST)))
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='医保审核系统统一侧边栏构建期内联')
+    parser.add_argument('pages', nargs='*', help='仅处理指定页面（相对 超级管理员 目录），默认全部')
+    parser.add_argument('--dev', action='store_true', help='还原为开发态：运行时 fetch 加载侧边栏')
+    parser.add_argument('--dry-run', action='store_true', help='只输出计划，不写入文件')
+
+    args = parser.parse_args()
+
+    pages = [ADMIN_DIR / p for p in args.pages] or iter_pages()
+    fragment_html = SIDEBAR_FRAGMENT.read_text(encoding='utf-8')
+
+    changed = 0
+    for page_path in pages:
+        content = page_path.read_text(encoding='utf-8')
+        new_content = restore_page(content) if args.dev else render_page(content, page_path, fragment_html)
+        if new_content == content:
+            continue
+        changed += 1
+        if not args.dry_run:
+            write_text_atomic(page_path, new_content)
+        action = '↩️  还原' if args.dev else '🧩 内联'
+        print(f"{action}: {page_path.relative_to(ADMIN_DIR)}")
+
+    mode = '开发态（运行时加载）' if args.dev else '构建态（侧边栏内联）'
+    print(f"\n✅ {mode}: 处理 {changed} 个页面")
+    if args.dry_run:
+        print("   ℹ️  dry-run 模式，未写入任何文件")
+
+
+if __name__ == '__main__':
+    main()
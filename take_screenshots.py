@@ -17,6 +17,8 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
+from perf_log_parser import PerformanceLogParser
+from page_inventory import get_inventory
 
 # 配置路径
 ADMIN_DIR = Path('/Users/baiyumi/Mai/代码/chenyrweb/ybsh/1.0/超级管理员')
@@ -24,50 +26,6 @@ IMG_DIR = Path('/Users/baiyumi/Mai/代码/chenyrweb/ybsh/img')
 LOG_DIR = IMG_DIR / 'logs'
 BASE_URL = 'http://localhost:8000/1.0/超级管理员'
 
-# 需要截图的页面列表（根据之前的修复列表）
-TARGET_PAGES = [
-    # 工作台模块
-    '工作台/工作台.html',
-    '工作台/平台运营看板.html', 
-    '工作台/报告规则分析.html',
-    
-    # 用户权限管理模块
-    '用户权限管理/用户管理/用户列表.html',
-    '用户权限管理/权限管理/权限管理.html',
-    '用户权限管理/组织管理/科室管理.html',
-    '用户权限管理/组织管理/企业详情.html',
-    '用户权限管理/组织管理/租户管理.html',
-    '用户权限管理/组织管理/租户表单.html',
-    
-    # 审核管理模块
-    '审核管理/审核流程/事中审核检查.html',
-    '审核管理/审核流程/事前审核记录.html',
-    '审核管理/审核流程/事后审核任务列表.html',
-    '审核管理/审核结果/审核结果.html',
-    
-    # 规则管理模块
-    '规则管理/规则操作/规则参数配置.html',
-    '规则管理/规则操作/创建规则.html',
-    '规则管理/规则操作/编辑规则.html',
-    '规则管理/规则操作/规则管理完整版.html',
-    '规则管理/规则列表/规则管理主页.html',
-    '规则管理/规则列表/门诊规则管理.html',
-    '规则管理/规则列表/医保规则管理系统v2.html',
-    '规则管理/规则详情/规则详情.html',
-    '规则管理/规则详情/门诊规则详情.html',
-    '规则管理/规则详情/临床规则详情.html',
-    '规则管理/规则详情/慢病规则详情.html',
-    '规则管理/规则详情/政策规则详情.html',
-    
-    # 系统管理模块
-    '系统管理/知识库目录.html',
-    '系统管理/全局设置.html',
-    '系统管理/系统监控.html',
-    
-    # 登录页
-    '登录.html'
-]
-
 def setup_driver():
     """设置Chrome WebDriver，启用日志采集"""
     chrome_options = Options()
@@ -93,28 +51,7 @@ def setup_driver():
         return None
 
 
-def parse_performance_logs(raw_logs):
-    """解析performance日志，统计网络错误与JS异常"""
-    import json
-    net_errors = []
-    for entry in raw_logs:
-        try:
-            msg = json.loads(entry.get('message', '{}'))
-            message = msg.get('message', {})
-            method = message.get('method')
-            params = message.get('params', {})
-
-            # 请求失败
-            if method == 'Network.loadingFailed':
-                url = params.get('url', '')
-                error_text = params.get('errorText', '')
-                net_errors.append(f"NetworkFailed: {url} | {error_text}")
-        except Exception:
-            continue
-    return net_errors
-
-
-def collect_logs(driver, page_name):
+def collect_logs(driver, page_name, log_parser=None):
     """采集控制台与网络错误日志，写入文件"""
     logs = []
     # 浏览器控制台日志
@@ -129,12 +66,10 @@ def collect_logs(driver, page_name):
         pass
 
     # performance 日志（网络失败）
-    try:
-        perf_logs = driver.get_log('performance')
-        net_errors = parse_performance_logs(perf_logs)
-        logs.extend(net_errors)
-    except Exception:
-        pass
+    if log_parser is None:
+        log_parser = PerformanceLogParser()
+    log_parser.drain(driver)
+    logs.extend(log_parser.error_messages())
 
     # 输出到文件
     LOG_DIR.mkdir(parents=True, exist_ok=True)
@@ -153,10 +88,14 @@ def take_screenshot(driver, page_path, output_name):
     try:
         url = f"{BASE_URL}/{page_path}"
         print(f"📸 正在截图: {page_path}")
+        # 丢弃上一个页面残留的日志，等待加载期间分批解析本页日志
+        log_parser = PerformanceLogParser()
+        log_parser.drain(driver)
+        log_parser.reset()
         driver.get(url)
         
         # 初步等待页面主要结构加载
-        time.sleep(2)
+        log_parser.drain_for(driver, 2)
         
         # 等待统一侧边栏加载完成（尽量保证视觉完整）
         try:
@@ -167,7 +106,7 @@ def take_screenshot(driver, page_path, output_name):
             print(f"⚠️  侧边栏未完全加载: {page_path}")
         
         # 额外等待可能的异步内容
-        time.sleep(1.5)
+        log_parser.drain_for(driver, 1.5)
         
         # 调整窗口高度以覆盖页面整体高度
         total_height = driver.execute_script("return Math.max(document.body.scrollHeight, document.documentElement.scrollHeight, document.body.offsetHeight, document.documentElement.offsetHeight)")
@@ -178,7 +117,7 @@ def take_screenshot(driver, page_path, output_name):
         driver.save_screenshot(str(output_path))
 
         # 采集日志
-        logs = collect_logs(driver, output_name)
+        logs = collect_logs(driver, output_name, log_parser)
         err_count = len(logs)
         if err_count:
             print(f"⚠️  捕获到 {err_count} 条错误日志: {output_name}.log")
@@ -207,11 +146,14 @@ def main():
         return
     
     try:
+        # 需要截图的页面列表：页面清单中的正式页面（不含组件片段、备份、测试页与近似重复页面）
+        target_pages = [entry.path for entry in get_inventory(ADMIN_DIR).pages(audit_only=True)]
+        
         success_count = 0
-        total_count = len(TARGET_PAGES)
+        total_count = len(target_pages)
         pages_with_errors = []
         
-        for page_path in TARGET_PAGES:
+        for page_path in target_pages:
             output_name = Path(page_path).name  # 如 用户列表.html
             
             # 检查页面文件是否存在
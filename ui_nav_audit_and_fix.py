@@ -10,6 +10,7 @@ v2.0 - 真正整合版本
 3. 自动修复：静态资源404、侧边栏加载、样式一致性
 4. 生成结构化审查报告（JSON + Markdown）
 5. 修复后自动复审验证
+6. --static-nav：菜单状态可静态模拟的页面不启动浏览器计算导航评分
 """
 
 import os
@@ -26,7 +27,7 @@ from urllib.parse import unquote
 try:
     from audit_config import (
         ROOT, ADMIN_DIR, IMG_DIR, LOG_DIR, AUDIT_DIR, COMMON_CSS, BASE_URL,
-        AUDIT_PAGES, STANDARD_MENU_STRUCTURE,
+        STANDARD_MENU_STRUCTURE,
         SIDEBAR_SNIPPET_MARK, CHART_CSS_MARK, UI_FIX_MARK
     )
 except ImportError:
@@ -42,10 +43,17 @@ except ImportError:
     CHART_CSS_MARK = '/* ui_audit_and_fix: charts min-height */'
     UI_FIX_MARK = '/* ui_nav_audit_and_fix: auto-applied */'
 
+from atomic_io import write_text_atomic
+from resource_paths import resolve_resource_path, group_page_variants
+from sidebar_include import is_prerendered, sidebar_loader_script
+from cdp_snapshot import attach_snapshot, detach_snapshot
+from page_inventory import get_inventory
+from audit_profiler import PROFILER
+
 # 导入导航审查功能
 try:
     from menu_audit_enhanced import (
-        setup_driver, extract_menu_structure
+        setup_driver, extract_menu_structure, audit_single_page, audit_page_variant, audit_page_static
     )
     USE_ENHANCED_MENU = True
 except ImportError:
@@ -61,56 +69,6 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 
-# 审查页面配置 
-# 优先使用 audit_config.AUDIT_PAGES，如不可用则使用本地回退配置
-if 'AUDIT_PAGES' not in globals():
-    AUDIT_PAGES = {
-        '工作台': [
-            '工作台/平台运营看板.html', 
-            '工作台/报告规则分析.html',
-        ],
-        '审核管理': [
-            '审核管理/审核流程/事中审核检查.html',
-            '审核管理/审核流程/事前审核记录.html',
-            '审核管理/审核流程/事后审核任务列表.html',
-            '审核管理/审核结果/审核结果.html',
-        ],
-        '规则管理': [
-            '规则管理/规则操作/规则参数配置.html',
-            '规则管理/规则操作/创建规则.html',
-            '规则管理/规则操作/编辑规则.html',
-            '规则管理/规则操作/规则管理完整版.html',
-            '规则管理/规则列表/规则管理主页.html',
-            '规则管理/规则列表/门诊规则管理.html',
-            '规则管理/规则列表/医保规则管理系统v2.html',
-            '规则管理/规则详情/规则详情.html',
-            '规则管理/规则详情/门诊规则详情.html',
-            '规则管理/规则详情/临床规则详情.html',
-            '规则管理/规则详情/慢病规则详情.html',
-            '规则管理/规则详情/政策规则详情.html',
-        ],
-        '用户权限管理': [
-            '用户权限管理/用户管理/用户列表.html',
-            '用户权限管理/权限管理/权限管理.html',
-            '用户权限管理/组织管理/科室管理.html',
-            '用户权限管理/组织管理/企业详情.html',
-            '用户权限管理/组织管理/租户管理.html',
-            '用户权限管理/组织管理/租户表单.html',
-        ],
-        '系统管理': [
-            '系统管理/全局设置.html',
-            '系统管理/系统监控.html',
-        ],
-        '知识库': [
-            '系统管理/知识库目录.html?catalog=drug',
-            '系统管理/知识库目录.html?catalog=treatment',
-            '系统管理/知识库目录.html?catalog=material',
-        ],
-        '登录': [
-            '登录.html'
-        ]
-    }
-
 # 标准菜单结构（最新版本）
 # 优先使用 audit_config.STANDARD_MENU_STRUCTURE，如不可用则使用本地回退
 if 'STANDARD_MENU_STRUCTURE' not in globals():
@@ -206,7 +164,7 @@ def replace_in_file(file_path: Path, replacements: list[tuple[str, str]]) -> boo
     for old, new in replacements:
         text = text.replace(old, new)
     if text != original:
-        file_path.write_text(text, encoding='utf-8')
+        write_text_atomic(file_path, text)
         print(f'  ✓ 修改: {file_path}')
         return True
     return False
@@ -215,7 +173,7 @@ def replace_in_file(file_path: Path, replacements: list[tuple[str, str]]) -> boo
 def ensure_file(path: Path, content: str) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
     if not path.exists():
-        path.write_text(content, encoding='utf-8')
+        write_text_atomic(path, content)
         print(f'  ✓ 新建文件: {path}')
 
 
@@ -229,30 +187,17 @@ def ensure_unified_sidebar(html_path: Path) -> bool:
         return False
     # 计算到组件片段的相对路径
     sidebar_fragment = ADMIN_DIR / '组件' / '_unified-sidebar.html'
-    rel = os.path.relpath(sidebar_fragment, html_path.parent)
+    rel = os.path.relpath(sidebar_fragment, html_path.parent).replace(os.sep, '/')
+    # 与 cleanup_sidebar_blocks.py 相同的标准加载脚本（sessionStorage 缓存 + 单次初始化）
     snippet = (
         f"\n    <!-- {SIDEBAR_SNIPPET_MARK} -->\n"
-        "    <script>\n"
-        f"      fetch('{rel.replace(os.sep, '/')}'.replace(/\\\\/g,'/'))\n"
-        "        .then(r => r.text())\n"
-        "        .then(html => {\n"
-        "          const container = document.getElementById('sidebar-container');\n"
-        "          container.innerHTML = html;\n"
-        "          // 执行插入片段中的脚本\n"
-        "          Array.from(container.querySelectorAll('script')).forEach(s => {\n"
-        "            const ns = document.createElement('script');\n"
-        "            if (s.src) { ns.src = s.src; } else { ns.textContent = s.textContent; }\n"
-        "            document.body.appendChild(ns); s.remove();\n"
-        "          });\n"
-        "          // 初始化侧边栏\n"
-        "          if (typeof initSidebar === 'function') { setTimeout(() => initSidebar(), 0); }\n"
-        "        });\n"
-        "    </script>\n"
+        "    <!-- 加载统一菜单 -->\n"
+        f"{sidebar_loader_script(rel)}\n"
     )
     # 注入到 </body> 前
     new_text = text.replace('</body>', snippet + '\n</body>')
     if new_text != text:
-        html_path.write_text(new_text, encoding='utf-8')
+        write_text_atomic(html_path, new_text)
         print(f'  ✓ 注入统一侧边栏: {html_path}')
         return True
     return False
@@ -330,7 +275,7 @@ def ensure_chart_min_height() -> bool:
         "  min-height: 300px;\n"
         "}\n"
     )
-    COMMON_CSS.write_text(css + patch, encoding='utf-8')
+    write_text_atomic(COMMON_CSS, css + patch)
     print(f'  ✓ 通用样式追加最小高度: {COMMON_CSS}')
     return True
 
@@ -338,8 +283,13 @@ def ensure_chart_min_height() -> bool:
 class UINavAuditor:
     """综合UI+导航审查器"""
     
-    def __init__(self):
+    def __init__(self, use_snapshot: bool = False, static_nav: bool = False):
         self.driver = None
+        self.use_snapshot = use_snapshot  # 通过CDP用内存快照应答请求，无需本地服务器
+        self.static_nav = static_nav  # 静态模拟侧边栏计算导航评分，仅在需要时启动浏览器
+        self.snapshot = None
+        # 审查页面列表来自页面清单服务（按菜单分组，含查询参数变体）
+        self.audit_pages = get_inventory(ADMIN_DIR).audit_pages()
         self.audit_results = {}
         self.fixed_issues = []
         self.timestamp = datetime.now().strftime("%Y%m%d_%H%M")
@@ -365,10 +315,14 @@ class UINavAuditor:
             
             service = Service(ChromeDriverManager().install())
             self.driver = webdriver.Chrome(service=service, options=options)
+        if self.driver and self.use_snapshot:
+            self.snapshot = attach_snapshot(self.driver, BASE_URL, ROOT)
         return self.driver
     
     def teardown_browser(self):
         """关闭浏览器"""
+        detach_snapshot(self.snapshot)
+        self.snapshot = None
         if self.driver:
             self.driver.quit()
             print("✅ 浏览器已关闭")
@@ -423,19 +377,8 @@ class UINavAuditor:
         return issues
     
     def resolve_resource_path(self, page_path: Path, resource_url: str) -> Path:
-        """解析相对路径到绝对路径"""
-        if resource_url.startswith('http'):
-            return Path('/dev/null')  # 外部资源，跳过
-        
-        # 移除查询参数
-        resource_url = resource_url.split('?')[0].split('#')[0]
-        
-        if resource_url.startswith('/'):
-            # 绝对路径（相对于域名根）
-            return ROOT / '1.0' / resource_url.lstrip('/')
-        else:
-            # 相对路径
-            return (page_path.parent / resource_url).resolve()
+        """解析相对路径到绝对路径（与 asset_bundler 共用 resource_paths 中的规则）"""
+        return resolve_resource_path(page_path, resource_url)
     
     def check_sidebar_loading(self, page_path: Path) -> list:
         """检查侧边栏加载"""
@@ -448,8 +391,8 @@ class UINavAuditor:
         # 检查是否有侧边栏容器
         has_sidebar_container = 'id="sidebar"' in content or 'class="sidebar"' in content
         
-        # 检查是否有fetch unified-sidebar的代码
-        has_sidebar_fetch = 'unified-sidebar.html' in content and 'fetch(' in content
+        # 检查是否有fetch unified-sidebar的代码（构建期已内联的页面视为已加载）
+        has_sidebar_fetch = ('unified-sidebar.html' in content and 'fetch(' in content) or is_prerendered(content)
         
         if has_sidebar_container and not has_sidebar_fetch:
             issues.append({
@@ -498,17 +441,28 @@ class UINavAuditor:
         
         return issues
     
-    def audit_page_navigation(self, page_url: str) -> dict:
-        """审查页面导航（使用增强版审计功能）"""
+    def audit_page_navigation(self, page_url: str, base_result: dict = None) -> dict:
+        """审查页面导航（使用增强版审计功能）
+        传入同一物理文件已审查的 base_result 时，复用已加载的文档切换查询参数变体"""
         if USE_ENHANCED_MENU:
             # 使用增强版的审计功能
             page_path = page_url.replace(f"{BASE_URL}/", "")
             module_name = page_path.split('/')[0] if '/' in page_path else "未知模块"
             
             try:
-                # 调用增强版的audit_single_page
-                from menu_audit_enhanced import audit_single_page
-                audit_result = audit_single_page(self.driver, page_path, module_name)
+                audit_result = None
+                if self.static_nav:
+                    audit_result = audit_page_static(page_path, module_name, ADMIN_DIR, BASE_URL)
+                if audit_result is None:
+                    # 页面自身脚本会改写菜单状态：使用浏览器审查（按需启动）
+                    if not self.driver:
+                        self.setup_browser()
+                    base_enhanced = base_result.get("enhanced_result") if base_result else None
+                    # 调用增强版的audit_single_page / audit_page_variant
+                    if base_enhanced and base_enhanced.get("page_info", {}).get("mode") != "static":
+                        audit_result = audit_page_variant(self.driver, page_path, module_name, base_enhanced)
+                    else:
+                        audit_result = audit_single_page(self.driver, page_path, module_name)
                 
                 # 转换为UI审查格式
                 return {
@@ -697,7 +651,7 @@ class UINavAuditor:
         )
         
         if new_content != content:
-            page_path.write_text(new_content, encoding='utf-8')
+            write_text_atomic(page_path, new_content)
             return f"更新 {page_path.name}: {old_path} → {new_path}"
         
         return f"未找到匹配的路径引用: {old_path}"
@@ -708,7 +662,7 @@ class UINavAuditor:
   <rect width="120" height="40" fill="#1890ff" rx="4"/>
   <text x="60" y="25" text-anchor="middle" fill="white" font-family="Arial" font-size="14" font-weight="bold">医保审核</text>
 </svg>'''
-        logo_path.write_text(svg_content, encoding='utf-8')
+        write_text_atomic(logo_path, svg_content)
     
     def auto_fix_sidebar_loading(self, issues: list, page_path: Path) -> list:
         """自动修复侧边栏加载问题"""
@@ -727,6 +681,8 @@ class UINavAuditor:
         # 检查是否已注入
         if SIDEBAR_SNIPPET_MARK in content:
             return f"{page_path.name}: 侧边栏代码已存在"
+        if is_prerendered(content):
+            return f"{page_path.name}: 侧边栏已在构建期内联"
         
         # 侧边栏加载代码片段
         sidebar_script = f'''
@@ -755,7 +711,7 @@ document.addEventListener('DOMContentLoaded', function() {{
         else:
             new_content = content + sidebar_script
         
-        page_path.write_text(new_content, encoding='utf-8')
+        write_text_atomic(page_path, new_content)
         return f"{page_path.name}: 注入侧边栏加载代码"
     
     def auto_fix_ui_issues(self, issues: list, page_path: Path) -> list:
@@ -788,11 +744,15 @@ document.addEventListener('DOMContentLoaded', function() {{
 '''
         
         new_content = content + chart_css
-        COMMON_CSS.write_text(new_content, encoding='utf-8')
+        write_text_atomic(COMMON_CSS, new_content)
         return "添加图表最小高度样式到通用CSS"
     
     def audit_module(self, module_name: str) -> dict:
         """审查单个模块"""
+        with PROFILER.span('audit_module', cat='module', module=module_name):
+            return self._audit_module(module_name)
+    
+    def _audit_module(self, module_name: str) -> dict:
         print(f"\n🔍 审查模块: {module_name}")
         
         module_result = {
@@ -807,53 +767,73 @@ document.addEventListener('DOMContentLoaded', function() {{
             }
         }
         
-        if module_name not in AUDIT_PAGES:
+        if module_name not in self.audit_pages:
             print(f"❌ 未知模块: {module_name}")
             return module_result
         
-        pages = AUDIT_PAGES[module_name]
+        pages = self.audit_pages[module_name]
         nav_scores = []
         
-        for page_rel_path in pages:
-            page_path = ADMIN_DIR / page_rel_path.replace('.html?', '.html').split('?')[0]
-            page_url = f"{BASE_URL}/{page_rel_path}"
+        # 同一物理文件的查询参数变体（如 知识库目录.html?catalog=*）归为一组：
+        # 静态检查与自动修复只做一次，浏览器只冷加载一次，其余变体在页内切换
+        for file_rel_path, variants in group_page_variants(pages).items():
+            page_path = ADMIN_DIR / file_rel_path
+            with PROFILER.span('audit_page', cat='page', page=file_rel_path, variants=len(variants)):
             
-            # 静态检查
-            static_issues = self.check_static_resources(page_path)
-            sidebar_issues = self.check_sidebar_loading(page_path)
-            ui_issues = self.check_ui_consistency(page_path)
+                # 静态检查
+                with PROFILER.span('static.resources'):
+                    static_issues = self.check_static_resources(page_path)
+                with PROFILER.span('static.sidebar'):
+                    sidebar_issues = self.check_sidebar_loading(page_path)
+                with PROFILER.span('static.ui_consistency'):
+                    ui_issues = self.check_ui_consistency(page_path)
             
-            # 浏览器审查（仅当静态检查通过）
-            nav_result = {"navigation_score": 0, "issues": ["跳过浏览器审查"]}
-            if not static_issues:
-                nav_result = self.audit_page_navigation(page_url)
+                # 浏览器审查（仅当静态检查通过）
+                nav_results = {}
+                base_result = None
+                for page_rel_path in variants:
+                    nav_result = {"navigation_score": 0, "issues": ["跳过浏览器审查"]}
+                    if not static_issues:
+                        with PROFILER.span('navigation.browser', page=page_rel_path):
+                            nav_result = self.audit_page_navigation(f"{BASE_URL}/{page_rel_path}", base_result)
+                        base_result = base_result or nav_result
+                    nav_results[page_rel_path] = nav_result
             
-            # 自动修复
-            fixed_static = self.auto_fix_static_resources(static_issues, page_path)
-            fixed_sidebar = self.auto_fix_sidebar_loading(sidebar_issues, page_path)
-            fixed_ui = self.auto_fix_ui_issues(ui_issues, page_path)
+                # 自动修复
+                with PROFILER.span('fix.static_resources', cat='fix'):
+                    fixed_static = self.auto_fix_static_resources(static_issues, page_path)
+                with PROFILER.span('fix.sidebar_loading', cat='fix'):
+                    fixed_sidebar = self.auto_fix_sidebar_loading(sidebar_issues, page_path)
+                with PROFILER.span('fix.ui', cat='fix'):
+                    fixed_ui = self.auto_fix_ui_issues(ui_issues, page_path)
             
             all_fixed = fixed_static + fixed_sidebar + fixed_ui
             
-            page_result = {
-                "path": str(page_path),
-                "url": page_url,
-                "static_issues": static_issues,
-                "sidebar_issues": sidebar_issues,
-                "ui_issues": ui_issues,
-                "navigation_result": nav_result,
-                "fixes_applied": all_fixed,
-                "total_issues": len(static_issues) + len(sidebar_issues) + len(ui_issues),
-                "total_fixes": len(all_fixed)
-            }
-            
-            module_result["pages"][page_rel_path] = page_result
-            
-            # 统计
-            if page_result["total_issues"] > 0:
-                module_result["summary"]["error_pages"] += 1
+            for index, page_rel_path in enumerate(variants):
+                nav_result = nav_results[page_rel_path]
+                page_result = {
+                    "path": str(page_path),
+                    "url": f"{BASE_URL}/{page_rel_path}",
+                    "static_issues": static_issues,
+                    "sidebar_issues": sidebar_issues,
+                    "ui_issues": ui_issues,
+                    "navigation_result": nav_result,
+                    # 修复按物理文件记录在首个变体上，避免重复统计
+                    "fixes_applied": all_fixed if index == 0 else [],
+                    "total_issues": len(static_issues) + len(sidebar_issues) + len(ui_issues),
+                    "total_fixes": len(all_fixed) if index == 0 else 0
+                }
+                if index:
+                    page_result["static_checks_shared_with"] = variants[0]
+                
+                module_result["pages"][page_rel_path] = page_result
+                
+                # 统计
+                if page_result["total_issues"] > 0:
+                    module_result["summary"]["error_pages"] += 1
+                
+                nav_scores.append(nav_result["navigation_score"]) 
             
-            nav_scores.append(nav_result["navigation_score"]) 
             module_result["summary"]["total_issues_fixed"] += len(all_fixed)
             self.fixed_issues.extend(all_fixed)
         
@@ -868,8 +848,10 @@ document.addEventListener('DOMContentLoaded', function() {{
         """生成审查报告"""
         # JSON报告
         json_file = AUDIT_DIR / f"ui_nav_audit_{self.timestamp}.json"
+        # 开启 --profile 时附带分阶段耗时（以 _ 开头，与模块名区分）
+        data = dict(results, _timings=PROFILER.timings_report()) if PROFILER.enabled else results
         with open(json_file, 'w', encoding='utf-8') as f:
-            json.dump(results, f, ensure_ascii=False, indent=2)
+            json.dump(data, f, ensure_ascii=False, indent=2)
         
         # Markdown报告
         md_file = AUDIT_DIR / f"ui_nav_audit_{self.timestamp}.md"
@@ -957,10 +939,11 @@ document.addEventListener('DOMContentLoaded', function() {{
         print("🚀 启动医保审核系统综合UI+导航审查")
         
         if modules is None:
-            modules = list(AUDIT_PAGES.keys())
+            modules = list(self.audit_pages.keys())
         
-        # 设置浏览器
-        self.setup_browser()
+        # 设置浏览器（静态导航审查模式下按需启动）
+        if not (self.static_nav and USE_ENHANCED_MENU):
+            self.setup_browser()
         
         try:
             results = {}
@@ -973,7 +956,8 @@ document.addEventListener('DOMContentLoaded', function() {{
                 results[module_name] = self.audit_module(module_name)
             
             # 生成报告
-            self.generate_report(results)
+            with PROFILER.span('report', cat='report'):
+                self.generate_report(results)
             
             # 打印总结
             self._print_summary(results)
@@ -1001,16 +985,26 @@ def main():
     parser = argparse.ArgumentParser(description='医保审核系统综合UI+导航审查与自动修复')
     parser.add_argument('--modules', type=str, help='指定审查模块，逗号分隔')
     parser.add_argument('--auto-fix', action='store_true', default=True, help='启用自动修复')
+    parser.add_argument('--snapshot', action='store_true', help='通过CDP从1.0目录内存快照加载页面（无需本地服务器）')
+    parser.add_argument('--profile', action='store_true', help='记录各阶段耗时，输出 Chrome trace 与火焰图折叠栈文件')
+    parser.add_argument('--static-nav', action='store_true',
+                        help='静态模拟侧边栏计算导航评分，仅页面脚本改写菜单状态时启动浏览器（无截图与性能指标）')
     
     args = parser.parse_args()
+    if args.profile:
+        PROFILER.enable()
     
-    auditor = UINavAuditor()
+    auditor = UINavAuditor(use_snapshot=args.snapshot, static_nav=args.static_nav)
     
     modules = None
     if args.modules:
         modules = [m.strip() for m in args.modules.split(',')]
     
-    auditor.run_full_audit(modules)
+    try:
+        auditor.run_full_audit(modules)
+    finally:
+        if args.profile:
+            PROFILER.write_outputs('ui_nav_audit')
 
 
 if __name__ == '__main__':
@@ -6,7 +6,7 @@
 
 基于《UI审查标准与评估指南.md》的完整实现：
 1. 按P0/P1/P2优先级进行问题分级
-2. 覆盖业务逻辑、交互完整性、UI视觉一致性三大维度
+2. 覆盖业务逻辑、交互完整性、UI视觉一致性、性能四大维度
 3. 支持自动修复和验证
 4. 生成标准化审查报告
 """
@@ -19,19 +19,55 @@ import argparse
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 
 # 导入各个模块
 try:
     from auto_fix_engine import AutoFixManager, Priority, FixCategory
     from fix_strategies import FIX_STRATEGIES, list_available_strategies
-    from menu_audit_enhanced import audit_single_page as enhanced_audit_page, setup_driver
+    from menu_audit_enhanced import (
+        audit_single_page as enhanced_audit_page, audit_page_static as enhanced_audit_static, setup_driver
+    )
     from ui_nav_audit_and_fix import UINavAuditor
 except ImportError as e:
     print(f"导入模块失败: {e}")
     print("请确保所有依赖模块都在同一目录下")
     sys.exit(1)
 
+try:
+    from audit_config import AUDIT_DIR, get_performance_budget, PERFORMANCE_REGRESSION_TOLERANCE
+except ImportError:
+    AUDIT_DIR = Path(__file__).resolve().parent / 'audit_reports'
+    PERFORMANCE_REGRESSION_TOLERANCE = {'relative': 0.1, 'absolute': {}}
+
+    def get_performance_budget(page_rel: str) -> dict:
+        return {'html_bytes': 100000, 'static_bytes': 400000, 'load_time_ms': 3000,
+                'total_bytes': 1500000, 'request_count': 40, 'dom_nodes': 1500, 'sidebar_ready_ms': 1000}
+
+from resource_paths import is_external, resolve_resource_path
+from cdp_snapshot import attach_snapshot, detach_snapshot
+from page_inventory import get_inventory
+from fix_planner import FixPlanner
+from audit_profiler import PROFILER, profiled
+
+PERFORMANCE_HISTORY_FILE = AUDIT_DIR / 'performance_history.json'
+
+# 性能指标显示名称
+PERFORMANCE_METRIC_NAMES = {
+    'html_bytes': 'HTML体积(字节)',
+    'static_bytes': '静态资源体积(字节)',
+    'dom_nodes': 'DOM节点数',
+    'sidebar_ready_ms': '侧边栏就绪时间(ms)',
+    'ttfb_ms': '首字节时间(ms)',
+    'dcl_ms': 'DOMContentLoaded(ms)',
+    'load_time_ms': '页面加载时间(ms)',
+    'lcp_ms': '最大内容绘制LCP(ms)',
+    'cls': '累积布局偏移CLS',
+    'total_blocking_ms': '长任务阻塞时间(ms)',
+    'total_bytes': '传输总字节',
+    'request_count': '请求数',
+}
+
 
 @dataclass
 class AuditDimension:
@@ -48,7 +84,7 @@ class AuditIssue:
     title: str
     description: str
     priority: str  # P0, P1, P2
-    dimension: str  # 业务逻辑、交互完整性、UI视觉一致性
+    dimension: str  # 业务逻辑、交互完整性、UI视觉一致性、性能
     page_path: str
     fix_strategy: Optional[str] = None
     status: str = "待修复"  # 待修复、已修复、无法修复
@@ -64,6 +100,7 @@ class PageAuditResult:
     quality_metrics: Dict[str, bool]
     overall_score: float
     audit_time: str
+    performance_metrics: Dict[str, float] = field(default_factory=dict)
 
 
 @dataclass
@@ -79,7 +116,8 @@ class ModuleAuditResult:
 class UnifiedAuditSystem:
     """统一审查系统"""
     
-    def __init__(self, root_dir: Path):
+    def __init__(self, root_dir: Path, use_snapshot: bool = False, use_browser: bool = True,
+                 static_nav: bool = False):
         self.root_dir = Path(root_dir)
         self.admin_dir = self.root_dir / '1.0' / '超级管理员'
         
@@ -87,26 +125,38 @@ class UnifiedAuditSystem:
         self.ui_auditor = UINavAuditor()
         self.auto_fix_manager = AutoFixManager()
         self.driver = None  # WebDriver将在需要时初始化
+        self.use_snapshot = use_snapshot  # 通过CDP用内存快照应答请求，无需本地服务器
+        self.snapshot = None
+        self.use_browser = use_browser  # False 时只做静态审查（不启动浏览器，导航评分为0）
+        self.static_nav = static_nav  # 静态模拟侧边栏计算导航评分，仅页面脚本改写菜单状态时使用浏览器
         
         # 审查维度定义（基于UI审查标准）
         self.audit_dimensions = {
             '业务逻辑与信息架构': AuditDimension(
                 name='业务逻辑与信息架构',
-                weight=0.4,
+                weight=0.35,
                 description='页面功能完整性、信息层次清晰、业务流程合理'
             ),
             '交互完整性与可用性': AuditDimension(
                 name='交互完整性与可用性',
-                weight=0.35,
+                weight=0.3,
                 description='交互反馈及时、操作流程顺畅、错误处理完善'
             ),
             'UI视觉与一致性': AuditDimension(
                 name='UI视觉与一致性',
-                weight=0.25,
+                weight=0.2,
                 description='视觉风格统一、布局合理、响应式适配'
+            ),
+            '性能': AuditDimension(
+                name='性能',
+                weight=0.15,
+                description='加载耗时、渲染稳定性、资源体积与请求数符合性能预算'
             )
         }
         
+        # 性能历史记录（用于计算与上次审查的差值）
+        self.performance_history = self._load_performance_history()
+        
         # 问题优先级权重 - 调整为100分标准
         self.priority_weights = {
             'P0': 2.0,  # 严重问题，必须修复，权重最高
@@ -116,10 +166,16 @@ class UnifiedAuditSystem:
     
     def audit_single_page(self, page_path: Path) -> PageAuditResult:
         """审查单个页面"""
+        with PROFILER.span('audit_single_page', cat='page',
+                           page=self._page_key(page_path) if PROFILER.enabled else ''):
+            return self._audit_single_page(page_path)
+    
+    def _audit_single_page(self, page_path: Path) -> PageAuditResult:
         print(f"正在审查页面: {page_path.name}")
         
         issues = []
         navigation_score = 0
+        performance_metrics = {}
         quality_metrics = {
             '加载成功': False,
             '有标题': False,
@@ -129,27 +185,40 @@ class UnifiedAuditSystem:
         
         try:
             # 1. 导航审查（使用增强版）
-            if not self.driver:
-                self.driver = setup_driver()
+            # 导航审查使用相对 超级管理员 目录的路径拼接页面URL
+            nav_page = page_path.relative_to(self.admin_dir).as_posix() if page_path.is_relative_to(self.admin_dir) else str(page_path)
+            nav_result = None
+            if self.static_nav:
+                with PROFILER.span('navigation.static'):
+                    nav_result = enhanced_audit_static(nav_page, self._get_module_name(page_path), self.admin_dir)
             
-            if self.driver:
-                nav_result = enhanced_audit_page(self.driver, str(page_path), self._get_module_name(page_path))
-                if nav_result:
-                    navigation_score = nav_result.get('navigation_score', {}).get('total', 0)
-                    quality_metrics.update(nav_result.get('quality_indicators', {}))
-                    
-                    # 将导航问题转换为标准问题格式
-                    nav_issues = nav_result.get('navigation_score', {}).get('issues', [])
-                    for issue in nav_issues:
-                        issues.append(AuditIssue(
-                            id=f"nav_{len(issues)+1}",
-                            title=issue,
-                            description=f"导航问题: {issue}",
-                            priority='P1',  # 导航问题通常为P1
-                            dimension='交互完整性与可用性',
-                            page_path=str(page_path),
-                            fix_strategy='fix_menu_highlight'
-                        ))
+            if nav_result is None and self.use_browser and not self.driver:
+                with PROFILER.span('driver.setup'):
+                    self.driver = setup_driver()
+                    if self.driver and self.use_snapshot:
+                        self.snapshot = attach_snapshot(self.driver, root=self.root_dir)
+            
+            if nav_result is None and self.driver:
+                with PROFILER.span('navigation.browser'):
+                    nav_result = enhanced_audit_page(self.driver, nav_page, self._get_module_name(page_path))
+            
+            if nav_result:
+                navigation_score = nav_result.get('navigation_score', {}).get('total', 0)
+                quality_metrics.update(nav_result.get('quality_indicators', {}))
+                performance_metrics = nav_result.get('performance', {})
+                
+                # 将导航问题转换为标准问题格式
+                nav_issues = nav_result.get('navigation_score', {}).get('issues', [])
+                for issue in nav_issues:
+                    issues.append(AuditIssue(
+                        id=f"nav_{len(issues)+1}",
+                        title=issue,
+                        description=f"导航问题: {issue}",
+                        priority='P1',  # 导航问题通常为P1
+                        dimension='交互完整性与可用性',
+                        page_path=str(page_path),
+                        fix_strategy='fix_menu_highlight'
+                    ))
             
             # 2. 业务逻辑审查
             business_issues = self._audit_business_logic(page_path)
@@ -163,7 +232,11 @@ class UnifiedAuditSystem:
             ui_issues = self._audit_ui_consistency(page_path)
             issues.extend(ui_issues)
             
-            # 5. 计算综合评分
+            # 5. 性能审查（基于浏览器采集的指标）
+            perf_issues = self._audit_performance(page_path, performance_metrics)
+            issues.extend(perf_issues)
+            
+            # 6. 计算综合评分
             overall_score = self._calculate_overall_score(navigation_score, issues)
             
         except Exception as e:
@@ -185,11 +258,16 @@ class UnifiedAuditSystem:
             navigation_score=navigation_score,
             quality_metrics=quality_metrics,
             overall_score=overall_score,
-            audit_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            audit_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            performance_metrics=performance_metrics
         )
     
     def audit_module(self, module_name: str) -> ModuleAuditResult:
         """审查整个模块"""
+        with PROFILER.span('audit_module', cat='module', module=module_name):
+            return self._audit_module(module_name)
+    
+    def _audit_module(self, module_name: str) -> ModuleAuditResult:
         print(f"\n开始审查模块: {module_name}")
         
         module_dir = self.admin_dir / module_name
@@ -197,8 +275,13 @@ class UnifiedAuditSystem:
             print(f"模块目录不存在: {module_dir}")
             return None
         
-        # 获取模块下的所有HTML文件
-        html_files = list(module_dir.glob('*.html'))
+        # 获取模块下的所有正式页面（含子目录，不含组件片段、备份、测试页与近似重复页面）
+        inventory = get_inventory(self.admin_dir)
+        entries = inventory.modules(audit_only=True).get(module_name, [])
+        for entry in inventory.modules().get(module_name, []):
+            if entry.duplicate_of:
+                print(f"跳过近似重复页面: {entry.path}（代表页面 {entry.duplicate_of}）")
+        html_files = [self.admin_dir / entry.path for entry in entries]
         if not html_files:
             print(f"模块 {module_name} 下没有找到HTML文件")
             return None
@@ -208,6 +291,8 @@ class UnifiedAuditSystem:
             page_result = self.audit_single_page(html_file)
             page_results.append(page_result)
         
+        self.save_performance_history()
+        
         # 生成模块总结
         summary = self._generate_module_summary(page_results)
         recommendations = self._generate_recommendations(page_results)
@@ -224,13 +309,13 @@ class UnifiedAuditSystem:
         """审查所有模块"""
         print("开始全量审查...")
         
-        # 获取所有模块目录
-        module_dirs = [d for d in self.admin_dir.iterdir() 
-                      if d.is_dir() and not d.name.startswith('.')]
+        # 页面清单中含正式页面的模块目录
+        module_names = [name for name in get_inventory(self.admin_dir).modules(audit_only=True)
+                        if (self.admin_dir / name).is_dir()]
         
         results = []
-        for module_dir in module_dirs:
-            module_result = self.audit_module(module_dir.name)
+        for module_name in module_names:
+            module_result = self.audit_module(module_name)
             if module_result:
                 results.append(module_result)
         
@@ -246,6 +331,8 @@ class UnifiedAuditSystem:
     
     def cleanup(self):
         """清理资源"""
+        detach_snapshot(self.snapshot)
+        self.snapshot = None
         if self.driver:
             try:
                 self.driver.quit()
@@ -253,6 +340,7 @@ class UnifiedAuditSystem:
                 pass
             self.driver = None
     
+    @profiled('auto_fix', cat='fix')
     def auto_fix_issues(self, audit_results: List[ModuleAuditResult], 
                        priority_filter: Optional[str] = None) -> Dict[str, List[str]]:
         """自动修复问题"""
@@ -263,6 +351,8 @@ class UnifiedAuditSystem:
             'failed': [],
             'skipped': []
         }
+        planner = FixPlanner()
+        planned: Dict[str, List[AuditIssue]] = {}
         
         for module_result in audit_results:
             for page_result in module_result.pages:
@@ -271,11 +361,17 @@ class UnifiedAuditSystem:
                     if priority_filter and issue.priority != priority_filter:
                         continue
                     
+                    # 模板化页面上的同类问题交给修复规划器批量处理
+                    if issue.fix_strategy and planner.supports(issue.fix_strategy):
+                        planned.setdefault(issue.fix_strategy, []).append(issue)
+                        continue
+                    
                     # 执行修复
                     if issue.fix_strategy and issue.fix_strategy in FIX_STRATEGIES:
                         try:
                             fix_func = FIX_STRATEGIES[issue.fix_strategy]
-                            changes = fix_func(Path(issue.page_path))
+                            with PROFILER.span(f'fix.{issue.fix_strategy}', cat='fix'):
+                                changes = fix_func(Path(issue.page_path))
                             
                             if changes:
                                 issue.status = "已修复"  # 标记为已修复
@@ -293,16 +389,48 @@ class UnifiedAuditSystem:
                             f"{issue.title} - 无可用修复策略"
                         )
         
+        for strategy, issues in planned.items():
+            pages = list(dict.fromkeys(Path(issue.page_path) for issue in issues))
+            try:
+                with PROFILER.span(f'fix.{strategy}', cat='fix', pages=len(pages)):
+                    changes_by_page = planner.fix_pages(strategy, pages)
+            except Exception as e:
+                error_msg = f"{strategy} - 批量修复失败: {str(e)}"
+                fix_results['failed'].append(error_msg)
+                print(f"修复失败: {error_msg}")
+                continue
+            for issue in issues:
+                page = Path(issue.page_path)
+                if page in planner.failures:
+                    error_msg = f"{issue.title} - 修复失败: {planner.failures[page]}"
+                    fix_results['failed'].append(error_msg)
+                    print(f"修复失败: {error_msg}")
+                    continue
+                changes = changes_by_page.pop(page, None)
+                if changes:
+                    issue.status = "已修复"  # 标记为已修复
+                    fix_results['success'].extend(changes)
+                else:
+                    fix_results['skipped'].append(f"{issue.title} - 无需修复或已存在")
+        
+        if planner.stats['pages']:
+            stats = planner.stats
+            print(f"🧩 模板修复: {stats['pages']} 个页面 / {stats['clusters']} 个结构簇, "
+                  f"修复器执行 {stats['fixer_runs']} 次, 补丁传播 {stats['propagated']} 个, "
+                  f"退回逐页 {stats['fallbacks']} 个, 失败 {stats['failed']} 个")
+        
         return fix_results
     
     def generate_report(self, audit_results: List[ModuleAuditResult], 
                        output_format: str = 'markdown') -> str:
         """生成审查报告"""
-        if output_format == 'json':
-            return self._generate_json_report(audit_results)
-        else:
-            return self._generate_markdown_report(audit_results)
+        with PROFILER.span('report', cat='report', format=output_format):
+            if output_format == 'json':
+                return self._generate_json_report(audit_results)
+            else:
+                return self._generate_markdown_report(audit_results)
     
+    @profiled('static.business_logic')
     def _audit_business_logic(self, page_path: Path) -> List[AuditIssue]:
         """业务逻辑与信息架构审查"""
         issues = []
@@ -346,6 +474,7 @@ class UnifiedAuditSystem:
         
         return issues
     
+    @profiled('static.interaction')
     def _audit_interaction_completeness(self, page_path: Path) -> List[AuditIssue]:
         """交互完整性与可用性审查"""
         issues = []
@@ -395,6 +524,7 @@ class UnifiedAuditSystem:
         
         return issues
     
+    @profiled('static.ui_consistency')
     def _audit_ui_consistency(self, page_path: Path) -> List[AuditIssue]:
         """UI视觉与一致性审查（增强版）"""
         issues = []
@@ -491,6 +621,102 @@ class UnifiedAuditSystem:
         
         return issues
     
+    def _collect_static_metrics(self, page_path: Path) -> Dict[str, float]:
+        """静态性能指标：HTML体积与引用的本地CSS/JS总体积（无需浏览器）"""
+        content = page_path.read_text(encoding='utf-8', errors='ignore')
+        html_bytes = page_path.stat().st_size
+        static_bytes = html_bytes
+        refs = re.findall(r'<link[^>]*href=["\']([^"\']+\.css[^"\']*)["\']', content, re.IGNORECASE)
+        refs += re.findall(r'<script[^>]*src=["\']([^"\']+\.js[^"\']*)["\']', content, re.IGNORECASE)
+        for ref in set(refs):
+            if is_external(ref):
+                continue
+            resource = resolve_resource_path(page_path, ref)
+            if resource.is_file():
+                static_bytes += resource.stat().st_size
+        return {'html_bytes': html_bytes, 'static_bytes': static_bytes}
+    
+    def _page_key(self, page_path: Path) -> str:
+        """页面在预算与历史记录中的键（相对 超级管理员 目录）"""
+        try:
+            return page_path.resolve().relative_to(self.admin_dir.resolve()).as_posix()
+        except ValueError:
+            return page_path.name
+    
+    def _load_performance_history(self) -> Dict[str, Dict[str, float]]:
+        if PERFORMANCE_HISTORY_FILE.exists():
+            try:
+                return json.loads(PERFORMANCE_HISTORY_FILE.read_text(encoding='utf-8'))
+            except (OSError, json.JSONDecodeError):
+                print(f"性能历史记录损坏，重新记录: {PERFORMANCE_HISTORY_FILE}")
+        return {}
+    
+    def save_performance_history(self):
+        """保存本次审查的性能指标，作为下次审查的对比基线"""
+        PERFORMANCE_HISTORY_FILE.parent.mkdir(parents=True, exist_ok=True)
+        PERFORMANCE_HISTORY_FILE.write_text(
+            json.dumps(self.performance_history, ensure_ascii=False, indent=2), encoding='utf-8'
+        )
+    
+    @profiled('static.performance')
+    def _audit_performance(self, page_path: Path, metrics: Dict[str, float]) -> List[AuditIssue]:
+        """性能审查：按页面/模块预算检查指标，并附上与上次记录的差值
+        超出预算50%以上、或超出预算且较上次变差超过容差的为P0，其余超预算为P1"""
+        issues = []
+        page_key = self._page_key(page_path)
+        metrics.update(self._collect_static_metrics(page_path))
+        budget = get_performance_budget(page_key)
+        previous = self.performance_history.get(page_key, {})
+        
+        met = 0
+        checked = 0
+        for metric, limit in budget.items():
+            value = metrics.get(metric)
+            if value is None or not limit:
+                continue
+            checked += 1
+            last = previous.get(metric)
+            delta = value - last if last is not None else None
+            if delta:
+                metrics[f'{metric}_delta'] = round(delta, 3)
+            if value <= limit:
+                met += 1
+                continue
+            
+            name = PERFORMANCE_METRIC_NAMES.get(metric, metric)
+            regressed = self._is_regression(metric, delta, last)
+            if delta is None:
+                delta_text = "无历史记录"
+            else:
+                delta_text = f"较上次{'+' if delta >= 0 else ''}{round(delta, 3)}"
+            issues.append(AuditIssue(
+                id=f"perf_{len(issues)+1}",
+                title=f"{name}超出性能预算",
+                description=f"{name}为{value}，预算为{limit}（超出{(value - limit) / limit * 100:.0f}%，{delta_text}）",
+                priority='P0' if value >= limit * 1.5 or regressed else 'P1',
+                dimension='性能',
+                page_path=str(page_path)
+            ))
+        
+        # 性能维度得分：达标指标占比
+        if checked:
+            metrics['score'] = round(met / checked * 100, 1)
+        
+        # 记录本次指标（仅记录预算中的指标）
+        record = {k: metrics[k] for k in budget if metrics.get(k) is not None}
+        record['recorded_at'] = datetime.now().isoformat()
+        self.performance_history[page_key] = record
+        return issues
+    
+    @staticmethod
+    def _is_regression(metric: str, delta: Optional[float], last: Optional[float]) -> bool:
+        """较上次变差是否超出容差（相对容差与绝对容差需同时超过）"""
+        if delta is None or delta <= 0:
+            return False
+        relative = PERFORMANCE_REGRESSION_TOLERANCE.get('relative', 0)
+        absolute = PERFORMANCE_REGRESSION_TOLERANCE.get('absolute', {}).get(metric, 0)
+        return delta > absolute and (not last or delta / abs(last) > relative)
+    
     def _calculate_overall_score(self, navigation_score: int, issues: List[AuditIssue]) -> float:
         """计算综合评分 - 100分标准"""
         # 如果没有任何问题，直接返回100分
@@ -577,8 +803,19 @@ class UnifiedAuditSystem:
         if sum(v for k, v in issue_counts.items() if 'UI视觉' in k) > 3:
             recommendations.append("统一UI视觉风格，建立设计规范")
         
+        if issue_counts.get('P0_性能', 0) > 0:
+            recommendations.append("页面性能严重超出预算，优先精简资源体积与请求数")
+        
         return recommendations or ["页面质量良好，建议定期维护"]
     
+    def _audit_scope(self) -> Dict[str, list]:
+        """审查范围：被忽略的文件与近似重复页面分组"""
+        inventory = get_inventory(self.admin_dir)
+        return {
+            'ignored': [e.path for e in inventory.entries.values() if e.ignored],
+            'duplicate_groups': inventory.duplicate_groups,
+        }
+    
     def _generate_markdown_report(self, audit_results: List[ModuleAuditResult]) -> str:
         """生成Markdown格式报告"""
         report = []
@@ -600,6 +837,16 @@ class UnifiedAuditSystem:
         report.append(f"- P1问题: {total_p1}个")
         report.append(f"- P2问题: {total_p2}个")
         
+        # 审查范围（忽略清单与近似重复页面）
+        scope = self._audit_scope()
+        if scope['ignored'] or scope['duplicate_groups']:
+            report.append("\n## 审查范围")
+            report.append(f"- 忽略清单命中: {len(scope['ignored'])}个文件")
+            report.append(f"- 近似重复页面: {len(scope['duplicate_groups'])}组（仅审查代表页面）")
+            for group in scope['duplicate_groups']:
+                duplicates = ', '.join(f"`{d['path']}` ({d['similarity']})" for d in group['duplicates'])
+                report.append(f"  - `{group['representative']}` ← {duplicates}")
+        
         # 各模块详情
         for module in audit_results:
             report.append(f"\n## {module.module_name}模块")
@@ -617,6 +864,13 @@ class UnifiedAuditSystem:
                 report.append(f"- 文件路径: `{page.page_path}`")
                 report.append(f"- 综合评分: {page.overall_score}/100")
                 report.append(f"- 导航评分: {page.navigation_score}/100")
+                if page.performance_metrics:
+                    perf = page.performance_metrics
+                    report.append(
+                        f"- 性能指标: 加载 {perf.get('load_time_ms')}ms | LCP {perf.get('lcp_ms')}ms | "
+                        f"CLS {perf.get('cls')} | 请求 {perf.get('request_count')} | "
+                        f"传输 {perf.get('total_bytes', 0) / 1024:.1f}KB | 性能得分 {perf.get('score', '-')}"
+                    )
                 
                 # 质量指标
                 metrics_status = []
@@ -671,8 +925,11 @@ class UnifiedAuditSystem:
                 'total_p2_issues': sum(module.summary['p2_issues'] for module in audit_results),
                 'average_score': sum(module.summary['avg_score'] for module in audit_results) / len(audit_results) if audit_results else 0
             },
+            'audit_scope': self._audit_scope(),
             'modules': []
         }
+        if PROFILER.enabled:
+            report_data['timings'] = PROFILER.timings_report()
         
         for module in audit_results:
             module_data = {
@@ -689,6 +946,7 @@ class UnifiedAuditSystem:
                     'overall_score': page.overall_score,
                     'navigation_score': page.navigation_score,
                     'quality_metrics': page.quality_metrics,
+                    'performance_metrics': page.performance_metrics,
                     'issues': [asdict(issue) for issue in page.issues],
                     'audit_time': page.audit_time
                 }
@@ -709,8 +967,15 @@ def main():
     parser.add_argument('--auto-fix', action='store_true', help='启用自动修复')
     parser.add_argument('--fix-priority', choices=['P0', 'P1', 'P2'], help='自动修复的优先级过滤')
     parser.add_argument('--list-strategies', action='store_true', help='列出所有可用的修复策略')
+    parser.add_argument('--snapshot', action='store_true', help='通过CDP从1.0目录内存快照加载页面（无需本地服务器）')
+    parser.add_argument('--profile', action='store_true', help='记录各阶段耗时，输出 Chrome trace 与火焰图折叠栈文件')
+    parser.add_argument('--static-only', action='store_true', help='只做静态审查，不启动浏览器')
+    parser.add_argument('--static-nav', action='store_true',
+                        help='静态模拟侧边栏计算导航评分，仅页面脚本改写菜单状态时启动浏览器')
     
     args = parser.parse_args()
+    if args.profile:
+        PROFILER.enable()
     
     if args.list_strategies:
         print("可用的修复策略:")
@@ -719,7 +984,8 @@ def main():
         return
     
     # 初始化审查系统
-    audit_system = UnifiedAuditSystem(args.root)
+    audit_system = UnifiedAuditSystem(args.root, use_snapshot=args.snapshot, use_browser=not args.static_only,
+                                      static_nav=args.static_nav)
     
     try:
         # 执行审查
@@ -773,6 +1039,8 @@ def main():
     finally:
         # 清理资源
         audit_system.cleanup()
+        if args.profile:
+            PROFILER.write_outputs('unified_audit')
 
 
 if __name__ == '__main__':